@@ -3,12 +3,11 @@ OvaWell Clinical Suite - Main Streamlit Application
 AI-Powered PCOS Diagnosis & Nutrition Management for Healthcare Professionals
 """
 
-import streamlit as st
-import json
 import os
+import streamlit as st
+import time
 from datetime import datetime
 from typing import Dict, List, Optional
-import pandas as pd
 
 # Import utility modules
 from utils.gemini_client import GeminiClient
@@ -16,6 +15,19 @@ from utils.spoonacular_client import SpoonacularClient
 from utils.image_analyzer import UltrasoundAnalyzer
 from utils.assessment import PCOSAssessment
 from utils.pdf_generator import PDFGenerator
+from utils.meal_planner import MEAL_TYPES
+from utils.lazy import LazyClient
+from utils.config import get_config, validate_all
+from utils.job_queue import CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobQueue
+from utils.plan_jobs import MEAL_PLAN_JOB, MEAL_PLAN_PDF_JOB, bind_builder, meal_plan_pdf_params, register_plan_jobs
+
+# Seconds between reruns while a background job is queued or running
+JOB_POLL_INTERVAL = 1.5
+
+# Clients are built lazily, so their keys are checked up front instead
+REQUIRED_API_KEYS = ("GEMINI_API_KEY", "SPOONACULAR_API_KEY")
+
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 
 # Page configuration
 st.set_page_config(
@@ -120,16 +132,16 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Load configuration files
-@st.cache_data
 def load_config():
-    """Load all configuration files."""
-    with open('config/cities.json', 'r') as f:
-        cities = json.load(f)
-    with open('config/pcos_rules.json', 'r') as f:
-        pcos_rules = json.load(f)
-    with open('config/ui_config.json', 'r') as f:
-        ui_config = json.load(f)
-    return cities, pcos_rules, ui_config
+    """
+    Get the shared, read-only configuration. Each file is parsed once per
+    process and reloaded when it changes, so reruns get it without copying.
+    """
+    error = validate_all()
+    if error:
+        st.error(f"Invalid configuration - {error}")
+        st.stop()
+    return get_config("cities"), get_config("pcos_rules"), get_config("ui_config")
 
 # Initialize session state
 def init_session_state():
@@ -144,60 +156,31 @@ def init_session_state():
         st.session_state.current_meal_plan = None
     if 'selected_city' not in st.session_state:
         st.session_state.selected_city = "Pune"
+    # Job ids are also kept in the URL, so a refreshed tab picks its jobs back up
+    for key in ('plan_job', 'pdf_job'):
+        if key not in st.session_state:
+            st.session_state[key] = st.query_params.get(key)
 
 # Initialize clients
 @st.cache_resource
 def get_clients():
-    """Initialize all API clients."""
-    gemini_client = GeminiClient()
-    spoonacular_client = SpoonacularClient()
-    ultrasound_analyzer = UltrasoundAnalyzer()
-    pcos_assessor = PCOSAssessment()
-    pdf_generator = PDFGenerator()
+    """Initialize all API clients. Each is constructed on first use."""
+    gemini_client = LazyClient(GeminiClient)
+    spoonacular_client = LazyClient(SpoonacularClient)
+    ultrasound_analyzer = LazyClient(UltrasoundAnalyzer)
+    pcos_assessor = LazyClient(PCOSAssessment)
+    pdf_generator = LazyClient(PDFGenerator)
     
     return gemini_client, spoonacular_client, ultrasound_analyzer, pcos_assessor, pdf_generator
 
-def get_fallback_recipe(meal_type):
-    """Get a fallback recipe when API fails."""
-    fallback_recipes = {
-        "breakfast": {
-            "title": "Oats & Berries Bowl",
-            "image": "https://spoonacular.com/recipeImages/oatmeal.jpg",
-            "readyInMinutes": 10,
-            "summary": "Healthy oats with mixed berries and nuts"
-        },
-        "lunch": {
-            "title": "Grilled Chicken Salad",
-            "image": "https://spoonacular.com/recipeImages/salad.jpg",
-            "readyInMinutes": 20,
-            "summary": "Fresh greens with grilled chicken and vegetables"
-        },
-        "dinner": {
-            "title": "Baked Fish with Vegetables",
-            "image": "https://spoonacular.com/recipeImages/fish.jpg",
-            "readyInMinutes": 30,
-            "summary": "Healthy baked fish with seasonal vegetables"
-        },
-        "snack": {
-            "title": "Mixed Nuts & Seeds",
-            "image": "https://spoonacular.com/recipeImages/nuts.jpg",
-            "readyInMinutes": 2,
-            "summary": "Protein-rich handful of nuts and seeds"
-        }
-    }
-    return fallback_recipes.get(meal_type, fallback_recipes["snack"])
-    """Initialize API clients (cached)."""
-    try:
-        gemini_client = GeminiClient()
-        spoonacular_client = SpoonacularClient()
-        ultrasound_analyzer = UltrasoundAnalyzer()
-        pcos_assessor = PCOSAssessment()
-        pdf_generator = PDFGenerator()
-        return gemini_client, spoonacular_client, ultrasound_analyzer, pcos_assessor, pdf_generator
-    except Exception as e:
-        st.error(f"Error initializing clients: {str(e)}")
-        st.info("Please check your .env file and ensure API keys are set correctly.")
-        return None, None, None, None, None
+@st.cache_resource
+def get_job_queue():
+    """Start the background job queue shared by all sessions."""
+    gemini_client, spoonacular_client, _, _, pdf_generator = get_clients()
+    job_queue = register_plan_jobs(JobQueue(), spoonacular_client, gemini_client, pdf_generator)
+    # Resumes jobs a previous server process left unfinished
+    job_queue.start()
+    return job_queue
 
 # Main app
 def main():
@@ -206,12 +189,15 @@ def main():
     # Initialize
     init_session_state()
     cities_config, pcos_rules, ui_config = load_config()
-    clients = get_clients()
     
-    if clients[0] is None:
+    missing_keys = [key for key in REQUIRED_API_KEYS if not os.getenv(key)]
+    if missing_keys:
+        st.error(f"Error initializing clients: {', '.join(missing_keys)} not found in environment variables")
+        st.info("Please check your .env file and ensure API keys are set correctly.")
         st.stop()
     
-    gemini_client, spoonacular_client, ultrasound_analyzer, pcos_assessor, pdf_generator = clients
+    gemini_client, spoonacular_client, ultrasound_analyzer, pcos_assessor, pdf_generator = get_clients()
+    job_queue = get_job_queue()
     
     # Sidebar
     with st.sidebar:
@@ -245,6 +231,49 @@ def main():
         st.metric("Total Patients", len(st.session_state.patients))
         st.metric("Active Plans", sum(1 for p in st.session_state.patients if p.get('has_meal_plan')))
         
+        job_counts = job_queue.counts()
+        active_jobs = job_counts.get(QUEUED, 0) + job_counts.get(RUNNING, 0)
+        if active_jobs:
+            st.metric("Background Jobs", active_jobs, help="Meal plans and PDF reports being generated")
+        
+        # Reading stats must not construct the clients
+        if spoonacular_client.is_initialized:
+            cache_stats = spoonacular_client.cache_stats()
+            if cache_stats:
+                st.metric(
+                    "Recipe Cache Hit Rate",
+                    f"{cache_stats['hit_ratio']:.0%}",
+                    help=f"{cache_stats['hits']} API calls saved, {cache_stats['misses']} fetched"
+                )
+            
+            quota_stats = spoonacular_client.quota_stats()
+            st.metric(
+                "API Points Left Today",
+                f"{quota_stats['remaining']:.0f} / {quota_stats['limit']:.0f}",
+                help="Spoonacular daily quota, shared by all sessions. Resets at midnight UTC."
+            )
+            quota_warning = spoonacular_client.quota_warning()
+            if quota_warning:
+                st.warning(f"⚠️ {quota_warning}")
+        
+        if gemini_client.is_initialized:
+            gemini_stats = gemini_client.call_stats()
+            if gemini_stats:
+                st.metric(
+                    "Gemini Tokens",
+                    f"{sum(t['input_tokens'] + t['output_tokens'] for t in gemini_stats.values()):,}",
+                    help=", ".join(
+                        f"{task}: {t['calls']} calls, {t['avg_latency']:.1f}s avg" for task, t in gemini_stats.items()
+                    )
+                )
+            
+            answer_stats = gemini_client.answer_cache_stats()
+            if answer_stats and answer_stats['hits']:
+                st.caption(
+                    f"💬 {answer_stats['hit_ratio']:.0%} of questions answered from cache "
+                    f"({answer_stats['latency_saved']:.0f}s saved)"
+                )
+        
         st.markdown("---")
         st.caption(ui_config['app_info']['footer_text'])
     
@@ -278,8 +307,7 @@ def main():
     with tab2:
         render_nutrition_tab(
             gemini_client,
-            spoonacular_client,
-            pdf_generator,
+            job_queue,
             city_info,
             selected_city,
             ui_config
@@ -296,6 +324,11 @@ def main():
     # TAB 4: PATIENT TRACKER
     with tab4:
         render_tracker_tab(ui_config)
+    
+    # Rerun while a job is in flight so its progress and planned days update on their own
+    if st.session_state.pop('poll_jobs', False):
+        time.sleep(JOB_POLL_INTERVAL)
+        st.rerun()
 
 # ==================== TAB 1: PATIENT ASSESSMENT ====================
 def render_assessment_tab(gemini_client, ultrasound_analyzer, pcos_assessor, ui_config):
@@ -368,35 +401,31 @@ def render_assessment_tab(gemini_client, ultrasound_analyzer, pcos_assessor, ui_
             # Display image
             st.image(ultrasound_file, caption="Uploaded Ultrasound", width=400)
             
+            # Reuse a previous analysis of this exact scan across reruns
+            image_bytes = ultrasound_file.getvalue()
+            ultrasound_result = ultrasound_analyzer.cached_result(image_bytes)
+            
             # Analyze button
             if st.button("🔍 Analyze Ultrasound", key="analyze_ultrasound"):
                 with st.spinner("Analyzing ultrasound image..."):
-                    # Save temporarily
-                    temp_path = f"/tmp/ultrasound_{datetime.now().timestamp()}.jpg"
-                    with open(temp_path, 'wb') as f:
-                        f.write(ultrasound_file.read())
-                    
-                    # Analyze
-                    ultrasound_result = ultrasound_analyzer.analyze_image(temp_path)
+                    ultrasound_result = ultrasound_analyzer.analyze_image(image_bytes)
+            
+            # Display results
+            if ultrasound_result:
+                if 'error' not in ultrasound_result:
+                    if ultrasound_result['pcos_pattern'] == 'positive':
+                        st.success(f"✅ PCOS Pattern Detected ({ultrasound_result['confidence']:.0f}% confidence)")
+                    else:
+                        st.info(f"ℹ️ No PCOS Pattern ({ultrasound_result['confidence']:.0f}% confidence)")
                     
-                    # Clean up
-                    os.remove(temp_path)
+                    st.write(f"**Cyst Count:** {ultrasound_result['cyst_count_estimate']}")
+                    st.write(f"**Volume:** {ultrasound_result['ovarian_volume_estimate']}")
+                    st.caption(ultrasound_result['interpretation'])
                     
-                    # Display results
-                    if 'error' not in ultrasound_result:
-                        if ultrasound_result['pcos_pattern'] == 'positive':
-                            st.success(f"✅ PCOS Pattern Detected ({ultrasound_result['confidence']:.0f}% confidence)")
-                        else:
-                            st.info(f"ℹ️ No PCOS Pattern ({ultrasound_result['confidence']:.0f}% confidence)")
-                        
-                        st.write(f"**Cyst Count:** {ultrasound_result['cyst_count_estimate']}")
-                        st.write(f"**Volume:** {ultrasound_result['ovarian_volume_estimate']}")
-                        st.caption(ultrasound_result['interpretation'])
-                        
-                        if 'note' in ultrasound_result:
-                            st.caption(f"⚠️ {ultrasound_result['note']}")
-                    else:
-                        st.error(ultrasound_result['error'])
+                    if 'note' in ultrasound_result:
+                        st.caption(f"⚠️ {ultrasound_result['note']}")
+                else:
+                    st.error(ultrasound_result['error'])
     
     st.markdown("---")
     
@@ -432,6 +461,13 @@ def render_assessment_tab(gemini_client, ultrasound_analyzer, pcos_assessor, ui_
                     'insulin_resistance': insulin_resistance
                 }
                 
+                # Start Gemini's detailed analysis while the local assessment runs
+                gemini_future = gemini_client.assess_pcos_risk_async(
+                    symptoms,
+                    ultrasound_result,
+                    patient_history
+                )
+                
                 # Rotterdam criteria evaluation
                 rotterdam_eval = pcos_assessor.evaluate_rotterdam_criteria(
                     symptoms,
@@ -442,12 +478,7 @@ def render_assessment_tab(gemini_client, ultrasound_analyzer, pcos_assessor, ui_
                 risk_score = pcos_assessor.calculate_risk_score(symptoms, patient_history)
                 
                 # Determine risk level
-                if risk_score >= 70:
-                    risk_level = "High"
-                elif risk_score >= 40:
-                    risk_level = "Medium"
-                else:
-                    risk_level = "Low"
+                risk_level = pcos_assessor.risk_level(risk_score)
                 
                 # Get recommendations
                 recommendations = pcos_assessor.get_recommendations(
@@ -456,12 +487,8 @@ def render_assessment_tab(gemini_client, ultrasound_analyzer, pcos_assessor, ui_
                     risk_score
                 )
                 
-                # Use Gemini for detailed analysis
-                gemini_assessment = gemini_client.assess_pcos_risk(
-                    symptoms,
-                    ultrasound_result,
-                    patient_history
-                )
+                # Collect Gemini's detailed analysis
+                gemini_assessment = gemini_future.result()
                 
                 # Combine results
                 assessment_result = {
@@ -532,7 +559,10 @@ def render_assessment_tab(gemini_client, ultrasound_analyzer, pcos_assessor, ui_
             with col_btn2:
                 if st.button("💾 Save Patient", use_container_width=True):
                     patient_record = assessment_result.copy()
-                    patient_record['has_meal_plan'] = False
+                    # A plan generated before saving belongs to this patient too
+                    patient_record['has_meal_plan'] = st.session_state.get('meal_plan_patient') == patient_name
+                    if patient_record['has_meal_plan']:
+                        patient_record['meal_plan_job'] = st.session_state.meal_plan_job
                     st.session_state.patients.append(patient_record)
                     st.success(f"Patient {patient_name} saved!")
             
@@ -542,7 +572,162 @@ def render_assessment_tab(gemini_client, ultrasound_analyzer, pcos_assessor, ui_
                     st.info("➡️ Go to 'Nutrition Prescription' tab to generate meal plan")
 
 # ==================== TAB 2: NUTRITION PRESCRIPTION ====================
-def render_nutrition_tab(gemini_client, spoonacular_client, pdf_generator, city_info, selected_city, ui_config):
+def render_day_meals(day_meals: Dict):
+    """Render one day's meals as four columns."""
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    for col, (meal_type, recipe) in zip([col1, col2, col3, col4], day_meals.items()):
+        with col:
+            st.markdown(f"**🍽️ {meal_type.title()}**")
+            if recipe and isinstance(recipe, dict):
+                if 'image' in recipe:
+                    try:
+                        st.image(recipe['image'], width=150)
+                    except:
+                        st.write("🍽️")
+                
+                # Title
+                title = recipe.get('title', 'Recipe')
+                st.markdown(f"**{title[:35]}{'...' if len(title) > 35 else ''}**")
+                
+                # Details
+                if 'readyInMinutes' in recipe:
+                    st.caption(f"⏱️ {recipe['readyInMinutes']} min")
+                
+                if 'servings' in recipe:
+                    st.caption(f"🍽️ {recipe['servings']} servings")
+                
+                # Show nutrition if available
+                if 'nutrition' in recipe and 'nutrients' in recipe['nutrition']:
+                    nutrients = recipe['nutrition']['nutrients']
+                    for nutrient in nutrients:
+                        if nutrient['name'] == 'Calories':
+                            st.caption(f"🔥 {int(nutrient['amount'])} cal")
+                            break
+            else:
+                st.info("Recipe info unavailable")
+
+
+def render_plan_job(job_queue):
+    """Show the submitted meal plan job's progress and load its result once it finishes."""
+    
+    job_id = st.session_state.plan_job
+    if not job_id or job_id == st.session_state.get('loaded_plan_job'):
+        return
+    
+    job = job_queue.status(job_id)
+    if job is None:
+        st.session_state.plan_job = None
+        st.query_params.pop('plan_job', None)
+        return
+    
+    if job['status'] in (QUEUED, RUNNING):
+        st.progress(job['progress'], text=f"🍳 {job['message'] if job['status'] == RUNNING else 'Waiting for a free worker'}...")
+        st.caption("You can keep assessing other patients; the plan keeps generating in the background.")
+        
+        if job['status'] == QUEUED and st.button("✖️ Cancel", key="plan_job_cancel"):
+            job_queue.cancel(job_id)
+        
+        # Days render as soon as the job has planned them
+        partial = job_queue.result(job_id) or {}
+        if partial.get('meal_plan'):
+            with st.expander("📅 Days planned so far", expanded=True):
+                for day_key, day_meals in partial['meal_plan'].items():
+                    if not day_meals:
+                        continue
+                    week_num, day_num = (int(part) for part in day_key[len("Week"):].split("_Day"))
+                    st.markdown(f"#### Week {week_num} · {DAY_NAMES[day_num - 1]}")
+                    render_day_meals(day_meals)
+        
+        st.session_state.poll_jobs = True
+        return
+    
+    st.session_state.loaded_plan_job = job_id
+    
+    if job['status'] == FAILED:
+        st.error(f"❌ Error generating meal plan: {job['error']}")
+        st.info("Please check your API keys and try again with fewer weeks.")
+        return
+    if job['status'] == CANCELLED:
+        return
+    
+    result = job_queue.result(job_id)
+    
+    for error in result['errors']:
+        st.warning(f"⚠️ {error} - Using fallback recipes")
+    if result.get('quota_warning'):
+        st.warning(f"⚠️ {result['quota_warning']}")
+    
+    # Update patient record
+    saved = False
+    for patient in st.session_state.patients:
+        if patient['patient_name'] == result['patient_name']:
+            patient['has_meal_plan'] = True
+            patient['meal_plan_job'] = job_id
+            saved = True
+            break
+    
+    # The clinician may have moved on to another patient while the job ran
+    if result['patient_name'] != st.session_state.current_assessment['patient_name']:
+        if saved:
+            st.info(f"✅ Meal plan for {result['patient_name']} is ready and opens when you return to them.")
+        else:
+            st.warning(f"⚠️ Meal plan for {result['patient_name']} finished, but they are not a saved patient, so it was not kept.")
+        return
+    
+    show_plan(job_queue, job_id, result)
+    
+    st.success(f"🎉 {result['plan']['weeks']}-week PCOS meal plan ready with {result['recipe_count']} recipes!")
+    
+    report = result['nutrition_report']
+    if report.get('days'):
+        st.caption(
+            f"🎯 {report['days_meeting_targets']}/{report['days']} days meet every daily PCOS target "
+            f"(protein {report['protein_days']}, fiber {report['fiber_days']}, "
+            f"sugar {report['sugar_days']}, glycemic load {report['glycemic_load_days']})"
+        )
+    st.balloons()
+
+
+def show_plan(job_queue, job_id, result):
+    """Make a finished meal plan job's plan the one the nutrition tab displays."""
+    
+    # Kept so later swaps only redo the affected slots; absent if the job ran in an earlier server process
+    builder = job_queue.attachment(job_id)
+    # The result is a JSON copy; swaps edit the builder's plan, so show that one
+    st.session_state.current_meal_plan = bind_builder(result['plan'], builder)
+    st.session_state.meal_plan_builder = builder
+    st.session_state.meal_plan_patient = result['patient_name']
+    st.session_state.meal_plan_job = job_id
+
+
+def load_patient_plan(job_queue, patient_name):
+    """
+    Show the selected patient's saved meal plan in place of another patient's.
+    
+    Args:
+        job_queue: Queue holding finished meal plan jobs
+        patient_name: Patient whose assessment is current
+    """
+    
+    if st.session_state.get('meal_plan_patient') == patient_name:
+        return
+    
+    st.session_state.current_meal_plan = None
+    st.session_state.meal_plan_builder = None
+    st.session_state.meal_plan_patient = None
+    st.session_state.meal_plan_job = None
+    
+    for patient in st.session_state.patients:
+        if patient['patient_name'] == patient_name and patient.get('meal_plan_job'):
+            job = job_queue.status(patient['meal_plan_job'])
+            if job is not None and job['status'] == DONE:
+                show_plan(job_queue, patient['meal_plan_job'], job_queue.result(patient['meal_plan_job']))
+            break
+
+
+def render_nutrition_tab(gemini_client, job_queue, city_info, selected_city, ui_config):
     """Render the nutrition prescription tab."""
     
     st.header("🍽️ PCOS Nutrition Prescription")
@@ -600,6 +785,12 @@ def render_nutrition_tab(gemini_client, spoonacular_client, pdf_generator, city_
             help="Generate meal plan for this many weeks"
         )
         
+        estimate_costs = st.checkbox(
+            "Estimate shopping costs with AI",
+            value=True,
+            help="The shopping list is built locally; this adds prices and tips from Gemini"
+        )
+        
         st.info(f"""
         **Location:** {selected_city}  
         **Cuisine:** {', '.join(city_info['cuisine_tags'])}  
@@ -610,144 +801,120 @@ def render_nutrition_tab(gemini_client, spoonacular_client, pdf_generator, city_
     
     # Generate button
     if st.button("🍳 Generate Personalized Meal Plan", type="primary", use_container_width=True):
-        with st.spinner(f"Creating {plan_weeks}-week PCOS meal plan for {selected_city}..."):
-            
-            # Progress tracking
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            try:
-                meal_plan = {}
-                all_recipes = []
-                total_days = plan_weeks * 7
-                current_progress = 0
+        # Runs on the job queue, so the plan survives a refresh and other tabs stay usable
+        job_id = job_queue.submit(MEAL_PLAN_JOB, {
+            'patient_name': assessment['patient_name'],
+            'city': selected_city,
+            'weeks': plan_weeks,
+            'intolerances': intolerances,
+            'dietary_restrictions': dietary_restrictions,
+            'budget': budget_level,
+            'estimate_costs': estimate_costs
+        })
+        st.session_state.plan_job = job_id
+        st.query_params['plan_job'] = job_id
+    
+    render_plan_job(job_queue)
+    load_patient_plan(job_queue, assessment['patient_name'])
+    
+    # Display meal plan if available
+    if st.session_state.current_meal_plan:
+        st.markdown("---")
+        st.markdown("### 📅 Your Meal Plan")
+        
+        meal_plan_data = st.session_state.current_meal_plan
+        builder = st.session_state.get('meal_plan_builder')
+        if builder is not None:
+            with st.expander("🔄 Swap Meals"):
+                swap_scope = st.radio("Swap", ["Meal", "Day", "Week"], horizontal=True)
+                
+                scol1, scol2, scol3 = st.columns(3)
+                with scol1:
+                    swap_week = st.selectbox(
+                        "Week",
+                        list(range(1, meal_plan_data['weeks'] + 1)),
+                        format_func=lambda w: f"Week {w}",
+                        key="swap_week"
+                    )
+                with scol2:
+                    swap_day = st.selectbox(
+                        "Day",
+                        list(range(1, 8)),
+                        format_func=lambda d: DAY_NAMES[d - 1],
+                        key="swap_day",
+                        disabled=swap_scope == "Week"
+                    )
+                with scol3:
+                    swap_meal = st.selectbox(
+                        "Meal",
+                        MEAL_TYPES,
+                        format_func=str.title,
+                        key="swap_meal",
+                        disabled=swap_scope != "Meal"
+                    )
                 
-                # Get varied cuisines for diversity
-                cuisines = [city_info['spoonacular_cuisine'], "Mediterranean", "Asian"]
-                cuisine_idx = 0
+                apply_restrictions = st.checkbox(
+                    "Apply the dietary restrictions and budget selected above",
+                    value=dietary_restrictions != meal_plan_data.get('dietary_restrictions')
+                )
                 
-                # Generate for each week
-                for week in range(1, plan_weeks + 1):
-                    status_text.text(f"🍳 Generating Week {week} recipes...")
+                if st.button("🔄 Swap", use_container_width=True):
+                    slots = builder.slots_in(
+                        swap_week,
+                        day=None if swap_scope == "Week" else swap_day,
+                        meal_type=swap_meal if swap_scope == "Meal" else None
+                    )
                     
-                    # Generate for each day
-                    for day in range(1, 8):
-                        day_key = f"Week{week}_Day{day}"
-                        
-                        # Rotate cuisines for variety
-                        day_cuisine = cuisines[cuisine_idx % len(cuisines)]
-                        cuisine_idx += 1
+                    with st.spinner("Swapping..."):
+                        from utils.plan_updates import (
+                            ingredient_changes, plan_ingredients, update_adaptation, update_shopping_list
+                        )
                         
-                        status_text.text(f"📅 Week {week}, Day {day} - {day_cuisine} cuisine")
+                        start = time.perf_counter()
+                        recipes_before = builder.selected_recipes()
+                        changes = builder.swap(slots, intolerances=intolerances if apply_restrictions else None)
+                        bind_builder(meal_plan_data, builder)
+                        recipes_after = builder.selected_recipes()
+                        added, removed = ingredient_changes(plan_ingredients(recipes_before), plan_ingredients(recipes_after))
                         
-                        # Get recipes for each meal
-                        day_meals = {}
+                        if apply_restrictions:
+                            meal_plan_data['dietary_restrictions'] = dietary_restrictions
+                            meal_plan_data['budget'] = budget_level
                         
-                        for meal_type in ["breakfast", "lunch", "dinner", "snack"]:
-                            try:
-                                recipes = spoonacular_client.search_pcos_recipes(
-                                    cuisine=day_cuisine,
-                                    meal_type=meal_type,
-                                    dietary_restrictions=intolerances,
-                                    number=2  # Get 2 options
-                                )
-                                
-                                # Check for API errors
-                                if 'error' in recipes:
-                                    st.warning(f"⚠️ {recipes['error']} - Using fallback recipes")
-                                    day_meals[meal_type] = get_fallback_recipe(meal_type)
-                                elif recipes.get('results') and len(recipes['results']) > 0:
-                                    # Pick a random recipe from results for variety
-                                    import random
-                                    day_meals[meal_type] = random.choice(recipes['results'])
-                                    all_recipes.append(day_meals[meal_type])
-                                else:
-                                    # No results, use fallback
-                                    day_meals[meal_type] = get_fallback_recipe(meal_type)
-                                
-                            except Exception as e:
-                                print(f"Error fetching {meal_type}: {e}")
-                                day_meals[meal_type] = get_fallback_recipe(meal_type)
+                        cost_before = 'total_estimated_cost' in meal_plan_data['shopping_list']
+                        meal_plan_data['shopping_list'] = update_shopping_list(
+                            meal_plan_data['shopping_list'],
+                            recipes_after,
+                            city_info
+                        )
                         
-                        meal_plan[day_key] = day_meals
+                        try:
+                            meal_plan_data['adapted_recipes'] = update_adaptation(
+                                meal_plan_data['adapted_recipes'],
+                                recipes_before,
+                                recipes_after,
+                                gemini_client,
+                                meal_plan_data['city'],
+                                city_info,
+                                {
+                                    'dietary_restrictions': meal_plan_data['dietary_restrictions'],
+                                    'budget': meal_plan_data.get('budget', budget_level)
+                                }
+                            )
+                        except Exception as e:
+                            print(f"Adaptation update failed: {e}")
                         
-                        # Update progress
-                        current_progress += 1
-                        progress_bar.progress(current_progress / (total_days + 2))
-                
-                # Adapt recipes to location using Gemini
-                status_text.text("🌍 Adapting recipes to local ingredients...")
-                progress_bar.progress(0.9)
-                
-                if all_recipes:
-                    try:
-                        adapted_recipes = gemini_client.customize_recipes_for_location(
-                            all_recipes[:7],  # Sample 7 recipes for adaptation tips
-                            selected_city,
-                            city_info,
-                            {'dietary_restrictions': dietary_restrictions, 'budget': budget_level}
+                        elapsed = time.perf_counter() - start
+                    
+                    if changes:
+                        st.success(
+                            f"✅ Swapped {len(changes)} of {len(slots)} meals in {elapsed:.2f}s "
+                            f"({len(added)} ingredients added, {len(removed)} removed from the shopping list)"
                         )
-                    except Exception as e:
-                        print(f"Gemini adaptation failed: {e}")
-                        adapted_recipes = {"tips": ["Use local seasonal produce", "Shop at local markets for freshness"]}
-                else:
-                    adapted_recipes = {"tips": ["Focus on whole grains and vegetables", "Include protein with each meal"]}
-                
-                # Generate shopping list
-                status_text.text("🛒 Creating shopping list...")
-                progress_bar.progress(0.95)
-                
-                try:
-                    shopping_list = gemini_client.generate_shopping_list(
-                        meal_plan,
-                        selected_city,
-                        city_info,
-                        num_people=1
-                    )
-                except Exception as e:
-                    print(f"Shopping list generation failed: {e}")
-                    shopping_list = {
-                        "categories": {
-                            "Vegetables": [{"item": "Mixed vegetables", "quantity": "As needed", "where": "Local market"}],
-                            "Proteins": [{"item": "Eggs, Legumes, Fish", "quantity": "Weekly supply", "where": "Grocery"}],
-                            "Grains": [{"item": "Brown rice, Whole wheat", "quantity": "2 kg", "where": "Grocery"}]
-                        },
-                        "total_estimated_cost": f"{city_info['currency_symbol']}1500-2000"
-                    }
-                
-                # Store in session state
-                st.session_state.current_meal_plan = {
-                    'meal_plan': meal_plan,
-                    'adapted_recipes': adapted_recipes,
-                    'shopping_list': shopping_list,
-                    'city': selected_city,
-                    'weeks': plan_weeks,
-                    'dietary_restrictions': dietary_restrictions
-                }
-                
-                # Update patient record
-                if st.session_state.current_assessment:
-                    for patient in st.session_state.patients:
-                        if patient['patient_name'] == st.session_state.current_assessment['patient_name']:
-                            patient['has_meal_plan'] = True
-                            break
-                
-                progress_bar.progress(1.0)
-                status_text.text("✅ Meal plan generated successfully!")
-                
-                st.success(f"🎉 {plan_weeks}-week PCOS meal plan ready with {len(all_recipes)} recipes!")
-                st.balloons()
-                
-            except Exception as e:
-                st.error(f"❌ Error generating meal plan: {str(e)}")
-                st.info("Please check your API keys and try again with fewer weeks.")
-    
-    # Display meal plan if available
-    if st.session_state.current_meal_plan:
-        st.markdown("---")
-        st.markdown("### 📅 Your Meal Plan")
-        
-        meal_plan_data = st.session_state.current_meal_plan
+                        if cost_before and 'total_estimated_cost' not in meal_plan_data['shopping_list']:
+                            st.caption("💡 The weekly cost estimate no longer matches the list; generate a new plan to re-estimate it.")
+                    else:
+                        st.info("No alternative recipes available for that selection.")
         
         # Week selector
         selected_week = st.selectbox(
@@ -762,44 +929,9 @@ def render_nutrition_tab(gemini_client, spoonacular_client, pdf_generator, city_
             day_key = f"Week{week_num}_Day{day}"
             
             if day_key in meal_plan_data['meal_plan']:
-                day_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-                st.markdown(f"### 📅 {day_names[day-1]} (Day {day})")
-                
-                day_meals = meal_plan_data['meal_plan'][day_key]
+                st.markdown(f"### 📅 {DAY_NAMES[day-1]} (Day {day})")
                 
-                # Create 4 columns for each meal
-                col1, col2, col3, col4 = st.columns(4)
-                
-                for col, (meal_type, recipe) in zip([col1, col2, col3, col4], day_meals.items()):
-                    with col:
-                        st.markdown(f"**🍽️ {meal_type.title()}**")
-                        if recipe and isinstance(recipe, dict):
-                            if 'image' in recipe:
-                                try:
-                                    st.image(recipe['image'], width=150)
-                                except:
-                                    st.write("🍽️")
-                            
-                            # Title
-                            title = recipe.get('title', 'Recipe')
-                            st.markdown(f"**{title[:35]}{'...' if len(title) > 35 else ''}**")
-                            
-                            # Details
-                            if 'readyInMinutes' in recipe:
-                                st.caption(f"⏱️ {recipe['readyInMinutes']} min")
-                            
-                            if 'servings' in recipe:
-                                st.caption(f"🍽️ {recipe['servings']} servings")
-                            
-                            # Show nutrition if available
-                            if 'nutrition' in recipe and 'nutrients' in recipe['nutrition']:
-                                nutrients = recipe['nutrition']['nutrients']
-                                for nutrient in nutrients:
-                                    if nutrient['name'] == 'Calories':
-                                        st.caption(f"🔥 {int(nutrient['amount'])} cal")
-                                        break
-                        else:
-                            st.info("Recipe info unavailable")
+                render_day_meals(meal_plan_data['meal_plan'][day_key])
                 
                 st.markdown("---")
         
@@ -821,31 +953,24 @@ def render_nutrition_tab(gemini_client, spoonacular_client, pdf_generator, city_
         st.markdown("---")
         
         if st.button("📄 Download PDF Report", type="primary"):
-            with st.spinner("Generating professional PDF report..."):
-                try:
-                    pdf_path = f"/tmp/meal_plan_{assessment['patient_name']}_{datetime.now().timestamp()}.pdf"
-                    
-                    pdf_generator.generate_meal_plan_pdf(
-                        assessment['patient_name'],
-                        meal_plan_data['meal_plan'],
-                        shopping_data,
-                        assessment,
-                        pdf_path,
-                        selected_city
-                    )
-                    
-                    with open(pdf_path, 'rb') as f:
-                        st.download_button(
-                            label="⬇️ Download Meal Plan PDF",
-                            data=f,
-                            file_name=f"OvaWell_MealPlan_{assessment['patient_name']}.pdf",
-                            mime="application/pdf"
-                        )
-                    
-                    st.success("PDF generated! Click button above to download.")
-                    
-                except Exception as e:
-                    st.error(f"Error generating PDF: {str(e)}")
+            job_id = job_queue.submit(MEAL_PLAN_PDF_JOB, meal_plan_pdf_params(meal_plan_data, assessment))
+            st.session_state.pdf_job = job_id
+            st.query_params['pdf_job'] = job_id
+        
+        pdf_job = job_queue.status(st.session_state.pdf_job) if st.session_state.pdf_job else None
+        if pdf_job is not None:
+            if pdf_job['status'] in (QUEUED, RUNNING):
+                st.info("⏳ Generating professional PDF report...")
+                st.session_state.poll_jobs = True
+            elif pdf_job['status'] == DONE:
+                st.download_button(
+                    label="⬇️ Download Meal Plan PDF",
+                    data=job_queue.result(pdf_job['id']),
+                    file_name=f"OvaWell_MealPlan_{pdf_job['params']['patient_name']}.pdf",
+                    mime="application/pdf"
+                )
+            elif pdf_job['status'] == FAILED:
+                st.error(f"Error generating PDF: {pdf_job['error']}")
 
 # ==================== TAB 3: LEFTOVER RECIPE FINDER ====================
 def render_leftover_tab(spoonacular_client, city_info, ui_config):
@@ -928,6 +1053,8 @@ def render_tracker_tab(ui_config):
         st.info(ui_config['messages']['no_patients'])
         return
     
+    import pandas as pd
+    
     # Convert to DataFrame
     df = pd.DataFrame(st.session_state.patients)
     
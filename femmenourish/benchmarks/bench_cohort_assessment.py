@@ -0,0 +1,100 @@
+"""
+Benchmark: cohort Rotterdam evaluation vs the per-patient scalar path.
+
+Usage (from the femmenourish directory):
+    python benchmarks/bench_cohort_assessment.py --rows 50000
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from utils.assessment import PCOSAssessment
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "pcos_rules.json")
+
+SYMPTOM_KEYS = ("periods_per_year", "cycle_length", "hirsutism", "acne", "hair_loss", "testosterone_elevated")
+HISTORY_KEYS = ("family_history", "bmi", "insulin_resistance", "metabolic_syndrome")
+
+
+def synthetic_cohort(rng: random.Random, n: int) -> pd.DataFrame:
+    """Registry-like records with about 5% missing cells per column."""
+    def maybe(value):
+        return float("nan") if rng.random() < 0.05 else value
+
+    return pd.DataFrame({
+        "periods_per_year": [maybe(rng.randint(2, 13)) for _ in range(n)],
+        "cycle_length": [maybe(rng.randint(21, 60)) for _ in range(n)],
+        "hirsutism": [maybe(rng.random() < 0.3) for _ in range(n)],
+        "acne": [maybe(rng.random() < 0.35) for _ in range(n)],
+        "hair_loss": [maybe(rng.random() < 0.15) for _ in range(n)],
+        "testosterone_elevated": [maybe(rng.random() < 0.2) for _ in range(n)],
+        "family_history": [maybe(rng.random() < 0.25) for _ in range(n)],
+        "bmi": [maybe(round(rng.uniform(17, 42), 1)) for _ in range(n)],
+        "insulin_resistance": [maybe(rng.random() < 0.3) for _ in range(n)],
+        "metabolic_syndrome": [maybe(rng.random() < 0.15) for _ in range(n)],
+        "pcos_pattern": [rng.choice(["positive", "negative", float("nan")]) for _ in range(n)],
+    })
+
+
+def row_inputs(row: dict):
+    """Scalar-path arguments for a record; NaN cells become missing keys."""
+    present = {k: v for k, v in row.items() if not (isinstance(v, float) and math.isnan(v))}
+    symptoms = {k: present[k] for k in SYMPTOM_KEYS if k in present}
+    history = {k: present[k] for k in HISTORY_KEYS if k in present}
+    ultrasound = {"pcos_pattern": present["pcos_pattern"]} if "pcos_pattern" in present else None
+    return symptoms, ultrasound, history
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--scalar-rows", type=int, default=5000, help="Rows timed (and checked) on the scalar path")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    assessor = PCOSAssessment(CONFIG_PATH)
+    cohort = synthetic_cohort(random.Random(args.seed), args.rows)
+
+    start = time.perf_counter()
+    result = assessor.evaluate_cohort(cohort)
+    cohort_time = time.perf_counter() - start
+
+    sample = cohort.head(args.scalar_rows).to_dict("records")
+    start = time.perf_counter()
+    scalar = []
+    for row in sample:
+        symptoms, ultrasound, history = row_inputs(row)
+        evaluation = assessor.evaluate_rotterdam_criteria(symptoms, ultrasound)
+        scalar.append((evaluation, assessor.calculate_risk_score(symptoms, history)))
+    scalar_time = time.perf_counter() - start
+
+    mismatches = 0
+    for (evaluation, risk), row in zip(scalar, result.head(len(sample)).to_dict("records")):
+        met = set(evaluation["criteria_met"])
+        if (
+            evaluation["criteria_count"] != row["criteria_count"]
+            or evaluation["diagnosis"] != row["diagnosis"]
+            or evaluation["phenotype"] != row["phenotype"]
+            or risk != row["risk_score"]
+            or any((name in met) != row[name] for name in ("oligoanovulation", "hyperandrogenism", "polycystic_ovaries"))
+        ):
+            mismatches += 1
+
+    print(f"Rows:            {args.rows}")
+    print(f"Cohort path:     {cohort_time * 1000:.0f} ms ({args.rows / cohort_time:,.0f} rows/sec)")
+    print(f"Scalar path:     {scalar_time * 1000:.0f} ms for {len(sample)} rows ({len(sample) / scalar_time:,.0f} rows/sec)")
+    print(f"Parity:          {len(sample) - mismatches}/{len(sample)} rows identical")
+    print(f"Diagnosed PCOS:  {(result['diagnosis'] == 'PCOS').mean():.1%}, "
+          f"phenotypes {result['phenotype'].value_counts().to_dict()}")
+
+
+if __name__ == "__main__":
+    main()
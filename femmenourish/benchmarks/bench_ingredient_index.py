@@ -0,0 +1,85 @@
+"""
+Benchmark: leftover ingredient matching against a large local corpus.
+
+Usage (from the femmenourish directory):
+    python benchmarks/bench_ingredient_index.py --recipes 100000 --queries 500
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.ingredient_index import IngredientIndex
+from utils.recipe_scoring import build_nutrient_matrix, pcos_friendly_mask, pcos_scores
+
+BASE_INGREDIENTS = [
+    "chicken", "salmon", "tofu", "lentil", "chickpea", "egg", "spinach", "kale", "broccoli", "tomato",
+    "onion", "garlic", "ginger", "bell pepper", "zucchini", "carrot", "cauliflower", "quinoa", "brown rice",
+    "oat", "greek yogurt", "almond", "walnut", "chia seed", "flaxseed", "avocado", "mushroom", "cucumber",
+    "lemon", "lime", "cumin", "turmeric", "coriander", "paneer", "black bean", "sweet potato", "feta",
+    "olive", "basil", "parsley", "cinnamon", "blueberry", "strawberry", "apple", "pear", "cabbage",
+]
+MODIFIERS = ["", "", "", "fresh", "dried", "ground", "red", "green", "baby", "roasted", "boneless"]
+PANTRY = ["salt", "water", "olive oil", "black pepper"]
+
+
+def synthetic_corpus(rng: random.Random, n: int):
+    """Build ingredient postings and nutrition payloads for n recipes."""
+    vocabulary = [f"{m} {b}".strip() for b in BASE_INGREDIENTS for m in MODIFIERS]
+    postings = {}
+    payloads = []
+
+    for row in range(n):
+        names = set(rng.sample(vocabulary, rng.randint(4, 14))) | set(rng.sample(PANTRY, 2))
+        for name in names:
+            postings.setdefault(name, []).append(row)
+        payloads.append({"nutrients": [
+            {"name": "Sugar", "amount": rng.uniform(0, 40)},
+            {"name": "Protein", "amount": rng.uniform(0, 50)},
+            {"name": "Fiber", "amount": rng.uniform(0, 15)},
+        ]})
+
+    return postings, payloads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    postings, payloads = synthetic_corpus(rng, args.recipes)
+    matrix = build_nutrient_matrix(payloads)
+
+    start = time.perf_counter()
+    index = IngredientIndex(postings, args.recipes, pcos_friendly_mask(*matrix), pcos_scores(*matrix))
+    build_time = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(args.queries):
+        query = rng.sample(BASE_INGREDIENTS, rng.randint(2, 6))
+        start = time.perf_counter()
+        found = index.match(query, number=5)
+        latencies.append(time.perf_counter() - start)
+        assert np.all(np.diff(found["missed"]) >= 0), "results not ordered by missed ingredients"
+
+    latencies.sort()
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+
+    print(f"Recipes:          {args.recipes} ({len(postings)} distinct ingredients)")
+    print(f"Index build:      {build_time * 1000:.0f} ms")
+    print(f"Query p50 / p95:  {statistics.median(latencies) * 1000:.2f} / {p95 * 1000:.2f} ms "
+          f"over {args.queries} queries")
+
+
+if __name__ == "__main__":
+    main()
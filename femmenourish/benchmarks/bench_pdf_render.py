@@ -0,0 +1,113 @@
+"""
+Benchmark: meal plan PDF renders/sec and peak memory.
+
+Usage (from the femmenourish directory):
+    python benchmarks/bench_pdf_render.py --renders 50 --weeks 4
+
+Rows:
+    cold    new PDFGenerator per render, so styles and static sections are
+            rebuilt every time; written to a temp file and read back (the
+            old download path)
+    disk    shared generator, written to a temp file and read back
+    memory  shared generator, rendered into a BytesIO and returned as bytes
+Peak memory is the tracemalloc high-water mark of a single render.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.meal_planner import MEAL_TYPES
+from utils.pdf_generator import PDFGenerator
+
+TITLES = [
+    "Spinach Moong Dal Chilla", "Grilled Paneer Tikka Bowl", "Quinoa Vegetable Upma", "Baked Salmon with Greens",
+    "Chickpea Spinach Curry", "Ragi Dosa with Sambar", "Lentil Soup", "Greek Yogurt with Berries",
+]
+CATEGORIES = ["Vegetables", "Proteins", "Whole Grains & Millets", "Dairy & Alternatives", "Spices & Condiments"]
+
+
+def synthetic_report(rng: random.Random, weeks: int):
+    """Meal plan, shopping list and assessment shaped like the app's."""
+    meal_plan = {
+        f"Week{week}_Day{day}": {
+            meal_type: {"id": rng.randint(1, 10 ** 6), "title": rng.choice(TITLES)} for meal_type in MEAL_TYPES
+        }
+        for week in range(1, weeks + 1)
+        for day in range(1, 8)
+    }
+    shopping_list = {
+        "categories": {
+            category: [
+                {"item": f"{category.split()[0]} item {i}", "quantity": f"{rng.randint(1, 900)} g", "where": "D-Mart"}
+                for i in range(rng.randint(4, 12))
+            ]
+            for category in CATEGORIES
+        },
+        "total_estimated_cost": "₹2,450",
+        "shopping_tips": ["Buy seasonal vegetables at local markets", "Buy grains and pulses in bulk"],
+    }
+    assessment = {
+        "risk_level": "High",
+        "phenotype": "A",
+        "rotterdam_score": 3,
+        "criteria_met": ["oligoanovulation", "hyperandrogenism", "polycystic_ovaries"],
+    }
+    return meal_plan, shopping_list, assessment
+
+
+def render_via_file(generator: PDFGenerator, report) -> bytes:
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    try:
+        generator.generate_meal_plan_pdf("Benchmark Patient", *report, output_path=path, city="Pune")
+        with open(path, 'rb') as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--renders", type=int, default=50)
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    report = synthetic_report(random.Random(args.seed), args.weeks)
+    shared = PDFGenerator()
+
+    modes = {
+        "cold": lambda: render_via_file(PDFGenerator(), report),
+        "disk": lambda: render_via_file(shared, report),
+        "memory": lambda: shared.generate_meal_plan_pdf("Benchmark Patient", *report, city="Pune"),
+    }
+
+    # Warm-up imports ReportLab and builds the shared generator's templates
+    for render in modes.values():
+        render()
+
+    print(f"{'Mode':<8} {'Renders/sec':>12} {'ms/render':>10} {'Peak KiB':>10} {'PDF KiB':>8}")
+    for name, render in modes.items():
+        start = time.perf_counter()
+        for _ in range(args.renders):
+            pdf = render()
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        render()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"{name:<8} {args.renders / elapsed:>12.1f} {elapsed / args.renders * 1000:>10.1f} "
+              f"{peak / 1024:>10.0f} {len(pdf) / 1024:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: Streamlit cold-start cost of `import app`.
+
+Usage (from the femmenourish directory):
+    python benchmarks/bench_startup.py --runs 5
+
+Each run imports the app in a fresh interpreter and reports wall time,
+peak RSS and which heavy dependencies were loaded. The --eager row
+pre-imports those dependencies first to reproduce the old start-up cost.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = [
+    "google.generativeai",
+    "reportlab.platypus",
+    "cv2",
+    "PIL.Image",
+    "pandas",
+    "numpy",
+    "requests",
+]
+
+CHILD_SCRIPT = """
+import importlib, json, resource, sys, time, warnings
+warnings.filterwarnings("ignore")
+eager = {eager}
+start = time.perf_counter()
+for name in (eager or []):
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        pass
+import app
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+loaded = [m for m in {heavy} if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "rss_mb": rss_kb / 1024, "loaded": loaded}}))
+"""
+
+
+def run_once(eager: bool) -> dict:
+    """Import the app in a fresh interpreter and return its measurements."""
+    script = CHILD_SCRIPT.format(eager=HEAVY_MODULES if eager else None, heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def report(label: str, runs: list) -> None:
+    seconds = [r["seconds"] for r in runs]
+    rss = [r["rss_mb"] for r in runs]
+    print(f"{label:<8} import: median {statistics.median(seconds) * 1000:7.0f} ms "
+          f"(min {min(seconds) * 1000:.0f}) | peak RSS {statistics.median(rss):6.1f} MB")
+    print(f"{'':<8} heavy modules loaded: {', '.join(runs[-1]['loaded']) or 'none'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app import time and memory.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    lazy = [run_once(eager=False) for _ in range(args.runs)]
+    eager = [run_once(eager=True) for _ in range(args.runs)]
+
+    report("lazy", lazy)
+    report("eager", eager)
+
+    saved = statistics.median(r["seconds"] for r in eager) - statistics.median(r["seconds"] for r in lazy)
+    print(f"Deferred imports save ~{saved * 1000:.0f} ms per worker start")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+OvaWell Recipe Corpus Ingest
+Fills the offline recipe corpus that meal-plan searches are answered from.
+
+Usage:
+    # Pull PCOS-friendly searches from Spoonacular (uses API quota)
+    python ingest_recipes.py --cuisines Indian Mediterranean Asian --number 20
+
+    # Import a local JSON dump (list of recipes, or {"results": [...]} / {"recipes": [...]})
+    python ingest_recipes.py --dump recipes_dump.json
+
+Recipes are merged by id, so rerunning either mode only adds what is new.
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.meal_planner import MEAL_TYPES
+from utils.recipe_corpus import RecipeCorpus
+
+
+def load_dump(path: str) -> List[Dict]:
+    """Read recipes from a JSON dump in any of the common Spoonacular shapes."""
+    with open(path, 'r') as f:
+        data = json.load(f)
+
+    if isinstance(data, dict):
+        data = data.get("results") or data.get("recipes") or []
+    return [recipe for recipe in data if isinstance(recipe, dict) and "id" in recipe]
+
+
+def ingest_from_api(
+    corpus: RecipeCorpus,
+    cuisines: List[str],
+    meal_types: List[str],
+    intolerances: List[str],
+    number: int
+) -> int:
+    """
+    Run one PCOS search per cuisine and meal type and add the results.
+    Stops early when the remaining daily quota cannot cover the next search.
+
+    Returns:
+        Number of new recipes added
+    """
+    from utils.spoonacular_client import SpoonacularClient
+
+    # Skip the corpus inside the client so every search reaches the API
+    client = SpoonacularClient(use_corpus=False)
+    added = 0
+
+    for cuisine in cuisines:
+        for meal_type in meal_types:
+            points = client.estimate_search_points(cuisine, meal_type, intolerances, number)
+            if not client.can_afford(points):
+                print(f"⚠️ Daily quota too low for {cuisine} {meal_type} - stopping (resets at midnight UTC)")
+                return added
+
+            result = client.search_pcos_recipes(cuisine, meal_type, intolerances, number)
+            if "error" in result:
+                print(f"  {cuisine} {meal_type}: {result['error']}")
+                continue
+
+            new = corpus.add_recipes(result.get("results", []), save=False)
+            corpus.save()
+            added += new
+            print(f"  {cuisine} {meal_type}: {len(result.get('results', []))} recipes ({new} new)")
+
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline recipe corpus.")
+    parser.add_argument("--dump", help="Import recipes from a local JSON dump instead of the API")
+    parser.add_argument("--corpus", help="Corpus directory (defaults to data/corpus)")
+    parser.add_argument("--cuisines", nargs="+", default=["Indian", "Mediterranean", "Asian"])
+    parser.add_argument("--meal-types", nargs="+", default=MEAL_TYPES)
+    parser.add_argument("--intolerances", nargs="*", default=[], help="Spoonacular intolerances, e.g. dairy gluten")
+    parser.add_argument("--number", type=int, default=10, help="Recipes per search")
+    args = parser.parse_args()
+
+    corpus = RecipeCorpus(args.corpus)
+    print(f"📚 Corpus has {len(corpus)} recipes")
+
+    if args.dump:
+        recipes = load_dump(args.dump)
+        added = corpus.add_recipes(recipes)
+        print(f"📥 Imported {len(recipes)} recipes from {args.dump} ({added} new)")
+    else:
+        added = ingest_from_api(corpus, args.cuisines, args.meal_types, args.intolerances, args.number)
+
+    stats = corpus.stats()
+    print(f"✅ Corpus now has {stats['recipes']} recipes (+{added}), "
+          f"{stats['cuisine_values']} cuisines, {stats['ingredient_values']} ingredients indexed")
+
+
+if __name__ == "__main__":
+    main()
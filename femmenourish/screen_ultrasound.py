@@ -0,0 +1,258 @@
+"""
+OvaWell Ultrasound Screening CLI
+Runs UltrasoundAnalyzer over a directory tree of scans outside the Streamlit UI.
+
+Usage:
+    python screen_ultrasound.py data/ultrasound --output results/screening.jsonl \
+        --workers 4 --model-path models/pcos_ultrasound_model.h5
+
+Results are appended to the JSONL output as they complete, so an interrupted
+run resumes where it stopped. Images whose record is an error or a fallback
+are screened again on the next run; the latest record per image counts.
+Images under `infected/` and `notinfected/` folders (the Kaggle layout in
+DATASET_SETUP.md) are treated as labelled positive and negative for the
+accuracy summary.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Set
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+LABEL_DIRECTORIES = {
+    "infected": "positive",
+    "notinfected": "negative"
+}
+
+# Analyzer methods that stand in for a real prediction, as in UltrasoundAnalyzer's cache
+FALLBACK_METHODS = ("clinical_assessment",)
+
+# Set in each worker process by _init_worker
+_analyzer = None
+_batch_size = 32
+
+
+def find_images(root: str) -> List[str]:
+    """Walk a directory tree and return image paths in a stable order."""
+    images = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                images.append(os.path.join(dirpath, filename))
+    return images
+
+
+def label_for(path: str) -> Optional[str]:
+    """Infer the ground-truth label from the nearest labelled parent folder."""
+    for part in reversed(os.path.normpath(path).split(os.sep)[:-1]):
+        if part.lower() in LABEL_DIRECTORIES:
+            return LABEL_DIRECTORIES[part.lower()]
+    return None
+
+
+def needs_retry(record: Dict) -> bool:
+    """Check whether a result record is an error or fallback that should be screened again."""
+    return bool(record.get("error")) or record.get("method") in FALLBACK_METHODS
+
+
+def read_records(output_path: str) -> Dict[str, Dict]:
+    """
+    Read the output file into the latest record per path.
+    A truncated final line from an interrupted write is ignored.
+    """
+    records = {}
+    if not os.path.exists(output_path):
+        return records
+
+    with open(output_path, 'r') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                records[record["path"]] = record
+            except (ValueError, KeyError, TypeError):
+                continue
+    return records
+
+
+def load_checkpoint(output_path: str) -> Set[str]:
+    """Paths already screened successfully; errors and fallbacks are left to retry."""
+    return {path for path, record in read_records(output_path).items() if not needs_retry(record)}
+
+
+def end_last_line(output_path: str) -> None:
+    """Terminate a truncated final line, so appended records start on a line of their own."""
+    if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        return
+
+    with open(output_path, 'rb+') as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+
+def _init_worker(model_path: Optional[str], batch_size: int) -> None:
+    """Create one analyzer per worker process."""
+    global _analyzer, _batch_size
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from utils.image_analyzer import UltrasoundAnalyzer
+
+    _analyzer = UltrasoundAnalyzer(model_path=model_path)
+    _batch_size = batch_size
+
+
+def _analyze_chunk(paths: List[str]) -> List[Dict]:
+    """
+    Analyze a chunk of images in a worker process.
+    With a trained model the chunk is one batched predict and latency is
+    amortized per image; otherwise each image is timed individually.
+    """
+    records = []
+
+    if _analyzer.model:
+        start = time.perf_counter()
+        results = [result for _, result in _analyzer.analyze_batch(paths, batch_size=_batch_size)]
+        latency = (time.perf_counter() - start) / max(1, len(paths))
+        timed = [(result, latency) for result in results]
+    else:
+        timed = []
+        for path in paths:
+            start = time.perf_counter()
+            result = _analyzer.analyze_image(path)
+            timed.append((result, time.perf_counter() - start))
+
+    for path, (result, latency) in zip(paths, timed):
+        records.append({
+            "path": path,
+            "label": label_for(path),
+            "prediction": result.get("pcos_pattern"),
+            "confidence": result.get("confidence"),
+            "method": result.get("method"),
+            "error": result.get("error"),
+            "latency_ms": round(latency * 1000, 2),
+            "result": result
+        })
+
+    return records
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(output_path: str, processed: int, elapsed: float) -> None:
+    """Print throughput, latency percentiles and accuracy over the latest result per image."""
+    records = list(read_records(output_path).values())
+
+    latencies = [r["latency_ms"] for r in records if r.get("latency_ms") is not None]
+    errors = sum(1 for r in records if r.get("error"))
+
+    print("\n📊 Screening Summary")
+    print(f"  Images recorded:   {len(records)} ({processed} this run, {errors} errors)")
+    if processed and elapsed > 0:
+        print(f"  Throughput:        {processed / elapsed:.2f} images/sec")
+    print(f"  Latency p50/p95/p99: {percentile(latencies, 50):.1f} / "
+          f"{percentile(latencies, 95):.1f} / {percentile(latencies, 99):.1f} ms")
+
+    labelled = [r for r in records if r.get("label")]
+    if not labelled:
+        return
+
+    decided = [r for r in labelled if r.get("prediction") in ("positive", "negative")]
+    correct = sum(1 for r in decided if r["prediction"] == r["label"])
+    tp = sum(1 for r in decided if r["label"] == "positive" and r["prediction"] == "positive")
+    fn = sum(1 for r in decided if r["label"] == "positive" and r["prediction"] == "negative")
+    tn = sum(1 for r in decided if r["label"] == "negative" and r["prediction"] == "negative")
+    fp = sum(1 for r in decided if r["label"] == "negative" and r["prediction"] == "positive")
+
+    print(f"  Labelled images:   {len(labelled)} ({len(labelled) - len(decided)} inconclusive/errors)")
+    if decided:
+        print(f"  Accuracy:          {correct / len(decided):.1%}")
+        print(f"  Sensitivity:       {tp / (tp + fn):.1%}" if tp + fn else "  Sensitivity:       n/a")
+        print(f"  Specificity:       {tn / (tn + fp):.1%}" if tn + fp else "  Specificity:       n/a")
+        print(f"  Confusion (TP/FP/TN/FN): {tp}/{fp}/{tn}/{fn}")
+
+
+def write_parquet(jsonl_path: str, parquet_path: str) -> None:
+    """Write the latest JSONL result per image to Parquet (requires pandas with pyarrow)."""
+    import pandas as pd
+
+    df = pd.DataFrame(list(read_records(jsonl_path).values()))
+    if "result" in df:
+        df["result"] = df["result"].apply(json.dumps)
+    df.to_parquet(parquet_path, index=False)
+    print(f"💾 Wrote {len(df)} rows to {parquet_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen a directory of ultrasound images for PCOS patterns.")
+    parser.add_argument("directory", help="Root directory containing ultrasound images")
+    parser.add_argument("--output", default="data/screening/results.jsonl", help="JSONL results / checkpoint file")
+    parser.add_argument("--parquet", help="Also write the final results to this Parquet file")
+    parser.add_argument("--model-path", help="Trained Keras model (defaults to Gemini Vision analysis)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="Worker processes")
+    parser.add_argument("--batch-size", type=int, default=32, help="Images per predict call / work unit")
+    parser.add_argument("--limit", type=int, help="Only process this many new images")
+    args = parser.parse_args()
+
+    images = find_images(args.directory)
+    done = load_checkpoint(args.output)
+    todo = [path for path in images if path not in done]
+    if args.limit:
+        todo = todo[:args.limit]
+
+    print(f"🔍 Found {len(images)} images, {len(done)} already screened, {len(todo)} to process")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    end_last_line(args.output)
+
+    chunks = [todo[i:i + args.batch_size] for i in range(0, len(todo), args.batch_size)]
+    processed = 0
+    start = time.perf_counter()
+
+    # TensorFlow is not fork-safe, so workers are spawned fresh
+    context = multiprocessing.get_context("spawn")
+
+    try:
+        with open(args.output, 'a') as out, ProcessPoolExecutor(
+            max_workers=args.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(args.model_path, args.batch_size)
+        ) as executor:
+            futures = [executor.submit(_analyze_chunk, chunk) for chunk in chunks]
+
+            for future in as_completed(futures):
+                records = future.result()
+                for record in records:
+                    out.write(json.dumps(record) + "\n")
+                out.flush()
+                os.fsync(out.fileno())
+
+                processed += len(records)
+                rate = processed / (time.perf_counter() - start)
+                print(f"  {processed}/{len(todo)} images ({rate:.2f} images/sec)", end="\r", flush=True)
+
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted - progress saved, rerun the same command to resume")
+
+    elapsed = time.perf_counter() - start
+    summarize(args.output, processed, elapsed)
+
+    if args.parquet:
+        write_parquet(args.output, args.parquet)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Shared fixtures. Tests run from the femmenourish directory:
+    python -m pytest -q
+"""
+
+import itertools
+import os
+import sys
+import time
+from typing import Callable, List, Union
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_recipe(recipe_id: int, title: str, protein: float = 25.0, sugar: float = 5.0, fiber: float = 8.0) -> dict:
+    """Spoonacular-shaped recipe with nutrition and one ingredient."""
+    return {
+        "id": recipe_id,
+        "title": title,
+        "servings": 2,
+        "nutrition": {"nutrients": [
+            {"name": "Protein", "amount": protein, "unit": "g"},
+            {"name": "Sugar", "amount": sugar, "unit": "g"},
+            {"name": "Fiber", "amount": fiber, "unit": "g"},
+            {"name": "Carbohydrates", "amount": 30.0, "unit": "g"},
+            {"name": "Fat", "amount": 12.0, "unit": "g"},
+        ]},
+        "extendedIngredients": [{"name": f"ingredient {recipe_id}", "amount": 100, "unit": "g", "aisle": "Produce"}],
+    }
+
+
+class FakeSpoonacular:
+    """Recipe search stand-in: every search returns `number` new recipes."""
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self.searches = 0
+
+    def search_pcos_recipes(self, cuisine=None, meal_type=None, dietary_restrictions=None, number=2):
+        self.searches += 1
+        return {"results": [
+            make_recipe(recipe_id, f"{cuisine} {meal_type} {recipe_id}")
+            for recipe_id in itertools.islice(self._ids, number)
+        ]}
+
+    def estimate_search_points(self, **kwargs):
+        return 1.0
+
+    def can_afford(self, points):
+        return True
+
+    def quota_stats(self):
+        return {"remaining": 150, "limit": 150}
+
+    def quota_warning(self):
+        return None
+
+
+class FakeGenerativeModel:
+    """
+    Stand-in for genai.GenerativeModel, passed to GeminiClient(model=...).
+    Returns canned responses and records every prompt it receives.
+    """
+
+    class Response:
+        def __init__(self, text: str):
+            self.text = text
+
+    def __init__(self, responses: Union[str, Callable[[str], str]] = "{}", delay: float = 0.0):
+        """
+        Args:
+            responses: Fixed response text, or callable(prompt) -> response text
+            delay: Simulated latency in seconds per call
+        """
+        self.responses = responses
+        self.delay = delay
+        self.prompts: List = []
+
+    def generate_content(self, prompt, **kwargs) -> "FakeGenerativeModel.Response":
+        self.prompts.append(prompt)
+        if self.delay:
+            time.sleep(self.delay)
+        text = self.responses(prompt) if callable(self.responses) else self.responses
+        return self.Response(text)
+
+
+class FakeJob:
+    """JobContext stand-in that records progress and attachments."""
+
+    def __init__(self):
+        self.updates = []
+        self.attached = None
+
+    def progress(self, fraction, message="", partial=None):
+        self.updates.append((fraction, message, partial))
+
+    def attach(self, obj):
+        self.attached = obj
+
+
+@pytest.fixture
+def spoonacular():
+    return FakeSpoonacular()
+
+
+@pytest.fixture
+def fake_job():
+    return FakeJob()
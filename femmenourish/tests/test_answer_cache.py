@@ -0,0 +1,57 @@
+import utils.answer_cache as answer_cache
+from tests.conftest import FakeGenerativeModel
+from utils.answer_cache import AnswerCache
+from utils.gemini_client import GeminiClient
+
+
+def test_near_duplicate_question_is_a_hit():
+    cache = AnswerCache()
+    cache.set("Is cinnamon good for insulin resistance in PCOS?", None, "Yes, modestly.", latency=2.0)
+
+    assert cache.get("is cinnamon good for insulin resistance?") == "Yes, modestly."
+    assert cache.get("Is Cinnamon good for PCOS insulin resistance") == "Yes, modestly."
+    assert cache.stats()["latency_saved"] == 4.0
+
+
+def test_different_question_or_context_misses():
+    cache = AnswerCache()
+    cache.set("Is cinnamon good for insulin resistance?", "Patient on metformin", "Yes, modestly.")
+
+    assert cache.get("Is cinnamon good for insulin resistance?", "Patient on inositol") is None
+    assert cache.get("Is turmeric good for inflammation?", "Patient on metformin") is None
+
+
+def test_negated_question_never_matches():
+    cache = AnswerCache()
+    cache.set("Is soy safe with metformin?", None, "Yes.")
+
+    assert cache.get("Is soy not safe with metformin?") is None
+    assert cache.get("Isn't soy safe with metformin?") is None
+    assert cache.get("Is soy safe with metformin") == "Yes."
+
+
+def test_answers_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(answer_cache.time, "time", lambda: now[0])
+    cache = AnswerCache(ttl=60)
+    cache.set("Is cinnamon good for insulin resistance?", None, "Yes, modestly.")
+
+    now[0] += 59
+    assert cache.get("Is cinnamon good for insulin resistance?") == "Yes, modestly."
+
+    now[0] += 2
+    assert cache.get("Is cinnamon good for insulin resistance?") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_client_answers_near_duplicates_from_cache():
+    model = FakeGenerativeModel("Yes, modestly.")
+    client = GeminiClient(model=model)
+
+    client.answer_nutrition_question("Is cinnamon good for insulin resistance?")
+    answer = client.answer_nutrition_question("is cinnamon good for insulin resistance in pcos")
+
+    assert answer == "Yes, modestly."
+    assert len(model.prompts) == 1
+    client.answer_nutrition_question("is cinnamon good for insulin resistance in pcos", use_cache=False)
+    assert len(model.prompts) == 2
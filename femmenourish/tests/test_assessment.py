@@ -0,0 +1,85 @@
+import math
+import random
+
+import pandas as pd
+import pytest
+
+from utils.assessment import PCOSAssessment
+
+CRITERIA = ("oligoanovulation", "hyperandrogenism", "polycystic_ovaries")
+SYMPTOM_KEYS = ("periods_per_year", "cycle_length", "hirsutism", "acne", "hair_loss", "testosterone_elevated")
+HISTORY_KEYS = ("family_history", "bmi", "insulin_resistance", "metabolic_syndrome")
+
+
+@pytest.fixture(scope="module")
+def assessor():
+    return PCOSAssessment()
+
+
+def cohort(seed, n=2000):
+    """Registry-like records with missing cells and mixed flag types."""
+    rng = random.Random(seed)
+
+    def maybe(value):
+        return float("nan") if rng.random() < 0.1 else value
+
+    return pd.DataFrame({
+        "periods_per_year": [maybe(rng.randint(2, 13)) for _ in range(n)],
+        "cycle_length": [maybe(rng.randint(21, 60)) for _ in range(n)],
+        "hirsutism": [maybe(rng.random() < 0.3) for _ in range(n)],
+        "acne": [maybe(rng.choice([True, False, 1, 0])) for _ in range(n)],
+        "hair_loss": [maybe(rng.random() < 0.15) for _ in range(n)],
+        "testosterone_elevated": [maybe(rng.random() < 0.2) for _ in range(n)],
+        "family_history": [maybe(rng.random() < 0.25) for _ in range(n)],
+        "bmi": [maybe(round(rng.uniform(17, 42), 1)) for _ in range(n)],
+        "insulin_resistance": [maybe(rng.random() < 0.3) for _ in range(n)],
+        "metabolic_syndrome": [maybe(rng.random() < 0.15) for _ in range(n)],
+        "pcos_pattern": [rng.choice(["positive", "negative", "inconclusive", float("nan")]) for _ in range(n)],
+    })
+
+
+def row_inputs(row):
+    """Scalar-path arguments for a record; NaN cells become missing keys."""
+    present = {k: v for k, v in row.items() if not (isinstance(v, float) and math.isnan(v))}
+    symptoms = {k: present[k] for k in SYMPTOM_KEYS if k in present}
+    history = {k: present[k] for k in HISTORY_KEYS if k in present}
+    ultrasound = {"pcos_pattern": present["pcos_pattern"]} if "pcos_pattern" in present else None
+    return symptoms, ultrasound, history
+
+
+def assert_parity(assessor, df):
+    result = assessor.evaluate_cohort(df)
+
+    assert list(result.index) == list(df.index)
+    for row, expected in zip(df.to_dict("records"), result.to_dict("records")):
+        symptoms, ultrasound, history = row_inputs(row)
+        evaluation = assessor.evaluate_rotterdam_criteria(symptoms, ultrasound)
+
+        assert evaluation["criteria_count"] == expected["criteria_count"]
+        assert evaluation["diagnosis"] == expected["diagnosis"]
+        assert evaluation["phenotype"] == expected["phenotype"]
+        assert assessor.calculate_risk_score(symptoms, history) == expected["risk_score"]
+        for name in CRITERIA:
+            assert (name in evaluation["criteria_met"]) == expected[name]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_cohort_matches_scalar_path(assessor, seed):
+    assert_parity(assessor, cohort(seed))
+
+
+def test_missing_columns_behave_like_missing_keys(assessor):
+    df = cohort(7, n=300)[["periods_per_year", "acne", "bmi"]]
+    assert_parity(assessor, df)
+
+
+def test_cohort_keeps_input_index(assessor):
+    df = cohort(8, n=50)
+    df.index = [f"patient-{i}" for i in range(len(df))]
+    assert_parity(assessor, df)
+
+
+def test_no_phenotype_is_none_not_nan(assessor):
+    df = pd.DataFrame({"periods_per_year": [12], "cycle_length": [28], "pcos_pattern": ["negative"]})
+
+    assert assessor.evaluate_cohort(df)["phenotype"].tolist() == [None]
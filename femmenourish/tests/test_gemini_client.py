@@ -0,0 +1,105 @@
+import json
+
+from tests.conftest import FakeGenerativeModel, make_recipe
+from utils.gemini_client import GeminiClient, assessment_inputs
+
+ASSESSMENT = {"rotterdam_score": "2/3", "criteria_met": ["oligoanovulation"], "risk_level": "High"}
+
+SYMPTOMS = {"periods_per_year": 6, "cycle_length": 45, "hirsutism": "Moderate"}
+
+CITY = {"region": "Maharashtra", "cuisine_tags": ["Maharashtrian"], "common_stores": ["D-Mart"]}
+
+
+def test_assessment_is_memoized_across_renamed_patients():
+    model = FakeGenerativeModel(json.dumps(ASSESSMENT))
+    client = GeminiClient(model=model)
+
+    first = client.assess_pcos_risk(SYMPTOMS, patient_history={"patient_name": "A", "bmi": 31.04})
+    first["risk_level"] = "edited by caller"
+    second = client.assess_pcos_risk(dict(SYMPTOMS, patient_name="B"), patient_history={"patient_name": "B", "bmi": 31.0})
+
+    assert len(model.prompts) == 1
+    assert second == ASSESSMENT
+
+
+def test_memo_key_excludes_identifying_fields_at_any_depth():
+    client = GeminiClient(model=FakeGenerativeModel(json.dumps(ASSESSMENT)))
+    scan = {"pcos_pattern": "positive", "confidence": 81.04, "image_path": "/scans/a.png"}
+
+    first = assessment_inputs(
+        dict(SYMPTOMS, patient_name="A"), dict(scan, filename="a.png"), {"patient_name": "A", "bmi": 31.04}
+    )
+    second = assessment_inputs(
+        dict(SYMPTOMS, patient_name="B", hirsutism=" Moderate "),
+        dict(scan, image_path="/scans/b.png", confidence=81.0),
+        {"patient_name": "B", "mrn": "42", "bmi": 31.0}
+    )
+
+    assert "patient_name" not in json.dumps(first) and "image_path" not in json.dumps(first)
+    assert client.assessment_key(first) == client.assessment_key(second)
+    assert client.assessment_key(first) != client.assessment_key(dict(first, bmi=32))
+
+
+def test_assessment_changes_miss_the_memo():
+    model = FakeGenerativeModel(json.dumps(ASSESSMENT))
+    client = GeminiClient(model=model)
+
+    client.assess_pcos_risk(SYMPTOMS)
+    client.assess_pcos_risk(dict(SYMPTOMS, periods_per_year=12))
+
+    assert len(model.prompts) == 2
+
+
+def test_failed_assessment_is_retried():
+    model = FakeGenerativeModel("not json")
+    client = GeminiClient(model=model)
+
+    assert "error" in client.assess_pcos_risk(SYMPTOMS)
+    client.assess_pcos_risk(SYMPTOMS)
+
+    assert len(model.prompts) == 2
+
+
+def test_bmi_line_only_when_known():
+    model = FakeGenerativeModel(json.dumps(ASSESSMENT))
+    client = GeminiClient(model=model)
+
+    client.assess_pcos_risk(SYMPTOMS)
+    client.assess_pcos_risk(SYMPTOMS, patient_history={"family_history": "Yes"})
+    client.assess_pcos_risk(SYMPTOMS, patient_history={"bmi": 27.5})
+
+    assert [("BMI" in prompt) for prompt in model.prompts] == [False, False, True]
+    assert "BMI None" not in "".join(model.prompts)
+    assert "BMI 27.5" in model.prompts[2]
+
+
+def adapt_each(prompt):
+    """Echo one adapted entry per recipe line in the prompt."""
+    lines = [json.loads(line) for line in prompt.splitlines() if line.startswith('{"title"')]
+    return json.dumps([{"original_title": recipe["title"], "adapted_title": recipe["title"] + " (local)"}
+                       for recipe in lines])
+
+
+def test_adaptation_batches_cover_every_recipe_once():
+    model = FakeGenerativeModel(adapt_each)
+    client = GeminiClient(model=model, token_budget=1200)
+    recipes = [make_recipe(i, f"Recipe {i}") for i in range(1, 21)]
+
+    adapted = client.customize_recipes_for_location(recipes, "Pune", CITY)
+
+    assert len(model.prompts) > 1
+    assert [entry["original_title"] for entry in adapted] == [recipe["title"] for recipe in recipes]
+    for i in range(1, 21):
+        assert sum(f'"Recipe {i}"' in prompt for prompt in model.prompts) == 1
+    assert client.call_stats()["adaptation"]["calls"] == len(model.prompts)
+
+
+def test_failed_adaptation_batch_returns_originals():
+    model = FakeGenerativeModel(lambda prompt: "oops" if '"Recipe 1"' in prompt else adapt_each(prompt))
+    client = GeminiClient(model=model, token_budget=1200)
+    recipes = [make_recipe(i, f"Recipe {i}") for i in range(1, 21)]
+
+    adapted = client.customize_recipes_for_location(recipes, "Pune", CITY)
+
+    assert len(adapted) == len(recipes)
+    assert adapted[0] is recipes[0]
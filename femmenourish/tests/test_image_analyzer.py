@@ -0,0 +1,97 @@
+import io
+
+import pytest
+
+from utils.image_analyzer import UltrasoundAnalyzer
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    analyzer = UltrasoundAnalyzer(cache_dir=str(tmp_path / "ultrasound"))
+    analyzer.analyses = 0
+
+    def analyze(image):
+        analyzer.analyses += 1
+        return {"pcos_pattern": "positive", "confidence": 80, "method": "gemini_vision"}
+
+    analyzer._analyze_with_opencv = analyze
+    return analyzer
+
+
+def test_same_image_is_analyzed_once_whatever_the_source(analyzer, tmp_path):
+    path = tmp_path / "scan.png"
+    path.write_bytes(b"scan bytes")
+
+    first = analyzer.analyze_image(str(path))
+    assert analyzer.analyze_image(b"scan bytes") == first
+    assert analyzer.analyze_image(io.BytesIO(b"scan bytes")) == first
+    assert analyzer.analyses == 1
+
+    analyzer.analyze_image(b"other scan")
+    assert analyzer.analyses == 2
+
+
+def test_cached_results_survive_a_new_analyzer(analyzer, tmp_path):
+    analyzer.analyze_image(b"scan bytes")
+
+    restarted = UltrasoundAnalyzer(cache_dir=str(tmp_path / "ultrasound"))
+
+    assert restarted.cached_result(b"scan bytes")["pcos_pattern"] == "positive"
+    assert restarted.cached_result(b"other scan") is None
+
+
+@pytest.mark.parametrize("result", [
+    {"error": "quota exceeded", "pcos_pattern": "unknown", "confidence": 0},
+    {"pcos_pattern": "clinical_review", "confidence": 0, "method": "clinical_assessment"},
+])
+def test_errors_and_fallbacks_are_not_cached(analyzer, result):
+    analyzer._analyze_with_opencv = lambda image: result
+
+    analyzer.analyze_image(b"scan bytes")
+
+    assert analyzer.cached_result(b"scan bytes") is None
+
+
+class FakeModel:
+    """Keras stand-in scoring each image by its mean brightness, recording batch sizes."""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, batch, verbose=0):
+        self.batches.append(len(batch))
+        return batch.mean(axis=(1, 2, 3)).reshape(-1, 1)
+
+
+def png(shade, size=(300, 300)):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (shade, shade, shade)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_batch_predicts_once_per_chunk_in_input_order(tmp_path):
+    analyzer = UltrasoundAnalyzer(cache_dir=str(tmp_path / "ultrasound"))
+    analyzer.model = FakeModel()
+    images = [png(230), png(20), png(240, size=(224, 224))]
+
+    results = [result for _, result in analyzer.analyze_batch(images, batch_size=2, num_workers=2)]
+
+    assert analyzer.model.batches == [2, 1]
+    assert [result["pcos_pattern"] for result in results] == ["positive", "negative", "positive"]
+    assert results[0] == analyzer._analyze_with_model(io.BytesIO(images[0]))
+    assert analyzer.last_batch_stats["images"] == 3
+
+
+def test_batch_skips_cached_images_and_isolates_bad_ones(tmp_path):
+    analyzer = UltrasoundAnalyzer(cache_dir=str(tmp_path / "ultrasound"))
+    analyzer.model = FakeModel()
+    list(analyzer.analyze_batch([png(230)], batch_size=4))
+
+    results = [result for _, result in analyzer.analyze_batch([png(230), b"not an image", png(20)], batch_size=4)]
+
+    assert analyzer.model.batches == [1, 1]
+    assert results[0]["pcos_pattern"] == "positive"
+    assert "error" in results[1]
+    assert results[2]["pcos_pattern"] == "negative"
@@ -0,0 +1,105 @@
+import pytest
+
+from tests.conftest import make_recipe
+from utils.ingredient_index import IngredientIndex, find_in_corpus
+from utils.quota import QuotaManager
+from utils.recipe_corpus import RecipeCorpus
+from utils.spoonacular_client import SpoonacularClient
+
+
+def full_recipe(recipe_id, cuisine, ingredients, protein=25.0):
+    """recipes/informationBulk payload."""
+    recipe = make_recipe(recipe_id, f"{cuisine} dish {recipe_id}", protein=protein)
+    recipe["cuisines"] = [cuisine]
+    recipe["dishTypes"] = ["lunch"]
+    recipe["extendedIngredients"] = [{"name": name} for name in ingredients]
+    return recipe
+
+
+def partial_recipe(recipe):
+    """recipes/findByIngredients payload: no nutrition, cuisines or full ingredient list."""
+    return {
+        "id": recipe["id"],
+        "title": recipe["title"],
+        "usedIngredients": recipe["extendedIngredients"][:1],
+        "missedIngredients": [],
+    }
+
+
+RECIPES = [
+    full_recipe(1, "Indian", ["spinach", "paneer", "onion"], protein=30),
+    full_recipe(2, "Italian", ["spinach", "ricotta"], protein=20),
+    full_recipe(3, "Indian", ["spinach", "moong dal"], protein=18),
+]
+
+
+class FakeAPI:
+    """Serves findByIngredients and informationBulk from RECIPES, counting calls."""
+
+    def __init__(self, recipes):
+        self.recipes = {recipe["id"]: recipe for recipe in recipes}
+        self.calls = []
+
+    def __call__(self, endpoint, params):
+        self.calls.append(endpoint)
+        if endpoint == "recipes/findByIngredients":
+            return [partial_recipe(recipe) for recipe in self.recipes.values()]
+        if endpoint == "recipes/informationBulk":
+            ids = [int(rid) for rid in params["ids"].split(",")]
+            return [dict(self.recipes[rid]) for rid in ids]
+        raise AssertionError(f"unexpected request {endpoint}")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("SPOONACULAR_API_KEY", "test")
+    client = SpoonacularClient(
+        use_cache=False,
+        quota=QuotaManager(path=str(tmp_path / "quota.sqlite")),
+        corpus=RecipeCorpus(str(tmp_path / "corpus"))
+    )
+    client._make_request = FakeAPI(RECIPES)
+    return client
+
+
+def test_api_path_stores_full_payloads(client):
+    client.find_recipes_by_ingredients(["spinach"], number=3)
+
+    stored = {recipe["id"]: recipe for recipe in client.corpus.recipes}
+    assert set(stored) == {1, 2, 3}
+    for recipe in stored.values():
+        assert recipe["cuisines"] and recipe["extendedIngredients"]
+        assert "usedIngredients" not in recipe
+
+
+def test_offline_search_matches_api_path(client):
+    online = client.find_recipes_by_ingredients(["spinach"], number=3)
+    calls = len(client._make_request.calls)
+
+    offline = client.find_recipes_by_ingredients(["spinach"], number=3)
+
+    assert len(client._make_request.calls) == calls
+    assert [recipe["id"] for recipe in offline] == [recipe["id"] for recipe in online]
+    assert [recipe["pcos_score"] for recipe in offline] == [recipe["pcos_score"] for recipe in online]
+
+
+def test_offline_search_filters_cuisine(tmp_path):
+    corpus = RecipeCorpus(str(tmp_path / "corpus"))
+    corpus.add_recipes(RECIPES, save=False)
+    index = IngredientIndex.from_corpus(corpus)
+
+    indian = find_in_corpus(index, corpus, ["spinach"], number=5, cuisine="Indian")
+    italian = find_in_corpus(index, corpus, ["spinach"], number=5, cuisine="italian")
+
+    assert {recipe["id"] for recipe in indian} == {1, 3}
+    assert [recipe["id"] for recipe in italian] == [2]
+    assert len(find_in_corpus(index, corpus, ["spinach"], number=5)) == 3
+
+
+def test_client_offline_search_passes_cuisine(client):
+    client.corpus.add_recipes(RECIPES, save=False)
+
+    found = client.find_recipes_by_ingredients(["spinach"], cuisine="Italian", number=1)
+
+    assert [recipe["id"] for recipe in found] == [2]
+    assert client._make_request.calls == []
@@ -0,0 +1,86 @@
+import sqlite3
+import threading
+import time
+
+from utils.job_queue import DONE, QUEUED, RUNNING, JobQueue
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_second_queue_leaves_live_jobs_running(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    release = threading.Event()
+    runs = []
+
+    def handler(params, job):
+        runs.append(params['n'])
+        release.wait(5)
+        return {"n": params['n']}
+
+    first = JobQueue(path, workers=1, heartbeat_interval=0.05, stale_after=0.5)
+    first.register("slow", handler)
+    job_id = first.submit("slow", {"n": 1})
+    assert wait_for(lambda: first.status(job_id)['status'] == RUNNING)
+
+    # Another process, or a rebuilt resource cache, opening the same file
+    time.sleep(0.6)
+    second = JobQueue(path, workers=1, heartbeat_interval=0.05, stale_after=0.5)
+    second.register("slow", handler)
+    second.start()
+
+    assert second.status(job_id)['status'] == RUNNING
+    release.set()
+    assert wait_for(lambda: first.status(job_id)['status'] == DONE)
+    assert runs == [1]
+
+    first.shutdown()
+    second.shutdown()
+
+
+def test_stale_running_job_is_requeued(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    queue = JobQueue(path, stale_after=30)
+    queue.register("noop", lambda params, job: {"ok": True})
+    queue.shutdown()
+
+    now = time.time()
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO jobs (id, kind, status, params, created_at, started_at, worker_id, heartbeat_at) "
+            "VALUES (?, 'noop', ?, '{}', ?, ?, 'gone:1:x', ?)",
+            [("stale", RUNNING, now - 120, now - 120, now - 90), ("live", RUNNING, now, now, now)]
+        )
+
+    reopened = JobQueue(path, stale_after=30)
+
+    assert reopened.status("stale")['status'] == QUEUED
+    assert reopened.status("live")['status'] == RUNNING
+
+
+def test_old_schema_is_migrated(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, params TEXT NOT NULL, "
+            "result TEXT, blob BLOB, error TEXT, progress REAL NOT NULL DEFAULT 0, message TEXT NOT NULL DEFAULT '', "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+        )
+        conn.execute(
+            "INSERT INTO jobs (id, kind, status, params, created_at, started_at) VALUES ('old', 'noop', ?, '{}', 0, 0)",
+            (RUNNING,)
+        )
+
+    queue = JobQueue(path)
+    queue.register("noop", lambda params, job: {"ok": True})
+    queue.start()
+
+    assert wait_for(lambda: queue.status("old")['status'] == DONE)
+    assert queue.result("old") == {"ok": True}
+    queue.shutdown()
@@ -0,0 +1,36 @@
+from tests.conftest import make_recipe
+from utils.meal_optimizer import MealPlanOptimizer
+
+MEALS = ("breakfast", "lunch", "dinner", "snack")
+
+
+def test_picks_the_combination_that_meets_daily_targets():
+    # Taking the highest-protein option everywhere overshoots the sugar limit
+    forced = make_recipe(1, "Forced", protein=20, sugar=15, fiber=8)
+    rich = [make_recipe(10 + i, f"Rich {i}", protein=35, sugar=14, fiber=10) for i in range(3)]
+    light = [make_recipe(20 + i, f"Light {i}", protein=22, sugar=2, fiber=8) for i in range(3)]
+    day = {"breakfast": [forced], **{meal: [rich[i], light[i]] for i, meal in enumerate(MEALS[1:])}}
+
+    optimizer = MealPlanOptimizer(seed=0)
+    chosen = optimizer.optimize([day])
+
+    assert [chosen[0][meal]["title"] for meal in MEALS] == ["Forced", "Light 0", "Light 1", "Light 2"]
+    assert optimizer.report() == {
+        "days": 1, "days_meeting_targets": 1,
+        "sugar_days": 1, "protein_days": 1, "fiber_days": 1, "glycemic_load_days": 1,
+    }
+
+
+def test_equally_good_recipes_are_not_repeated():
+    pool = [make_recipe(i, f"Recipe {i}") for i in range(1, 4)]
+    days = [{"lunch": pool} for _ in range(3)]
+
+    chosen = MealPlanOptimizer(seed=0).optimize(days)
+
+    assert len({day["lunch"]["id"] for day in chosen}) == 3
+
+
+def test_slots_without_candidates_stay_empty():
+    chosen = MealPlanOptimizer(seed=0).optimize([{"lunch": [], "dinner": [make_recipe(1, "A")]}])
+
+    assert chosen == [{"lunch": None, "dinner": make_recipe(1, "A")}]
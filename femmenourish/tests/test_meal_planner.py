@@ -0,0 +1,19 @@
+from tests.conftest import FakeSpoonacular
+from utils.meal_planner import MealPlanBuilder
+
+
+class FailingSpoonacular(FakeSpoonacular):
+    def search_pcos_recipes(self, cuisine=None, meal_type=None, dietary_restrictions=None, number=2):
+        self.searches += 1
+        return {"error": "Daily API quota reached"}
+
+
+def test_search_errors_are_recorded_once():
+    builder = MealPlanBuilder(FailingSpoonacular(), ["Indian", "Asian"], weeks=2)
+
+    meal_plan, recipes = builder.build()
+    builder.swap(builder.slots_in(1))
+
+    assert recipes == []
+    assert all("id" not in meal for day in meal_plan.values() for meal in day.values())
+    assert builder.errors == ["Daily API quota reached"]
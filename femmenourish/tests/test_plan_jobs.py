@@ -0,0 +1,85 @@
+import json
+from concurrent.futures import Future
+
+from utils.plan_jobs import bind_builder, meal_plan_pdf_params, run_meal_plan
+
+
+class FakeGemini:
+    """Adaptation stand-in returning resolved futures and recording each request."""
+
+    def __init__(self):
+        self.requests = []
+
+    def customize_recipes_for_location_async(self, recipes, city, city_info, preferences):
+        self.requests.append([recipe['id'] for recipe in recipes])
+        future = Future()
+        future.set_result([{"original_title": recipe['title']} for recipe in recipes])
+        return future
+
+
+PARAMS = {
+    'patient_name': "Test Patient",
+    'city': "Pune",
+    'weeks': 1,
+    'intolerances': [],
+    'dietary_restrictions': [],
+    'budget': "Moderate",
+    'estimate_costs': False,
+}
+
+ASSESSMENT = {'patient_name': "Test Patient", 'risk_level': "Low", 'phenotype': None}
+
+
+def test_swap_updates_stored_plan_and_pdf_params(spoonacular, fake_job):
+    result = run_meal_plan(spoonacular, FakeGemini(), PARAMS, fake_job)
+    builder = fake_job.attached
+
+    # The session gets the plan back from the job row as JSON
+    plan = bind_builder(json.loads(json.dumps(result))['plan'], builder)
+
+    changes = builder.swap([("Week1_Day1", "lunch")])
+
+    assert changes
+    new_id = changes[0]['new']['id']
+    assert changes[0]['old']['id'] != new_id
+    assert plan['meal_plan']["Week1_Day1"]["lunch"]['id'] == new_id
+    assert meal_plan_pdf_params(plan, ASSESSMENT)['meal_plan']["Week1_Day1"]["lunch"]['id'] == new_id
+
+
+def test_bind_builder_without_attachment_keeps_plan(spoonacular, fake_job):
+    result = json.loads(json.dumps(run_meal_plan(spoonacular, FakeGemini(), PARAMS, fake_job)))
+    plan = result['plan']
+
+    assert bind_builder(plan, None)['meal_plan'] is plan['meal_plan']
+
+
+def test_partial_results_only_hold_planned_days(spoonacular, fake_job):
+    run_meal_plan(spoonacular, FakeGemini(), PARAMS, fake_job)
+    partials = [partial for _, _, partial in fake_job.updates if partial is not None]
+
+    assert partials
+    for done, partial in enumerate(partials, start=1):
+        assert len(partial['meal_plan']) == done
+        assert all(partial['meal_plan'].values())
+
+
+def test_every_planned_recipe_is_adapted_once(spoonacular, fake_job):
+    gemini = FakeGemini()
+    result = run_meal_plan(spoonacular, gemini, dict(PARAMS, weeks=3), fake_job)
+
+    planned_ids = {meal['id'] for day in result['plan']['meal_plan'].values() for meal in day.values() if 'id' in meal}
+    adapted_ids = [recipe_id for request in gemini.requests for recipe_id in request]
+
+    # Weeks share searches, so later weeks may add no new recipes
+    assert 1 <= len(gemini.requests) <= 3
+    assert sorted(adapted_ids) == sorted(planned_ids)
+    assert len(planned_ids) > 7
+    assert len(result['plan']['adapted_recipes']) == len(planned_ids)
+
+
+def test_low_quota_warning_is_returned_with_the_result(spoonacular, fake_job):
+    spoonacular.quota_warning = lambda: "Approaching daily API limit (20 of 150 points left)"
+
+    result = run_meal_plan(spoonacular, FakeGemini(), PARAMS, fake_job)
+
+    assert result['quota_warning'] == "Approaching daily API limit (20 of 150 points left)"
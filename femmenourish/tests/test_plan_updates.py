@@ -0,0 +1,71 @@
+from tests.conftest import make_recipe
+from utils.config import get_config
+from utils.plan_updates import update_adaptation, update_shopping_list
+from utils.shopping_list import apply_costs, build_shopping_list
+
+CITY = get_config("cities")['cities']["Pune"]
+
+
+class FakeGemini:
+    """Adaptation stand-in recording the titles of every recipe it is asked to adapt."""
+
+    def __init__(self):
+        self.requests = []
+
+    def customize_recipes_for_location(self, recipes, city, city_info, preferences):
+        self.requests.append([recipe['title'] for recipe in recipes])
+        return [{"original_title": recipe['title'], "adapted": True} for recipe in recipes]
+
+
+def adapt(adapted, before, after, gemini):
+    return update_adaptation(adapted, before, after, gemini, "Pune", CITY, {})
+
+
+def priced(recipes):
+    shopping_list = build_shopping_list(recipes, CITY)
+    costs = {item['item']: "₹40" for items in shopping_list['categories'].values() for item in items}
+    return apply_costs(shopping_list, {
+        "costs": costs,
+        "total_estimated_cost": "₹2,500",
+        "shopping_tips": ["Buy in bulk"],
+    })
+
+
+def test_swap_that_changes_items_drops_total():
+    shopping_list = priced([make_recipe(1, "A"), make_recipe(2, "B")])
+
+    updated = update_shopping_list(shopping_list, [make_recipe(1, "A"), make_recipe(3, "C")], CITY)
+
+    assert 'total_estimated_cost' not in updated
+    assert updated['shopping_tips'] == ["Buy in bulk"]
+    kept = [item for items in updated['categories'].values() for item in items if item["item"] == "Ingredient 1"]
+    assert kept and kept[0]['cost'] == "₹40"
+
+
+def test_swap_with_same_items_keeps_total():
+    shopping_list = priced([make_recipe(1, "A"), make_recipe(2, "B")])
+
+    updated = update_shopping_list(shopping_list, [make_recipe(2, "B"), make_recipe(1, "A")], CITY)
+
+    assert updated['total_estimated_cost'] == "₹2,500"
+
+
+def test_swap_readapts_only_the_replacement():
+    gemini = FakeGemini()
+    a, b, c = make_recipe(1, "A"), make_recipe(2, "B"), make_recipe(3, "C")
+
+    updated = adapt([{"original_title": "A"}, {"original_title": "B"}], [a, b], [a, c], gemini)
+
+    assert gemini.requests == [["C"]]
+    assert [entry["original_title"] for entry in updated] == ["A", "C"]
+
+
+def test_swap_keeps_adaptation_of_recipe_still_used_elsewhere():
+    gemini = FakeGemini()
+    a, b = make_recipe(1, "A"), make_recipe(2, "B")
+
+    # A was in two slots; one of them now holds B, which is already adapted
+    updated = adapt([{"original_title": "A"}, {"original_title": "B"}], [a, a, b], [a, b, b], gemini)
+
+    assert gemini.requests == []
+    assert [entry["original_title"] for entry in updated] == ["A", "B"]
@@ -0,0 +1,73 @@
+import pytest
+
+import utils.quota as quota_module
+from utils.quota import QuotaManager
+
+
+class Clock:
+    """time.time stand-in whose sleep advances the clock instead of waiting."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(quota_module.time, "time", clock.time)
+    monkeypatch.setattr(quota_module.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_burst_passes_then_requests_wait_for_refill(tmp_path, clock):
+    quota = QuotaManager(path=str(tmp_path / "quota.sqlite"), requests_per_second=2, burst=3)
+
+    for _ in range(3):
+        quota.throttle()
+    assert clock.sleeps == []
+
+    quota.throttle()
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_bucket_refills_over_time_up_to_burst(tmp_path, clock):
+    quota = QuotaManager(path=str(tmp_path / "quota.sqlite"), requests_per_second=2, burst=3)
+    for _ in range(3):
+        quota.throttle()
+
+    # Idle long enough to refill far past the burst size
+    clock.now += 60
+    for _ in range(3):
+        quota.throttle()
+    assert clock.sleeps == []
+
+    quota.throttle()
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_bucket_is_shared_between_managers_on_one_file(tmp_path, clock):
+    first = QuotaManager(path=str(tmp_path / "quota.sqlite"), requests_per_second=1, burst=1)
+    second = QuotaManager(path=str(tmp_path / "quota.sqlite"), requests_per_second=1, burst=1)
+
+    first.throttle()
+    second.throttle()
+
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+
+def test_daily_points_are_reserved_and_refunded(tmp_path):
+    quota = QuotaManager(path=str(tmp_path / "quota.sqlite"), daily_limit=10)
+
+    assert quota.try_consume(8)
+    assert not quota.try_consume(3)
+    quota.adjust(-8)
+    assert quota.try_consume(3)
+    assert quota.stats()["remaining"] == 7
@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+
+from tests.conftest import make_recipe
+from utils.recipe_corpus import RecipeCorpus
+
+
+def tagged(recipe_id, cuisine, protein=25):
+    recipe = make_recipe(recipe_id, f"{cuisine} dish {recipe_id}", protein=protein)
+    recipe["cuisines"] = [cuisine]
+    recipe["dishTypes"] = ["lunch"]
+    return recipe
+
+
+def assert_same_indexes(corpus, rebuilt):
+    assert {field: {value: sorted(rows) for value, rows in values.items()} for field, values in corpus.index.items()} == \
+        {field: {value: sorted(rows) for value, rows in values.items()} for field, values in rebuilt.index.items()}
+    for column in ("ids", "popularity", "amounts", "present"):
+        assert np.array_equal(getattr(corpus, column), getattr(rebuilt, column))
+
+
+def test_incremental_adds_match_a_full_rebuild(tmp_path):
+    corpus = RecipeCorpus(str(tmp_path / "a"))
+    corpus.add_recipes([tagged(1, "Indian"), tagged(2, "Italian")], save=False)
+    corpus.add_recipes([tagged(3, "Indian", protein=10)], save=False)
+    # A fuller payload for a known recipe moves it to another cuisine
+    corpus.add_recipes([dict(tagged(2, "Greek"), aggregateLikes=7)], save=False)
+
+    rebuilt = RecipeCorpus(str(tmp_path / "b"))
+    rebuilt.recipes = list(corpus.recipes)
+    rebuilt._rebuild()
+
+    assert_same_indexes(corpus, rebuilt)
+    assert "italian" not in corpus.index["cuisine"]
+    assert corpus.filter_mask("cuisine", "Greek").tolist() == [False, True, False]
+    assert [r["id"] for r in corpus.search({"cuisine": "Indian", "minProtein": 20})["results"]] == [1]
+
+
+def test_write_through_saves_are_deferred_until_flush(tmp_path):
+    corpus = RecipeCorpus(str(tmp_path / "corpus"), save_interval=3600)
+
+    corpus.add_recipes([tagged(1, "Indian")])
+    corpus.add_recipes([tagged(2, "Italian")])
+
+    # The first add saves; the second waits for the interval
+    assert len(RecipeCorpus(str(tmp_path / "corpus"))) == 1
+
+    corpus.flush()
+
+    reloaded = RecipeCorpus(str(tmp_path / "corpus"))
+    assert len(reloaded) == 2
+    assert_same_indexes(reloaded, corpus)
+    assert os.path.exists(tmp_path / "corpus" / "nutrients.npz")
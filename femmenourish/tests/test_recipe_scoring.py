@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from utils.recipe_scoring import build_nutrient_matrix, pcos_friendly_mask, pcos_scores, score_recipes
+from utils.spoonacular_client import SpoonacularClient
+
+
+def nutrition(**amounts):
+    return {"nutrients": [{"name": name.replace("_", "-"), "amount": amount, "unit": "g"}
+                          for name, amount in amounts.items()]}
+
+
+EDGE_CASES = [
+    nutrition(Sugar=5, Protein=20, Fiber=2, Omega_3=1.0),
+    nutrition(Sugar=5, Protein=20, Fiber=2, Omega_3="trace"),
+    nutrition(Sugar=5, Protein=20, Fiber=2, Omega_3=None),
+    nutrition(Sugar="low", Protein=20, Fiber=8),
+    nutrition(Sugar=5, Protein=None, Fiber=8),
+    nutrition(Sugar=5, Protein=20, Fiber="n/a", Omega_3=0.5),
+    nutrition(Sugar=5, Protein=20, Calories="unknown"),
+    nutrition(Sugar=30, Protein=40, Fiber=12),
+    nutrition(Protein=30),
+    {"nutrients": [{"name": "Sugar", "amount": 40}, {"name": "Sugar", "amount": 4}, {"name": "Fiber", "amount": 6}]},
+    {"nutrients": [{"name": "Sugar"}]},
+    {"nutrients": None},
+    {},
+    {"nutrition": nutrition(Sugar=3, Protein=16, Omega_3="x")},
+]
+
+
+def scalar(payloads):
+    nutritions = [p["nutrition"] if "nutrients" not in p and "nutrition" in p else p for p in payloads]
+    return (
+        [SpoonacularClient._is_pcos_friendly(None, n) for n in nutritions],
+        [SpoonacularClient._calculate_pcos_score(None, n) for n in nutritions],
+    )
+
+
+def random_payload(rng):
+    amounts = {}
+    for name in ("Sugar", "Protein", "Fiber", "Omega_3", "Calories", "Carbohydrates"):
+        roll = rng.random()
+        if roll < 0.1:
+            continue
+        amounts[name] = rng.choice(["?", None]) if roll < 0.2 else rng.uniform(0, 60)
+    return nutrition(**amounts)
+
+
+def test_edge_cases_match_scalar():
+    friendly, scores = score_recipes(EDGE_CASES)
+    expected_friendly, expected_scores = scalar(EDGE_CASES)
+
+    assert friendly.tolist() == expected_friendly
+    assert scores.tolist() == expected_scores
+
+
+def test_bad_omega3_does_not_change_friendliness():
+    friendly, scores = score_recipes(EDGE_CASES[:3])
+
+    assert friendly.tolist() == [True, True, True]
+    assert scores[0] != 50 and scores[1] == scores[2] == 50
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_mixed_batches_match_scalar(seed):
+    rng = random.Random(seed)
+    payloads = [random_payload(rng) for _ in range(500)]
+
+    amounts, present, valid = build_nutrient_matrix(payloads)
+    expected_friendly, expected_scores = scalar(payloads)
+
+    assert pcos_friendly_mask(amounts, present, valid).tolist() == expected_friendly
+    assert pcos_scores(amounts, present, valid).tolist() == expected_scores
+
+
+def test_well_formed_batch_uses_fast_path_and_matches_scalar():
+    rng = random.Random(7)
+    payloads = [nutrition(Sugar=rng.uniform(0, 40), Protein=rng.uniform(0, 40), Fiber=rng.uniform(0, 15))
+                for _ in range(200)]
+
+    friendly, scores = score_recipes(payloads)
+    expected_friendly, expected_scores = scalar(payloads)
+
+    assert friendly.tolist() == expected_friendly
+    assert scores.tolist() == expected_scores
@@ -0,0 +1,74 @@
+import pytest
+
+from utils import response_cache
+from utils.response_cache import ResponseCache, SQLiteResponseCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SQLiteResponseCache(str(tmp_path / "cache.sqlite"), ttls={"complexSearch": 60, "nocache": 0})
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_hit_after_set_and_stats(cache):
+    assert cache.get("recipes/complexSearch", {"cuisine": "Indian"}) is None
+
+    cache.set("recipes/complexSearch", {"cuisine": "Indian"}, {"results": [1]})
+
+    assert cache.get("recipes/complexSearch", {"cuisine": "Indian"}) == {"results": [1]}
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_ratio": 0.5, "entries": 1}
+
+
+def test_key_ignores_api_key_none_values_and_param_order(cache):
+    cache.set("recipes/complexSearch", {"apiKey": "old", "cuisine": "Indian", "type": "lunch"}, {"results": [1]})
+
+    assert cache.get("recipes/complexSearch", {"type": "lunch", "cuisine": "Indian", "apiKey": "new", "diet": None}) == {"results": [1]}
+    assert cache.get("recipes/complexSearch", {"cuisine": "Indian", "type": "dinner"}) is None
+
+
+def test_entries_expire_after_endpoint_ttl(cache, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache.time, "time", clock)
+
+    cache.set("recipes/complexSearch", {"cuisine": "Indian"}, {"results": [1]})
+    clock.now += 59
+    assert cache.contains("recipes/complexSearch", {"cuisine": "Indian"})
+
+    clock.now += 2
+    assert cache.get("recipes/complexSearch", {"cuisine": "Indian"}) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_zero_ttl_endpoints_are_not_stored(cache):
+    cache.set("recipes/nocache", {}, {"results": [1]})
+
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache.time, "time", clock)
+    cache = SQLiteResponseCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+
+    for recipe_id in (1, 2):
+        clock.now += 1
+        cache.set("recipes/information", {"id": recipe_id}, {"id": recipe_id})
+    clock.now += 1
+    cache.get("recipes/information", {"id": 1})
+    clock.now += 1
+    cache.set("recipes/information", {"id": 3}, {"id": 3})
+
+    assert cache.contains("recipes/information", {"id": 1})
+    assert not cache.contains("recipes/information", {"id": 2})
+
+
+def test_base_class_requires_storage():
+    with pytest.raises(TypeError):
+        ResponseCache()
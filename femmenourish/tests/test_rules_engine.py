@@ -0,0 +1,90 @@
+import itertools
+import json
+import os
+import shutil
+
+import pytest
+
+from utils.assessment import PCOSAssessment
+from utils.config import CONFIG_DIR, get_config, thaw
+from utils.rules_engine import CRITERIA_BITS, DEFAULT_THRESHOLDS, RulesEngine, compile_rules
+
+
+def first_phenotype(phenotypes, criteria_met):
+    """The original scalar lookup: first phenotype listing exactly these criteria."""
+    for phenotype_id, data in phenotypes.items():
+        if set(data["criteria"]) == set(criteria_met):
+            return phenotype_id
+    return None
+
+
+def subsets():
+    names = list(CRITERIA_BITS)
+    return [combo for size in range(len(names) + 1) for combo in itertools.combinations(names, size)]
+
+
+def test_phenotype_table_matches_scalar_lookup():
+    data = get_config("pcos_rules")
+    rules = compile_rules(data)
+
+    for combo in subsets():
+        assert rules.phenotype_for(combo) == first_phenotype(data["phenotypes"], combo)
+
+
+def test_missing_thresholds_fall_back_to_defaults():
+    data = thaw(get_config("pcos_rules"))
+    data.pop("thresholds", None)
+    rules = compile_rules(data)
+
+    assert rules.min_periods_per_year == DEFAULT_THRESHOLDS["oligoanovulation"]["min_periods_per_year"]
+    assert rules.obesity_bmi == DEFAULT_THRESHOLDS["obesity_bmi"]
+    assert rules.risk_bands == (DEFAULT_THRESHOLDS["risk_bands"]["high"], DEFAULT_THRESHOLDS["risk_bands"]["medium"])
+
+
+@pytest.mark.parametrize("score,level", [(0, "Low"), (39, "Low"), (40, "Medium"), (69, "Medium"), (70, "High"), (100, "High")])
+def test_risk_bands(score, level):
+    assert compile_rules(get_config("pcos_rules")).risk_level(score) == level
+
+
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / "pcos_rules.json"
+    shutil.copy(os.path.join(CONFIG_DIR, "pcos_rules.json"), path)
+    return path
+
+
+def rewrite(path, edit):
+    data = json.loads(path.read_text())
+    edit(data)
+    stat = os.stat(path)
+    path.write_text(json.dumps(data))
+    # Guarantee a new mtime even on coarse-grained filesystems
+    os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+
+
+def test_edits_reload_for_scalar_and_cohort_paths(rules_file):
+    import pandas as pd
+
+    assessor = PCOSAssessment(str(rules_file))
+    assessor.engine.source.check_interval = 0
+    history = {"bmi": 27}
+    cohort = pd.DataFrame({"bmi": [27.0]})
+
+    before = assessor.calculate_risk_score({}, history)
+    rewrite(rules_file, lambda data: data.setdefault("thresholds", {}).update({"obesity_bmi": 25}))
+
+    after = assessor.calculate_risk_score({}, history)
+    assert after == before + assessor.rules.obesity_points
+    assert assessor.evaluate_cohort(cohort)["risk_score"].tolist() == [after]
+
+
+def test_invalid_edit_keeps_last_good_rules(rules_file):
+    engine = RulesEngine(str(rules_file))
+    engine.source.check_interval = 0
+    good = engine.rules
+
+    stat = os.stat(rules_file)
+    rules_file.write_text("{ not json")
+    os.utime(rules_file, (stat.st_atime, stat.st_mtime + 5))
+
+    assert engine.rules is good
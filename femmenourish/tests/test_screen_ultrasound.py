@@ -0,0 +1,66 @@
+import json
+
+from screen_ultrasound import end_last_line, load_checkpoint, read_records, summarize, write_parquet
+
+
+def write_records(path, records):
+    with open(path, 'w') as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        # Interrupted write
+        f.write('{"path": "trunc')
+
+
+def test_checkpoint_counts_only_successes(tmp_path):
+    output = tmp_path / "results.jsonl"
+    write_records(output, [
+        {"path": "ok.png", "prediction": "positive", "method": "deep_learning", "error": None},
+        {"path": "broken.png", "prediction": "error", "method": None, "error": "Could not process image"},
+        {"path": "fallback.png", "prediction": "clinical_review", "method": "clinical_assessment", "error": None},
+    ])
+
+    assert load_checkpoint(str(output)) == {"ok.png"}
+
+
+def test_retried_record_replaces_failure(tmp_path, capsys):
+    output = tmp_path / "results.jsonl"
+    write_records(output, [
+        {"path": "a.png", "label": "positive", "prediction": "error", "error": "timeout", "latency_ms": 5.0},
+        {"path": "a.png", "label": "positive", "prediction": "positive", "method": "deep_learning",
+         "error": None, "latency_ms": 4.0},
+    ])
+
+    assert load_checkpoint(str(output)) == {"a.png"}
+    assert read_records(str(output))["a.png"]["prediction"] == "positive"
+
+    summarize(str(output), processed=1, elapsed=1.0)
+    out = capsys.readouterr().out
+    assert "Images recorded:   1 (1 this run, 0 errors)" in out
+    assert "Accuracy:          100.0%" in out
+
+
+def test_append_after_truncated_line_starts_a_new_line(tmp_path):
+    output = tmp_path / "results.jsonl"
+    write_records(output, [{"path": "a.png", "prediction": "positive", "error": None}])
+
+    end_last_line(str(output))
+    with open(output, 'a') as f:
+        f.write(json.dumps({"path": "b.png", "prediction": "negative", "error": None}) + "\n")
+
+    assert set(read_records(str(output))) == {"a.png", "b.png"}
+
+
+def test_parquet_holds_latest_record_per_image(tmp_path):
+    import pandas as pd
+
+    output = tmp_path / "results.jsonl"
+    write_records(output, [
+        {"path": "a.png", "prediction": "error", "error": "timeout", "result": {}},
+        {"path": "a.png", "prediction": "positive", "error": None, "result": {"pcos_pattern": "positive"}},
+        {"path": "b.png", "prediction": "negative", "error": None, "result": {"pcos_pattern": "negative"}},
+    ])
+
+    write_parquet(str(output), str(tmp_path / "results.parquet"))
+
+    df = pd.read_parquet(tmp_path / "results.parquet")
+    assert sorted(zip(df["path"], df["prediction"])) == [("a.png", "positive"), ("b.png", "negative")]
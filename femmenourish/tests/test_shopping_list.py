@@ -0,0 +1,53 @@
+from utils.shopping_list import apply_costs, build_shopping_list
+
+CITY = {"common_stores": ["Local Vegetable Market", "Big Bazaar"]}
+
+
+def recipe(recipe_id, ingredients, servings=1):
+    return {
+        "id": recipe_id,
+        "servings": servings,
+        "extendedIngredients": [
+            {"name": name, "amount": amount, "unit": unit, "aisle": aisle}
+            for name, amount, unit, aisle in ingredients
+        ],
+    }
+
+
+def items(shopping_list):
+    return {item["item"]: (category, item) for category, entries in shopping_list["categories"].items() for item in entries}
+
+
+def test_amounts_are_merged_across_names_and_units():
+    shopping_list = build_shopping_list([
+        recipe(1, [("Tomatoes", 200, "g", "Produce"), ("olive oil", 1, "tbsp", "Oil, Vinegar, Salad Dressing")]),
+        recipe(2, [("tomato", 0.5, "kg", "Produce")]),
+    ], CITY)
+
+    listed = items(shopping_list)
+    category, tomato = listed["Tomato"]
+    assert category == "Vegetables"
+    assert tomato["quantity"] == "700 g"
+    assert tomato["where"] == "Local Vegetable Market"
+    assert shopping_list["source"] == "local"
+
+
+def test_pantry_staples_are_left_out_and_servings_scale_amounts():
+    shopping_list = build_shopping_list([
+        recipe(1, [("salt", 1, "tsp", "Spices and Seasonings"), ("paneer", 400, "g", "Cheese")], servings=4),
+    ], CITY, num_people=2)
+
+    listed = items(shopping_list)
+    assert "Salt" not in listed
+    assert listed["Paneer"][0] == "Dairy & Eggs"
+    assert listed["Paneer"][1]["quantity"] == "200 g"
+
+
+def test_costs_attach_to_matching_items():
+    shopping_list = build_shopping_list([recipe(1, [("spinach", 250, "g", "Produce")])], CITY)
+
+    priced = apply_costs(shopping_list, {"costs": {"Spinach": "₹30"}, "total_estimated_cost": "₹30"})
+
+    assert items(priced)["Spinach"][1]["cost"] == "₹30"
+    assert priced["total_estimated_cost"] == "₹30"
+    assert "cost" not in items(shopping_list)["Spinach"][1]
@@ -0,0 +1,158 @@
+import json
+
+import pytest
+import requests
+
+import utils.spoonacular_client as spoonacular_client
+from tests.conftest import make_recipe
+from utils.quota import QuotaManager
+from utils.spoonacular_client import SpoonacularClient
+
+
+class FakeNutritionAPI:
+    """Serves informationBulk and nutritionWidget.json, recording every request."""
+
+    def __init__(self, recipes, bulk_omits=()):
+        self.recipes = {recipe["id"]: recipe for recipe in recipes}
+        self.bulk_omits = set(bulk_omits)
+        self.calls = []
+
+    def __call__(self, endpoint, params):
+        self.calls.append((endpoint, dict(params)))
+        if endpoint == "recipes/informationBulk":
+            ids = [int(rid) for rid in params["ids"].split(",")]
+            return [dict(self.recipes[rid]) for rid in ids if rid not in self.bulk_omits]
+        recipe_id = int(endpoint.split("/")[1])
+        return self.recipes[recipe_id]["nutrition"]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("SPOONACULAR_API_KEY", "test")
+    return SpoonacularClient(
+        use_cache=False,
+        use_corpus=False,
+        quota=QuotaManager(path=str(tmp_path / "quota.sqlite"))
+    )
+
+
+RECIPES = [make_recipe(recipe_id, f"Recipe {recipe_id}") for recipe_id in range(1, 6)]
+
+
+def test_bulk_nutrition_is_one_request_for_all_ids(client):
+    client._make_request = FakeNutritionAPI(RECIPES)
+    details = {}
+
+    nutrition = client.get_recipes_nutrition_bulk([1, 2, 2, None, 3], details=details)
+
+    assert [endpoint for endpoint, _ in client._make_request.calls] == ["recipes/informationBulk"]
+    assert client._make_request.calls[0][1]["ids"] == "1,2,3"
+    assert set(nutrition) == set(details) == {1, 2, 3}
+    assert details[1]["extendedIngredients"]
+
+
+def test_bulk_nutrition_fetches_only_uncached_ids(client):
+    client._make_request = FakeNutritionAPI(RECIPES)
+    client.get_recipes_nutrition_bulk([1, 2])
+
+    nutrition = client.get_recipes_nutrition_bulk([1, 2, 4])
+
+    assert set(nutrition) == {1, 2, 4}
+    assert client._make_request.calls[-1][1]["ids"] == "4"
+    assert len(client._make_request.calls) == 2
+
+
+def test_recipes_missing_from_bulk_fall_back_to_single_requests(client):
+    client._make_request = FakeNutritionAPI(RECIPES, bulk_omits={5})
+
+    nutrition = client.get_recipes_nutrition_bulk([4, 5])
+
+    assert set(nutrition) == {4, 5}
+    assert [endpoint for endpoint, _ in client._make_request.calls] == [
+        "recipes/informationBulk", "recipes/5/nutritionWidget.json"
+    ]
+
+
+def response(status, body=None, headers=None):
+    resp = requests.models.Response()
+    resp.status_code = status
+    resp._content = json.dumps(body if body is not None else {}).encode()
+    resp.headers.update(headers or {})
+    resp.url = "https://api.spoonacular.com/recipes/complexSearch"
+    return resp
+
+
+class FakeSession:
+    """requests.Session stand-in returning queued responses or raising queued exceptions."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def retrying_client(tmp_path, monkeypatch):
+    monkeypatch.setenv("SPOONACULAR_API_KEY", "test")
+    client = SpoonacularClient(
+        use_cache=False,
+        use_corpus=False,
+        quota=QuotaManager(path=str(tmp_path / "quota.sqlite"), requests_per_second=0),
+        max_retries=3,
+        backoff_base=0.5,
+        backoff_max=4.0
+    )
+    client.sleeps = []
+    monkeypatch.setattr(spoonacular_client.time, "sleep", client.sleeps.append)
+    return client
+
+
+def test_transient_errors_are_retried_with_capped_backoff(retrying_client):
+    retrying_client._session = FakeSession([
+        response(503),
+        requests.exceptions.ConnectionError("reset"),
+        response(429, headers={"Retry-After": "2"}),
+        response(200, {"results": [1]}),
+    ])
+
+    result = retrying_client._make_request("recipes/complexSearch", {"number": 2})
+
+    assert result == {"results": [1]}
+    assert retrying_client._session.calls == 4
+    assert len(retrying_client.sleeps) == 3
+    assert retrying_client.sleeps[0] <= 0.5 and retrying_client.sleeps[1] <= 1.0
+    assert retrying_client.sleeps[2] >= 2
+    assert retrying_client.quota.used_today() == pytest.approx(1.02)
+
+
+def test_long_retry_after_fails_fast_and_refunds_quota(retrying_client):
+    retrying_client._session = FakeSession([response(429, headers={"Retry-After": "120"})])
+
+    result = retrying_client._make_request("recipes/complexSearch", {"number": 2})
+
+    assert "rate limit" in result["error"]
+    assert retrying_client._session.calls == 1
+    assert retrying_client.sleeps == []
+    assert retrying_client.quota.used_today() == 0
+
+
+def test_retries_stop_after_max_retries(retrying_client):
+    retrying_client._session = FakeSession([response(500)] * 4)
+
+    result = retrying_client._make_request("recipes/complexSearch", {"number": 2})
+
+    assert result == {"error": "HTTP error: 500"}
+    assert retrying_client._session.calls == 4
+    assert all(0 <= delay <= 4.0 for delay in retrying_client.sleeps)
+
+
+def test_backoff_ceiling_doubles_up_to_the_cap(retrying_client, monkeypatch):
+    monkeypatch.setattr(spoonacular_client.random, "uniform", lambda low, high: high)
+
+    assert [retrying_client._backoff_delay(attempt) for attempt in range(5)] == [0.5, 1.0, 2.0, 4.0, 4.0]
@@ -2,4 +2,4 @@
 Utility modules for OvaWell Clinical Suite
 """
 
-__all__ = ['gemini_client', 'spoonacular_client', 'image_analyzer', 'assessment', 'pdf_generator']
+__all__ = ['gemini_client', 'spoonacular_client', 'image_analyzer', 'assessment', 'pdf_generator', 'meal_planner', 'response_cache', 'recipe_scoring', 'lazy', 'quota', 'recipe_corpus', 'ingredient_index', 'meal_optimizer', 'plan_updates', 'shopping_list', 'prompt_builder', 'answer_cache', 'rules_engine', 'config', 'job_queue', 'plan_jobs']
@@ -0,0 +1,210 @@
+"""
+Answer Cache for Gemini nutrition questions.
+Returns a stored answer when a new question is a near-duplicate of one
+already answered for the same context, so repeated clinician questions
+skip the LLM round-trip.
+
+Questions are normalized and compared by TF-IDF cosine similarity over
+their singularized content words. Context must match exactly after normalization,
+and questions that differ in negation ("safe" vs "not safe") never match.
+"""
+
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.ingredient_index import ingredient_tokens
+
+
+STOPWORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "to", "of", "for", "in", "on", "at", "and", "or",
+    "it", "its", "this", "that", "do", "does", "can", "could", "should", "would", "i", "my", "we", "you",
+    "what", "which", "how", "about", "with", "as", "by", "from", "patient", "patients", "pcos", "s",
+    "take", "taking", "use", "using", "combine", "together", "any", "there", "much", "many",
+})
+
+# Kept as tokens and compared as a set, since they flip a question's meaning
+NEGATIONS = frozenset({"not", "no", "never", "without", "avoid", "unsafe", "contraindicated", "stop"})
+
+DEFAULT_THRESHOLD = 0.85
+DEFAULT_TTL = 7 * 24 * 3600
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Lowercase, expand n't, and collapse punctuation and whitespace."""
+    text = str(text or "").lower().replace("n't", " not")
+    return " ".join(re.sub(r"[^a-z0-9 ]+", " ", text).split())
+
+
+def question_terms(question: str) -> List[str]:
+    """Content words of a normalized question, singularized."""
+    return ingredient_tokens(" ".join(word for word in question.split() if word not in STOPWORDS))
+
+
+class AnswerCache:
+    """In-memory near-duplicate answer cache with TTL expiry and LRU eviction."""
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        ttl: int = DEFAULT_TTL,
+        max_entries: int = 500
+    ):
+        """
+        Initialize answer cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a near-duplicate hit
+            ttl: Seconds an answer stays valid
+            max_entries: Maximum entries kept before evicting least recently used
+        """
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        # (question, context) -> entry; order is least to most recently used
+        self._entries: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # TF-IDF matrix over current entries, rebuilt lazily after changes
+        self._keys: List[Tuple[str, str]] = []
+        self._vocabulary: Dict[str, int] = {}
+        self._idf = np.zeros(0)
+        self._matrix = np.zeros((0, 0))
+        self._dirty = False
+
+        self.hits = 0
+        self.misses = 0
+        self.latency_saved = 0.0
+
+    def get(self, question: str, context: Optional[str] = None) -> Optional[str]:
+        """
+        Look up an answer for the question, exact or near-duplicate.
+
+        Returns:
+            Cached answer, or None on miss
+        """
+        key = (normalize_text(question), normalize_text(context))
+
+        with self._lock:
+            self._expire()
+            match = key if key in self._entries else self._nearest(key)
+
+            if match is None:
+                self.misses += 1
+                return None
+
+            entry = self._entries[match]
+            self._entries.move_to_end(match)
+            self.hits += 1
+            self.latency_saved += entry["latency"]
+            return entry["answer"]
+
+    def set(self, question: str, context: Optional[str], answer: str, latency: float = 0.0) -> None:
+        """
+        Store an answer.
+
+        Args:
+            question: Question as asked
+            context: Context the answer was generated for
+            answer: Model answer
+            latency: Seconds the model call took, credited to latency_saved on hits
+        """
+        key = (normalize_text(question), normalize_text(context))
+
+        with self._lock:
+            self._entries[key] = {"answer": answer, "latency": latency, "expires_at": time.time() + self.ttl}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def stats(self) -> Dict:
+        """
+        Get hit/miss statistics.
+
+        Returns:
+            Dict with hits, misses, hit_ratio, entries and latency_saved in seconds
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+            "latency_saved": self.latency_saved
+        }
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+
+    def _expire(self) -> None:
+        now = time.time()
+        expired = [key for key, entry in self._entries.items() if entry["expires_at"] < now]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._dirty = True
+
+    def _rebuild(self) -> None:
+        """Recompute IDF weights and L2-normalized TF-IDF rows for all entries."""
+        self._keys = list(self._entries)
+        term_counts = [Counter(question_terms(question)) for question, _ in self._keys]
+
+        document_frequency = Counter(term for counts in term_counts for term in counts)
+        self._vocabulary = {term: i for i, term in enumerate(document_frequency)}
+        self._idf = np.array([
+            math.log((1 + len(self._keys)) / (1 + document_frequency[term])) + 1 for term in self._vocabulary
+        ])
+
+        self._matrix = np.zeros((len(self._keys), len(self._vocabulary)))
+        for row, counts in enumerate(term_counts):
+            for term, count in counts.items():
+                self._matrix[row, self._vocabulary[term]] = count
+        self._matrix *= self._idf
+        norms = np.linalg.norm(self._matrix, axis=1, keepdims=True)
+        self._matrix /= np.where(norms > 0, norms, 1.0)
+
+        self._dirty = False
+
+    def _nearest(self, key: Tuple[str, str]) -> Optional[Tuple[str, str]]:
+        """Most similar stored question with the same context, if above threshold."""
+        if not self._entries:
+            return None
+        if self._dirty:
+            self._rebuild()
+
+        question, context = key
+        query = np.zeros(len(self._vocabulary))
+        # Terms no stored question has still count toward the query's norm,
+        # with the highest IDF, so new words lower the similarity
+        unseen_weight = math.log(1 + len(self._keys)) + 1
+        unseen = 0.0
+        for term, count in Counter(question_terms(question)).items():
+            if term in self._vocabulary:
+                query[self._vocabulary[term]] = count
+            else:
+                unseen += (count * unseen_weight) ** 2
+        query *= self._idf
+        norm = math.sqrt(float(query @ query) + unseen)
+        if norm == 0:
+            return None
+
+        similarity = self._matrix @ (query / norm)
+        negations = NEGATIONS.intersection(question.split())
+
+        for row in np.argsort(-similarity):
+            if similarity[row] < self.threshold:
+                break
+            candidate = self._keys[row]
+            if candidate[1] == context and NEGATIONS.intersection(candidate[0].split()) == negations:
+                return candidate
+        return None
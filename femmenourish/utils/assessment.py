@@ -1,11 +1,19 @@
 """
 PCOS Assessment Module
 Handles Rotterdam criteria evaluation and risk scoring.
+
+Both the per-patient and the cohort paths run against the compiled rules
+from utils.rules_engine, which reload when pcos_rules.json changes.
 """
 
-import json
 from typing import Dict, List, Optional
 
+from utils.rules_engine import CRITERIA_BITS, CompiledRules, RulesEngine
+
+
+# Values assumed when a key is missing; NaN cohort cells count as missing
+INPUT_DEFAULTS = {"periods_per_year": 12, "cycle_length": 28, "bmi": 0}
+
 
 class PCOSAssessment:
     def __init__(self, criteria_file: str = "config/pcos_rules.json"):
@@ -13,14 +21,30 @@ class PCOSAssessment:
         Initialize assessment module with PCOS criteria.
         
         Args:
-            criteria_file: Path to PCOS criteria JSON file
+            criteria_file: Path to PCOS criteria JSON file, relative to the package
         """
-        with open(criteria_file, 'r') as f:
-            self.criteria_data = json.load(f)
-        
-        self.rotterdam = self.criteria_data['rotterdam_criteria']
-        self.phenotypes = self.criteria_data['phenotypes']
-        self.risk_factors = self.criteria_data['risk_factors']
+        self.engine = RulesEngine(criteria_file)
+    
+    @property
+    def rules(self) -> CompiledRules:
+        """Compiled rules, reloaded if the criteria file changed."""
+        return self.engine.rules
+    
+    @property
+    def criteria_data(self):
+        return self.rules.data
+    
+    @property
+    def rotterdam(self):
+        return self.rules.data['rotterdam_criteria']
+    
+    @property
+    def phenotypes(self):
+        return self.rules.phenotypes
+    
+    @property
+    def risk_factors(self):
+        return self.rules.data['risk_factors']
     
     def evaluate_rotterdam_criteria(
         self,
@@ -37,19 +61,20 @@ class PCOSAssessment:
         Returns:
             Dict with criteria evaluation
         """
+        rules = self.rules
         criteria_met = []
         evidence = {}
         
         # Criterion 1: Oligo-ovulation/Anovulation
-        periods_per_year = symptoms.get('periods_per_year', 12)
-        cycle_length = symptoms.get('cycle_length', 28)
+        periods_per_year = symptoms.get('periods_per_year', INPUT_DEFAULTS['periods_per_year'])
+        cycle_length = symptoms.get('cycle_length', INPUT_DEFAULTS['cycle_length'])
         
-        if periods_per_year < 9 or cycle_length > 35:
+        if periods_per_year < rules.min_periods_per_year or cycle_length > rules.max_cycle_length_days:
             criteria_met.append("oligoanovulation")
-            if periods_per_year < 9:
-                evidence["oligoanovulation"] = f"Irregular menstrual cycles - only {periods_per_year} periods per year (< 9 indicates oligo-ovulation)"
+            if periods_per_year < rules.min_periods_per_year:
+                evidence["oligoanovulation"] = f"Irregular menstrual cycles - only {periods_per_year} periods per year (< {rules.min_periods_per_year} indicates oligo-ovulation)"
             else:
-                evidence["oligoanovulation"] = f"Prolonged menstrual cycles - average {cycle_length} days (> 35 days indicates irregular ovulation)"
+                evidence["oligoanovulation"] = f"Prolonged menstrual cycles - average {cycle_length} days (> {rules.max_cycle_length_days} days indicates irregular ovulation)"
         else:
             evidence["oligoanovulation"] = "Regular menstrual cycles - criterion not met"
         
@@ -93,7 +118,7 @@ class PCOSAssessment:
         # Determine phenotype if PCOS
         phenotype = None
         if diagnosis == "PCOS":
-            phenotype = self._determine_phenotype(criteria_met)
+            phenotype = rules.phenotype_for(criteria_met)
         
         return {
             "rotterdam_score": f"{rotterdam_score}/3",
@@ -114,14 +139,7 @@ class PCOSAssessment:
         Returns:
             Phenotype letter (A, B, C, D) or None
         """
-        criteria_set = set(criteria_met)
-        
-        for phenotype_id, phenotype_data in self.phenotypes.items():
-            phenotype_criteria = set(phenotype_data['criteria'])
-            if criteria_set == phenotype_criteria:
-                return phenotype_id
-        
-        return None
+        return self.rules.phenotype_for(criteria_met)
     
     def calculate_risk_score(
         self,
@@ -138,35 +156,113 @@ class PCOSAssessment:
         Returns:
             Risk score from 0-100
         """
+        rules = self.rules
         base_score = 0
         
         # Check each risk factor
-        if patient_history.get('family_history'):
-            base_score += self.risk_factors['family_history']['risk_increase']
-        
-        bmi = patient_history.get('bmi', 0)
-        if bmi >= 30:
-            base_score += self.risk_factors['obesity']['risk_increase']
-        
-        if patient_history.get('insulin_resistance'):
-            base_score += self.risk_factors['insulin_resistance']['risk_increase']
+        for name, weight in zip(rules.risk_flag_names, rules.risk_flag_weights):
+            if patient_history.get(name):
+                base_score += int(weight)
         
-        if patient_history.get('metabolic_syndrome'):
-            base_score += self.risk_factors['metabolic_syndrome']['risk_increase']
+        bmi = patient_history.get('bmi', INPUT_DEFAULTS['bmi'])
+        if bmi >= rules.obesity_bmi:
+            base_score += rules.obesity_points
         
         # Add points for symptoms
-        if symptoms.get('periods_per_year', 12) < 9:
-            base_score += 15
+        if symptoms.get('periods_per_year', INPUT_DEFAULTS['periods_per_year']) < rules.min_periods_per_year:
+            base_score += rules.symptom_points['irregular_periods']
         
         if symptoms.get('hirsutism'):
-            base_score += 10
+            base_score += rules.symptom_points['hirsutism']
         
         if symptoms.get('acne'):
-            base_score += 10
+            base_score += rules.symptom_points['acne']
         
         # Cap at 100
         return min(100, base_score)
     
+    def risk_level(self, risk_score: float) -> str:
+        """Map a risk score to High/Medium/Low using the configured risk bands."""
+        return self.rules.risk_level(risk_score)
+    
+    def evaluate_cohort(self, records) -> "pd.DataFrame":
+        """
+        Evaluate Rotterdam criteria, phenotype and risk score for a whole cohort
+        with column operations. Results match evaluate_rotterdam_criteria and
+        calculate_risk_score row for row; a missing column or NaN cell behaves
+        like a key missing from the patient dicts.
+        
+        Args:
+            records: pandas DataFrame or pyarrow Table with any of the symptom
+                and history keys (periods_per_year, cycle_length, hirsutism, acne,
+                hair_loss, testosterone_elevated, family_history, bmi,
+                insulin_resistance, metabolic_syndrome) and pcos_pattern, the
+                ultrasound outcome (NaN when no ultrasound was done)
+        
+        Returns:
+            DataFrame on the input index with oligoanovulation, hyperandrogenism
+            and polycystic_ovaries masks, criteria_count, diagnosis, phenotype
+            and risk_score
+        """
+        import numpy as np
+        import pandas as pd
+        
+        rules = self.rules
+        df = records.to_pandas() if hasattr(records, "to_pandas") else records
+        
+        def number(name: str) -> np.ndarray:
+            if name not in df:
+                return np.full(len(df), INPUT_DEFAULTS[name], dtype=np.float64)
+            return pd.to_numeric(df[name]).fillna(INPUT_DEFAULTS[name]).to_numpy(dtype=np.float64)
+        
+        def flag(name: str) -> np.ndarray:
+            # Python truthiness per cell, like the scalar path's `if value:`
+            if name not in df:
+                return np.zeros(len(df), dtype=bool)
+            column = df[name]
+            return column.where(column.notna(), False).astype(bool).to_numpy()
+        
+        irregular_periods = number('periods_per_year') < rules.min_periods_per_year
+        hirsutism = flag('hirsutism')
+        acne = flag('acne')
+        
+        oligo = irregular_periods | (number('cycle_length') > rules.max_cycle_length_days)
+        hyper = hirsutism | acne | flag('hair_loss') | flag('testosterone_elevated')
+        pco = (df['pcos_pattern'] == 'positive').to_numpy() if 'pcos_pattern' in df else np.zeros(len(df), dtype=bool)
+        
+        mask = (
+            oligo * CRITERIA_BITS['oligoanovulation']
+            + hyper * CRITERIA_BITS['hyperandrogenism']
+            + pco * CRITERIA_BITS['polycystic_ovaries']
+        )
+        count = oligo.astype(np.int64) + hyper + pco
+        diagnosed = count >= 2
+        
+        phenotype = np.where(diagnosed, rules.phenotype_lookup[mask], None)
+        
+        flags = np.zeros((len(df), len(rules.risk_flag_names)), dtype=np.int64)
+        for column, name in enumerate(rules.risk_flag_names):
+            flags[:, column] = flag(name)
+        
+        risk = (
+            flags @ rules.risk_flag_weights
+            + (number('bmi') >= rules.obesity_bmi) * rules.obesity_points
+            + irregular_periods * rules.symptom_points['irregular_periods']
+            + hirsutism * rules.symptom_points['hirsutism']
+            + acne * rules.symptom_points['acne']
+        )
+        
+        return pd.DataFrame({
+            'oligoanovulation': oligo,
+            'hyperandrogenism': hyper,
+            'polycystic_ovaries': pco,
+            'criteria_count': count,
+            'diagnosis': np.where(diagnosed, "PCOS", "Not PCOS"),
+            # Object dtype keeps None for "no phenotype" instead of NaN
+            'phenotype': pd.Series(phenotype, index=df.index, dtype=object),
+            'risk_score': np.minimum(100, risk).astype(np.int64)
+        }, index=df.index)
+    
     def get_recommendations(
         self,
         diagnosis: str,
@@ -206,7 +302,7 @@ class PCOSAssessment:
             recommendations.append("Monitor weight - 5-10% reduction can restore ovulation")
         
         else:
-            if risk_score > 40:
+            if risk_score > self.rules.risk_bands[1]:
                 recommendations.append("PCOS not confirmed, but moderate risk factors present")
                 recommendations.append("Consider repeating assessment in 6 months if symptoms persist")
                 recommendations.append("Lifestyle modifications still beneficial for symptom management")
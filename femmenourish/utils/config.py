@@ -0,0 +1,226 @@
+"""
+Shared Configuration
+Parses each JSON file under config/ once per process into read-only
+structures (mapping proxies and tuples) that every module shares without
+copying. Paths resolve relative to the package, not the working directory.
+
+Files are schema-checked on first load; a file that fails the check
+raises ConfigError. Afterwards a file is reloaded when its mtime changes.
+An edit that fails to parse or validate keeps the last good version.
+"""
+
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional
+
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_DIR = os.path.join(PACKAGE_DIR, "config")
+
+CONFIG_FILES = {
+    "cities": "cities.json",
+    "pcos_rules": "pcos_rules.json",
+    "ui_config": "ui_config.json",
+}
+
+# Required keys and their JSON types, per file name
+SCHEMAS = {
+    "cities.json": {"cities": dict},
+    "pcos_rules.json": {
+        "rotterdam_criteria": dict,
+        "phenotypes": dict,
+        "risk_factors": dict,
+        "pcos_nutrition_guidelines": dict,
+    },
+    "ui_config.json": {"app_info": dict, "messages": dict, "help_text": dict, "placeholders": dict},
+}
+
+CITY_FIELDS = {
+    "name": str,
+    "region": str,
+    "currency_symbol": str,
+    "cuisine_tags": list,
+    "spoonacular_cuisine": str,
+    "common_stores": list,
+    "budget_multiplier": (int, float),
+}
+PHENOTYPE_FIELDS = {"criteria": list}
+RISK_FACTOR_FIELDS = {"risk_increase": (int, float)}
+
+
+class ConfigError(ValueError):
+    """A configuration file is missing required keys or has the wrong types."""
+
+
+def freeze(value: Any) -> Any:
+    """Recursively wrap dicts in read-only mapping proxies and lists in tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Mutable deep copy of a frozen structure, e.g. for json.dumps or editing."""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(v) for v in value]
+    return value
+
+
+def _check_fields(obj: Dict, fields: Dict, where: str, errors: List[str]) -> None:
+    if not isinstance(obj, dict):
+        errors.append(f"{where}: expected object")
+        return
+    for key, expected in fields.items():
+        if key not in obj:
+            errors.append(f"{where}: missing '{key}'")
+        elif not isinstance(obj[key], expected) or isinstance(obj[key], bool) and expected is not bool:
+            errors.append(f"{where}.{key}: expected {getattr(expected, '__name__', 'number')}")
+
+
+def validate(name: str, data: Any) -> None:
+    """
+    Check a parsed config file against its schema.
+
+    Args:
+        name: File name, e.g. "cities.json"; files without a schema only need to be objects
+        data: Parsed JSON
+
+    Raises:
+        ConfigError: Listing every problem found
+    """
+    if not isinstance(data, dict):
+        raise ConfigError(f"{name}: top level must be an object")
+
+    errors: List[str] = []
+    _check_fields(data, SCHEMAS.get(name, {}), name, errors)
+
+    if name == "cities.json" and isinstance(data.get("cities"), dict):
+        for city, info in data["cities"].items():
+            _check_fields(info, CITY_FIELDS, f"cities.{city}", errors)
+    elif name == "pcos_rules.json":
+        for section, fields in (("phenotypes", PHENOTYPE_FIELDS), ("risk_factors", RISK_FACTOR_FIELDS)):
+            if isinstance(data.get(section), dict):
+                for key, entry in data[section].items():
+                    _check_fields(entry, fields, f"{section}.{key}", errors)
+
+    if errors:
+        raise ConfigError("; ".join(errors))
+
+
+def resolve_path(path: str) -> str:
+    """Absolute path for a config name ("cities"), or a path relative to the package."""
+    if path in CONFIG_FILES:
+        path = os.path.join(CONFIG_DIR, CONFIG_FILES[path])
+    elif not os.path.isabs(path):
+        path = os.path.join(PACKAGE_DIR, path)
+    return os.path.realpath(path)
+
+
+class ConfigFile:
+    """One parsed, frozen config file, reloaded when its mtime changes."""
+
+    def __init__(self, path: str, check_interval: float = 1.0):
+        """
+        Load, validate and freeze a config file.
+
+        Args:
+            path: Absolute path to the JSON file
+            check_interval: Minimum seconds between mtime checks
+
+        Raises:
+            ConfigError: If the file does not match its schema
+        """
+        self.path = path
+        self.name = os.path.basename(path)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._failed_mtime = None
+        self._checked_at = time.monotonic()
+        self.mtime, self._data = self._load()
+
+    def _load(self):
+        mtime = os.stat(self.path).st_mtime
+        with open(self.path, 'r') as f:
+            data = json.load(f)
+        validate(self.name, data)
+        return mtime, freeze(data)
+
+    @property
+    def data(self) -> MappingProxyType:
+        """Current contents, reloaded first if the file changed."""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._data
+        self._checked_at = now
+
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return self._data
+
+        if mtime != self.mtime and mtime != self._failed_mtime:
+            with self._lock:
+                try:
+                    if os.stat(self.path).st_mtime != self.mtime:
+                        self.mtime, self._data = self._load()
+                        print(f"🔄 Reloaded {self.name}")
+                except (OSError, ValueError) as e:
+                    # A half-written or invalid edit keeps the last good version until the next save
+                    self._failed_mtime = mtime
+                    print(f"⚠️ Could not reload {self.path}: {e}")
+        return self._data
+
+
+_files: Dict[str, ConfigFile] = {}
+_files_lock = threading.Lock()
+
+
+def config_file(path: str) -> ConfigFile:
+    """
+    Process-wide ConfigFile for a config name or path; each file is parsed once.
+
+    Args:
+        path: A key of CONFIG_FILES, or a path (relative paths are package-relative)
+
+    Returns:
+        Shared ConfigFile
+    """
+    # Keyed by both the name asked for and the resolved path; relative paths
+    # never depend on the working directory, so the name alone is a safe key
+    cached = _files.get(path)
+    if cached is not None:
+        return cached
+
+    resolved = resolve_path(path)
+    with _files_lock:
+        if resolved not in _files:
+            _files[resolved] = ConfigFile(resolved)
+        _files[path] = _files[resolved]
+        return _files[resolved]
+
+
+def get_config(name: str) -> MappingProxyType:
+    """Read-only contents of a config file, e.g. get_config("cities")["cities"]["Pune"]."""
+    return config_file(name).data
+
+
+def validate_all() -> Optional[str]:
+    """
+    Load and validate every file in CONFIG_FILES.
+
+    Returns:
+        None if all are valid, otherwise the first error message
+    """
+    for name in CONFIG_FILES:
+        try:
+            config_file(name)
+        except (OSError, ValueError) as e:
+            return f"{CONFIG_FILES[name]}: {e}"
+    return None
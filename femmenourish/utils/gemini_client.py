@@ -3,25 +3,131 @@ Gemini AI Client for PCOS assessment and meal plan customization.
 Handles all interactions with Google's Gemini API.
 """
 
-import google.generativeai as genai
 import os
+import copy
+import hashlib
 import json
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dotenv import load_dotenv
 from typing import Dict, List, Optional
 
+from utils.answer_cache import AnswerCache
+from utils.prompt_builder import (
+    ADAPTATION_OUTPUT_TOKENS, DEFAULT_TOKEN_BUDGET, compact_json, estimate_tokens, pack,
+    project_meal_plan, project_recipe
+)
+
 load_dotenv()
 
+MODEL_NAME = "gemini-1.5-pro"
+
+# Bump when the assessment prompt changes so memoized results are not reused
+ASSESSMENT_PROMPT_VERSION = 2
+ASSESSMENT_TEMPERATURE = 0.0
+
+# Never part of the memoization key, wherever they appear in the inputs
+IDENTIFYING_FIELDS = frozenset({
+    "patient_name", "name", "patient_id", "mrn", "email", "phone", "date_of_birth", "dob",
+    "image_path", "path", "filename", "file_name", "timestamp"
+})
+
+
+def _canonical(value):
+    """Normalize a prompt input: trimmed strings, rounded numbers, sorted dicts without identifying fields."""
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        rounded = round(float(value), 1)
+        return int(rounded) if rounded.is_integer() else rounded
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {
+            str(k): _canonical(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))
+            if str(k).lower() not in IDENTIFYING_FIELDS
+        }
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return str(value)
+
+
+def assessment_inputs(
+    symptoms: Dict,
+    ultrasound_result: Optional[Dict] = None,
+    patient_history: Optional[Dict] = None
+) -> Dict:
+    """
+    Reduce assessment inputs to the canonical fields the prompt uses.
+    Fields the prompt does not show (age, patient name, ...) are left out,
+    so they neither change the key nor the result. An unknown BMI is None,
+    and the prompt leaves its line out.
+    """
+    history = patient_history or {}
+    return {
+        "periods_per_year": _canonical(symptoms.get('periods_per_year')),
+        "cycle_length": _canonical(symptoms.get('cycle_length')),
+        "hirsutism": _canonical(symptoms.get('hirsutism', 'Not reported')),
+        "acne": _canonical(symptoms.get('acne', 'Not reported')),
+        "hair_loss": _canonical(symptoms.get('hair_loss', 'Not reported')),
+        "bmi": _canonical(history.get('bmi')),
+        "family_history": _canonical(history.get('family_history', 'Not reported')),
+        "ultrasound": _canonical(ultrasound_result) if ultrasound_result else None
+    }
+
 
 class GeminiClient:
-    def __init__(self):
-        """Initialize Gemini client with API key from environment."""
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY not found in environment variables")
+    def __init__(
+        self,
+        model=None,
+        max_workers: int = 4,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        answer_cache: Optional[AnswerCache] = None,
+        use_answer_cache: bool = True,
+        max_cached_assessments: int = 256
+    ):
+        """
+        Initialize Gemini client with API key from environment.
+        
+        Args:
+            model: Optional model object exposing generate_content (e.g. a test fake);
+                   skips API configuration when provided
+            max_workers: Thread pool size for the *_async methods
+            token_budget: Estimated input plus output tokens allowed per batched call
+            answer_cache: Optional answer cache for nutrition questions (defaults to in-memory)
+            use_answer_cache: Set False to always ask the model
+            max_cached_assessments: Memoized risk assessments kept (0 disables memoization)
+        """
+        if model is None:
+            api_key = os.getenv("GEMINI_API_KEY")
+            if not api_key:
+                raise ValueError("GEMINI_API_KEY not found in environment variables")
+            
+            # Deferred: the SDK is slow to import and most reruns never call Gemini
+            import google.generativeai as genai
+            
+            genai.configure(api_key=api_key)
+            # Use gemini-1.5-pro (latest stable model supporting vision and text)
+            model = genai.GenerativeModel(MODEL_NAME)
+        
+        self.model = model
+        self.model_name = getattr(model, "model_name", None) or type(model).__name__
+        
+        # Blocking generate_content calls run here so callers can overlap them
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gemini")
+        
+        self.token_budget = token_budget
+        self.answer_cache = (answer_cache or AnswerCache()) if use_answer_cache else None
         
-        genai.configure(api_key=api_key)
-        # Use gemini-1.5-pro (latest stable model supporting vision and text)
-        self.model = genai.GenerativeModel('gemini-1.5-pro')
+        # Canonical inputs key -> assessment, least recently used first
+        self.max_cached_assessments = max_cached_assessments
+        self._assessments: "OrderedDict[str, Dict]" = OrderedDict()
+        self._assessments_lock = threading.Lock()
+        # Most recent calls with token counts and latency, for call_stats()
+        self.call_log = deque(maxlen=500)
+        self._log_lock = threading.Lock()
         
         # System context for medical accuracy
         self.system_context = """
@@ -31,6 +137,51 @@ class GeminiClient:
         Include confidence levels and evidence-based reasoning in your assessments.
         """
     
+    def _generate(self, prompt: str, task: str, **kwargs) -> str:
+        """
+        Call the model and record input/output tokens and latency for the call.
+        Token counts come from the response's usage metadata when the SDK
+        provides it, otherwise from estimate_tokens.
+        """
+        start = time.perf_counter()
+        response = self.model.generate_content(prompt, **kwargs)
+        text = response.text
+        latency = time.perf_counter() - start
+        
+        usage = getattr(response, "usage_metadata", None)
+        entry = {
+            "task": task,
+            "input_tokens": getattr(usage, "prompt_token_count", None) or estimate_tokens(prompt),
+            "output_tokens": getattr(usage, "candidates_token_count", None) or estimate_tokens(text),
+            "latency": latency
+        }
+        with self._log_lock:
+            self.call_log.append(entry)
+        
+        return text
+    
+    def call_stats(self) -> Dict:
+        """
+        Summarize logged calls per task.
+        
+        Returns:
+            Dict of task -> calls, input_tokens, output_tokens, avg_latency
+        """
+        with self._log_lock:
+            entries = list(self.call_log)
+        
+        stats = {}
+        for entry in entries:
+            task = stats.setdefault(entry["task"], {"calls": 0, "input_tokens": 0, "output_tokens": 0, "latency": 0.0})
+            task["calls"] += 1
+            task["input_tokens"] += entry["input_tokens"]
+            task["output_tokens"] += entry["output_tokens"]
+            task["latency"] += entry["latency"]
+        
+        for task in stats.values():
+            task["avg_latency"] = task.pop("latency") / task["calls"]
+        return stats
+    
     def assess_pcos_risk(
         self,
         symptoms: Dict,
@@ -39,6 +190,9 @@ class GeminiClient:
     ) -> Dict:
         """
         Analyze patient symptoms and generate PCOS risk assessment.
+        Generation runs at a fixed temperature and successful results are
+        memoized by the canonical prompt inputs, model name and prompt version,
+        so re-analyzing unchanged (or only renamed) patients is instant.
         
         Args:
             symptoms: Dict containing patient symptoms and menstrual history
@@ -49,21 +203,54 @@ class GeminiClient:
             Dict containing risk assessment, phenotype, recommendations
         """
         
+        inputs = assessment_inputs(symptoms, ultrasound_result, patient_history)
+        key = self.assessment_key(inputs)
+        
+        with self._assessments_lock:
+            if key in self._assessments:
+                self._assessments.move_to_end(key)
+                return copy.deepcopy(self._assessments[key])
+        
+        assessment = self._assess(inputs)
+        
+        # Errors and unparseable responses are retried on the next call
+        if "error" not in assessment and self.max_cached_assessments > 0:
+            with self._assessments_lock:
+                self._assessments[key] = copy.deepcopy(assessment)
+                while len(self._assessments) > self.max_cached_assessments:
+                    self._assessments.popitem(last=False)
+        
+        return assessment
+    
+    def assessment_key(self, inputs: Dict) -> str:
+        """Stable memoization key for canonical assessment inputs."""
+        payload = {
+            "model": self.model_name,
+            "prompt_version": ASSESSMENT_PROMPT_VERSION,
+            "temperature": ASSESSMENT_TEMPERATURE,
+            "inputs": inputs
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+    
+    def _assess(self, inputs: Dict) -> Dict:
+        """Run the assessment prompt for canonical inputs."""
+        
+        weight_line = f"- Weight status: BMI {inputs['bmi']}\n" if inputs['bmi'] is not None else ""
+        
         prompt = f"""
 {self.system_context}
 
 Analyze this patient data for PCOS using Rotterdam criteria (2 out of 3):
 
 PATIENT SYMPTOMS:
-- Periods per year: {symptoms.get('periods_per_year')}
-- Average cycle length: {symptoms.get('cycle_length')} days
-- Excess hair growth (hirsutism): {symptoms.get('hirsutism', 'Not reported')}
-- Acne: {symptoms.get('acne', 'Not reported')}
-- Hair thinning: {symptoms.get('hair_loss', 'Not reported')}
-- Weight status: BMI {patient_history.get('bmi') if patient_history else 'Not provided'}
-- Family history of PCOS: {patient_history.get('family_history', 'Not reported')}
+- Periods per year: {inputs['periods_per_year']}
+- Average cycle length: {inputs['cycle_length']} days
+- Excess hair growth (hirsutism): {inputs['hirsutism']}
+- Acne: {inputs['acne']}
+- Hair thinning: {inputs['hair_loss']}
+{weight_line}- Family history of PCOS: {inputs['family_history']}
 
-{"ULTRASOUND FINDINGS: " + json.dumps(ultrasound_result) if ultrasound_result else "No ultrasound provided"}
+{"ULTRASOUND FINDINGS: " + json.dumps(inputs['ultrasound']) if inputs['ultrasound'] else "No ultrasound provided"}
 
 TASK:
 1. Evaluate each Rotterdam criterion
@@ -92,9 +279,11 @@ Provide response in this EXACT JSON format (no markdown, no code blocks):
 }}
 """
         
+        result_text = None
         try:
-            response = self.model.generate_content(prompt)
-            result_text = response.text.strip()
+            result_text = self._generate(
+                prompt, "assessment", generation_config={"temperature": ASSESSMENT_TEMPERATURE}
+            ).strip()
             
             # Clean any markdown formatting
             result_text = result_text.replace("```json", "").replace("```", "").strip()
@@ -115,7 +304,7 @@ Provide response in this EXACT JSON format (no markdown, no code blocks):
                 "key_findings": ["Assessment incomplete - please review manually"],
                 "recommendations": ["Consult with healthcare provider for complete evaluation"],
                 "error": f"JSON parsing error: {str(e)}",
-                "raw_response": response.text[:500] if 'response' in locals() else "No response"
+                "raw_response": result_text[:500] if result_text is not None else "No response"
             }
         
         except Exception as e:
@@ -134,6 +323,8 @@ Provide response in this EXACT JSON format (no markdown, no code blocks):
     ) -> List[Dict]:
         """
         Adapt recipes to use locally available ingredients and cultural preferences.
+        Recipes are reduced to their titles and ingredient names and packed
+        into as few calls as fit token_budget.
         
         Args:
             recipes: List of recipes from Spoonacular API
@@ -142,17 +333,45 @@ Provide response in this EXACT JSON format (no markdown, no code blocks):
             patient_preferences: Optional dietary restrictions/preferences
         
         Returns:
-            List of adapted recipes with local ingredient suggestions
+            List of adapted recipes with local ingredient suggestions; recipes
+            in a batch that failed are returned unadapted
         """
         
-        # Take first 3 recipes to avoid token limits
-        recipes_subset = recipes[:3] if len(recipes) > 3 else recipes
+        projected = [compact_json(project_recipe(recipe)) for recipe in recipes]
+        base_tokens = estimate_tokens(self._adaptation_prompt("", city, city_info, patient_preferences))
+        batches = pack(projected, self.token_budget, base_tokens, ADAPTATION_OUTPUT_TOKENS)
         
-        prompt = f"""
+        adapted_recipes = []
+        for batch in batches:
+            prompt = self._adaptation_prompt(
+                "\n".join(projected[i] for i in batch), city, city_info, patient_preferences
+            )
+            
+            try:
+                result_text = self._generate(prompt, "adaptation").strip().replace("```json", "").replace("```", "").strip()
+                adapted = json.loads(result_text)
+                adapted_recipes.extend(adapted if isinstance(adapted, list) else [adapted])
+            
+            except Exception as e:
+                # Return the batch's original recipes if adaptation fails
+                print(f"Recipe adaptation error: {e}")
+                adapted_recipes.extend(recipes[i] for i in batch)
+        
+        return adapted_recipes
+    
+    def _adaptation_prompt(
+        self,
+        recipes_text: str,
+        city: str,
+        city_info: Dict,
+        patient_preferences: Optional[Dict]
+    ) -> str:
+        """Adaptation prompt around one batch of projected recipes (one JSON object per line)."""
+        return f"""
 You are a nutrition expert specializing in PCOS management and cultural food adaptation.
 
 RECIPES TO ADAPT:
-{json.dumps(recipes_subset, indent=2)}
+{recipes_text}
 
 TARGET LOCATION: {city}, {city_info.get('region')}
 - Local cuisines: {', '.join(city_info.get('cuisine_tags', []))}
@@ -160,7 +379,7 @@ TARGET LOCATION: {city}, {city_info.get('region')}
 - Currency: {city_info.get('currency_symbol', '')}
 - Budget level: {city_info.get('budget_multiplier', 1.0)}x
 
-{f"PATIENT PREFERENCES: {json.dumps(patient_preferences)}" if patient_preferences else ""}
+{f"PATIENT PREFERENCES: {compact_json(patient_preferences)}" if patient_preferences else ""}
 
 TASK:
 For each recipe, provide:
@@ -189,17 +408,6 @@ Return as JSON array of adapted recipes with this structure:
   }}
 ]
 """
-        
-        try:
-            response = self.model.generate_content(prompt)
-            result_text = response.text.strip().replace("```json", "").replace("```", "").strip()
-            adapted_recipes = json.loads(result_text)
-            return adapted_recipes
-        
-        except Exception as e:
-            # Return original recipes if adaptation fails
-            print(f"Recipe adaptation error: {e}")
-            return recipes
     
     def generate_shopping_list(
         self,
@@ -224,8 +432,8 @@ Return as JSON array of adapted recipes with this structure:
         prompt = f"""
 Create a shopping list for this meal plan in {city}:
 
-MEAL PLAN (Week 1):
-{json.dumps(meal_plan, indent=2)}
+MEAL PLAN (titles per day; each recipe's ingredients listed once):
+{compact_json(project_meal_plan(meal_plan))}
 
 LOCATION DETAILS:
 - City: {city}
@@ -262,8 +470,7 @@ Return JSON:
 """
         
         try:
-            response = self.model.generate_content(prompt)
-            result_text = response.text.strip().replace("```json", "").replace("```", "").strip()
+            result_text = self._generate(prompt, "shopping_list").strip().replace("```json", "").replace("```", "").strip()
             shopping_list = json.loads(result_text)
             return shopping_list
         
@@ -274,22 +481,80 @@ Return JSON:
                 "shopping_tips": ["Please create shopping list manually from meal plan"]
             }
     
+    def estimate_shopping_costs(
+        self,
+        shopping_list: Dict,
+        city: str,
+        city_info: Dict,
+        num_people: int = 1
+    ) -> Dict:
+        """
+        Estimate prices and shopping tips for an already aggregated list.
+        Only item names and quantities are sent, not the meal plan.
+        
+        Args:
+            shopping_list: Result of utils.shopping_list.build_shopping_list
+            city: City name
+            city_info: City metadata
+            num_people: Number of people to shop for
+        
+        Returns:
+            Dict with per-item costs, total_estimated_cost, shopping_tips and estimated_time
+        """
+        items = "\n".join(
+            f"- {item['item']}: {item['quantity']} ({category}, {item['where']})"
+            for category, entries in shopping_list.get('categories', {}).items()
+            for item in entries
+        )
+        
+        prompt = f"""
+Estimate current prices in {city} for this shopping list for {num_people} person(s):
+
+{items}
+
+Currency: {city_info.get('currency_symbol', '')}
+
+Return JSON:
+{{
+  "costs": {{"Spinach": "₹40", ...}},
+  "total_estimated_cost": "₹2,500",
+  "shopping_tips": ["Buy seasonal vegetables at Mandai for best prices", ...],
+  "estimated_time": "60-90 minutes"
+}}
+"""
+        
+        try:
+            result_text = self._generate(prompt, "shopping_costs").strip().replace("```json", "").replace("```", "").strip()
+            return json.loads(result_text)
+        
+        except Exception as e:
+            return {"error": f"Shopping cost estimate error: {str(e)}"}
+    
     def answer_nutrition_question(
         self,
         question: str,
-        context: Optional[str] = None
+        context: Optional[str] = None,
+        use_cache: bool = True
     ) -> str:
         """
         Answer PCOS nutrition questions for doctors.
+        Near-duplicate questions with the same context are answered from the answer cache.
         
         Args:
             question: Doctor's question
             context: Optional context (patient info, meal plan, etc.)
+            use_cache: Set False to bypass the answer cache for this call
         
         Returns:
             Evidence-based answer
         """
         
+        cache = self.answer_cache if use_cache else None
+        if cache is not None:
+            cached = cache.get(question, context)
+            if cached is not None:
+                return cached
+        
         prompt = f"""
 {self.system_context}
 
@@ -303,8 +568,71 @@ Keep response under 200 words.
 """
         
         try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            start = time.perf_counter()
+            answer = self._generate(prompt, "nutrition_question").strip()
         
         except Exception as e:
             return f"Error generating response: {str(e)}"
+        
+        if cache is not None and answer:
+            cache.set(question, context, answer, latency=time.perf_counter() - start)
+        return answer
+    
+    def answer_cache_stats(self) -> Optional[Dict]:
+        """Get answer cache statistics, or None when the cache is disabled."""
+        return self.answer_cache.stats() if self.answer_cache is not None else None
+
+    # ==================== Concurrent variants ====================
+    # Each returns a concurrent.futures.Future; wrap with asyncio.wrap_future
+    # to await from async code. Error and fallback behaviour is identical to
+    # the blocking methods because the same code runs on a worker thread.
+    
+    def assess_pcos_risk_async(
+        self,
+        symptoms: Dict,
+        ultrasound_result: Optional[Dict] = None,
+        patient_history: Optional[Dict] = None
+    ) -> Future:
+        """Run assess_pcos_risk on the client's thread pool."""
+        return self._executor.submit(self.assess_pcos_risk, symptoms, ultrasound_result, patient_history)
+    
+    def customize_recipes_for_location_async(
+        self,
+        recipes: List[Dict],
+        city: str,
+        city_info: Dict,
+        patient_preferences: Optional[Dict] = None
+    ) -> Future:
+        """Run customize_recipes_for_location on the client's thread pool."""
+        return self._executor.submit(
+            self.customize_recipes_for_location, recipes, city, city_info, patient_preferences
+        )
+    
+    def generate_shopping_list_async(
+        self,
+        meal_plan: Dict,
+        city: str,
+        city_info: Dict,
+        num_people: int = 1
+    ) -> Future:
+        """Run generate_shopping_list on the client's thread pool."""
+        return self._executor.submit(self.generate_shopping_list, meal_plan, city, city_info, num_people)
+    
+    def estimate_shopping_costs_async(
+        self,
+        shopping_list: Dict,
+        city: str,
+        city_info: Dict,
+        num_people: int = 1
+    ) -> Future:
+        """Run estimate_shopping_costs on the client's thread pool."""
+        return self._executor.submit(self.estimate_shopping_costs, shopping_list, city, city_info, num_people)
+    
+    def answer_nutrition_question_async(
+        self,
+        question: str,
+        context: Optional[str] = None,
+        use_cache: bool = True
+    ) -> Future:
+        """Run answer_nutrition_question on the client's thread pool."""
+        return self._executor.submit(self.answer_nutrition_question, question, context, use_cache)
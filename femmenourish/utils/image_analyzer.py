@@ -2,54 +2,103 @@
 Ultrasound Image Analysis for PCOS detection.
 Uses OpenCV-based detection for hackathon demo.
 For production, integrate with pre-trained CNN model.
+
+NumPy, Pillow, TensorFlow and the Gemini SDK are imported on first use so
+that importing this module stays cheap for sessions that never analyze a scan.
 """
 
-import cv2
-import numpy as np
-from PIL import Image
+import hashlib
+import io
+import json
 import os
-from typing import Dict, Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from utils.response_cache import DEFAULT_CACHE_DIR
+
+
+# Bump when prompts or post-processing change so stale cached results are ignored
+ANALYSIS_VERSION = "1"
+GEMINI_VISION_MODEL = "gemini-1.5-pro"
+
+# Input resolution of the deep learning model
+MODEL_INPUT_SIZE = (224, 224)
+
+ImageSource = Union[str, bytes, BinaryIO]
 
 
 class UltrasoundAnalyzer:
-    def __init__(self, model_path: Optional[str] = None):
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        memory_cache_size: int = 128,
+        disk_cache_size: int = 2000
+    ):
         """
         Initialize ultrasound analyzer.
         
         Args:
             model_path: Path to pre-trained model (optional for hackathon)
+            cache_dir: Directory for persisted results (defaults to data/cache/ultrasound)
+            memory_cache_size: Maximum results kept in memory
+            disk_cache_size: Maximum results kept on disk
         """
         self.model_path = model_path
         self.model = None
         
+        # Results keyed by image digest plus analysis method/version
+        self.cache_dir = cache_dir or os.path.join(DEFAULT_CACHE_DIR, "ultrasound")
+        self.memory_cache_size = memory_cache_size
+        self.disk_cache_size = disk_cache_size
+        self._memory_cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # TensorFlow module, imported once on first use
+        self._tf = None
+        self.last_batch_stats: Dict = {}
+        
         # If model exists, load it (for future integration)
         if model_path and os.path.exists(model_path):
             try:
-                import tensorflow as tf
-                self.model = tf.keras.models.load_model(model_path)
+                self.model = self._get_tf().keras.models.load_model(model_path)
                 print("✅ Loaded pre-trained ultrasound model")
             except Exception as e:
                 print(f"⚠️ Could not load model: {e}")
                 print("Falling back to OpenCV-based analysis")
     
-    def analyze_image(self, image_path: str) -> Dict:
+    def analyze_image(self, image: ImageSource) -> Dict:
         """
         Analyze ultrasound image for PCOS indicators.
+        Results are cached by image content, so the same scan is never analyzed twice.
         
         Args:
-            image_path: Path to ultrasound image file
+            image: Path to ultrasound image file, raw image bytes, or a file-like buffer
         
         Returns:
             Dict with analysis results
         """
         
         try:
+            image_bytes = self._read_image_bytes(image)
+            cache_key = self._cache_key(image_bytes)
+            
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+            
             # If we have a trained model, use it
             if self.model:
-                return self._analyze_with_model(image_path)
+                result = self._analyze_with_model(io.BytesIO(image_bytes))
             else:
                 # Fallback to OpenCV-based analysis (for demo)
-                return self._analyze_with_opencv(image_path)
+                result = self._analyze_with_opencv(io.BytesIO(image_bytes))
+            
+            self._cache_put(cache_key, result)
+            return result
         
         except Exception as e:
             return {
@@ -58,33 +107,118 @@ class UltrasoundAnalyzer:
                 "confidence": 0
             }
     
-    def _analyze_with_model(self, image_path: str) -> Dict:
+    def cached_result(self, image: ImageSource) -> Optional[Dict]:
+        """
+        Look up a previous analysis of this image without running a new one.
+        
+        Args:
+            image: Path, raw bytes, or file-like buffer
+        
+        Returns:
+            Cached analysis results, or None if the image has not been analyzed
+        """
+        try:
+            return self._cache_get(self._cache_key(self._read_image_bytes(image)))
+        except OSError:
+            return None
+    
+    def _read_image_bytes(self, image: ImageSource) -> bytes:
+        """Get raw bytes from a path, bytes object, or file-like buffer."""
+        if isinstance(image, (bytes, bytearray)):
+            return bytes(image)
+        if isinstance(image, str):
+            with open(image, 'rb') as f:
+                return f.read()
+        if hasattr(image, 'getvalue'):
+            return image.getvalue()
+        
+        image.seek(0)
+        return image.read()
+    
+    def _analysis_method(self) -> str:
+        """Identify the analysis method and model version for cache keys."""
+        if self.model:
+            mtime = os.path.getmtime(self.model_path) if self.model_path and os.path.exists(self.model_path) else 0
+            return f"deep_learning:{os.path.basename(self.model_path or '')}:{int(mtime)}:v{ANALYSIS_VERSION}"
+        return f"gemini_vision:{GEMINI_VISION_MODEL}:v{ANALYSIS_VERSION}"
+    
+    def _cache_key(self, image_bytes: bytes) -> str:
+        """Content-addressed key: image digest plus analysis method/version."""
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        method = hashlib.sha256(self._analysis_method().encode()).hexdigest()[:16]
+        return f"{digest}_{method}"
+    
+    def _cache_get(self, key: str) -> Optional[Dict]:
+        """Check memory first, then disk."""
+        with self._cache_lock:
+            if key in self._memory_cache:
+                self._memory_cache.move_to_end(key)
+                return dict(self._memory_cache[key])
+        
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        try:
+            with open(path, 'r') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        self._remember(key, result)
+        return dict(result)
+    
+    def _cache_put(self, key: str, result: Dict) -> None:
+        """Store a result unless it is an error or a fallback that should be retried."""
+        if "error" in result or result.get("method") == "clinical_assessment":
+            return
+        
+        self._remember(key, result)
+        
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(os.path.join(self.cache_dir, f"{key}.json"), 'w') as f:
+                json.dump(result, f)
+            self._prune_disk_cache()
+        except OSError as e:
+            print(f"⚠️ Could not persist ultrasound result: {e}")
+    
+    def _remember(self, key: str, result: Dict) -> None:
+        """Add to the bounded in-memory LRU."""
+        with self._cache_lock:
+            self._memory_cache[key] = dict(result)
+            self._memory_cache.move_to_end(key)
+            while len(self._memory_cache) > self.memory_cache_size:
+                self._memory_cache.popitem(last=False)
+    
+    def _prune_disk_cache(self) -> None:
+        """Remove the oldest persisted results beyond the disk bound."""
+        entries = [e for e in os.scandir(self.cache_dir) if e.name.endswith(".json")]
+        overflow = len(entries) - self.disk_cache_size
+        if overflow > 0:
+            for entry in sorted(entries, key=lambda e: e.stat().st_mtime)[:overflow]:
+                os.remove(entry.path)
+    
+    def _analyze_with_model(self, image_path: Union[str, BinaryIO]) -> Dict:
         """
         Analyze using pre-trained TensorFlow model.
         
         Args:
-            image_path: Path to image
+            image_path: Path to image or in-memory buffer
         
         Returns:
             Analysis results
         """
         
-        import tensorflow as tf
+        import numpy as np
         
         # Load and preprocess image
-        img = tf.keras.preprocessing.image.load_img(
-            image_path,
-            target_size=(224, 224)
-        )
-        img_array = tf.keras.preprocessing.image.img_to_array(img)
-        img_array = np.expand_dims(img_array, axis=0)
-        img_array = img_array / 255.0  # Normalize
+        img_array = np.expand_dims(self._load_image_array(image_path), axis=0)
         
         # Predict
         prediction = self.model.predict(img_array, verbose=0)
-        confidence = float(prediction[0][0]) * 100
         
-        # Interpret results
+        return self._interpret_prediction(float(prediction[0][0]) * 100)
+    
+    def _interpret_prediction(self, confidence: float) -> Dict:
+        """Turn a model's PCOS probability (0-100) into analysis results."""
         is_pcos = confidence > 50
         
         return {
@@ -96,12 +230,175 @@ class UltrasoundAnalyzer:
             "method": "deep_learning"
         }
     
-    def _analyze_with_opencv(self, image_path: str) -> Dict:
+    def _get_tf(self):
+        """Import TensorFlow once and reuse the module."""
+        if self._tf is None:
+            import tensorflow as tf
+            self._tf = tf
+        return self._tf
+    
+    def _load_image_array(self, image: Union[str, BinaryIO], out: Optional["np.ndarray"] = None) -> "np.ndarray":
+        """
+        Decode and resize an image to the model's input as normalized float32.
+        Matches keras load_img defaults (RGB, nearest-neighbour resize).
+        
+        Args:
+            image: Path or file-like buffer
+            out: Optional preallocated (224, 224, 3) float32 array to fill
+        
+        Returns:
+            Array of shape (224, 224, 3) with values in [0, 1]
+        """
+        import numpy as np
+        from PIL import Image
+        
+        with Image.open(image) as img:
+            img = img.convert('RGB')
+            if img.size != MODEL_INPUT_SIZE:
+                img = img.resize(MODEL_INPUT_SIZE, Image.NEAREST)
+            pixels = np.asarray(img, dtype=np.float32)
+        
+        if out is None:
+            out = np.empty(pixels.shape, dtype=np.float32)
+        np.multiply(pixels, 1.0 / 255.0, out=out)
+        return out
+    
+    def analyze_batch(
+        self,
+        paths_or_buffers: Iterable[ImageSource],
+        batch_size: int = 32,
+        num_workers: int = 4
+    ) -> Iterator[Tuple[ImageSource, Dict]]:
+        """
+        Analyze many ultrasound images, streaming results as each batch completes.
+        Images are read and decoded on a worker pool straight into preallocated
+        float32 batches, and each batch is scored with one predict call. The next
+        batch is decoded while the current one is being scored. Without a trained
+        model, images fall back to analyze_image on the same pool.
+        Throughput is printed at the end and kept in last_batch_stats.
+        
+        Args:
+            paths_or_buffers: Image paths, raw bytes, or file-like buffers
+            batch_size: Images per predict call
+            num_workers: Threads used for reading and decoding
+        
+        Yields:
+            (source, result) tuples in input order
+        """
+        import numpy as np
+        
+        start = time.perf_counter()
+        count = 0
+        
+        # Two buffers: one is filled by decoders while the other is being predicted
+        buffers = [
+            np.empty((batch_size, *MODEL_INPUT_SIZE, 3), dtype=np.float32) for _ in range(2)
+        ] if self.model else [None, None]
+        
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            pending = None
+            
+            for index, chunk in enumerate(self._chunks(paths_or_buffers, batch_size)):
+                buffer = buffers[index % 2]
+                submitted = (chunk, [
+                    executor.submit(self._prepare_one, source, buffer, slot)
+                    for slot, source in enumerate(chunk)
+                ], buffer)
+                
+                if pending is not None:
+                    yield from self._finish_chunk(*pending)
+                    count += len(pending[0])
+                pending = submitted
+            
+            if pending is not None:
+                yield from self._finish_chunk(*pending)
+                count += len(pending[0])
+        
+        elapsed = time.perf_counter() - start
+        self.last_batch_stats = {
+            "images": count,
+            "seconds": elapsed,
+            "images_per_sec": count / elapsed if elapsed > 0 else 0.0
+        }
+        print(f"✅ Analyzed {count} images in {elapsed:.1f}s ({self.last_batch_stats['images_per_sec']:.1f} images/sec)")
+    
+    def _chunks(self, sources: Iterable[ImageSource], size: int) -> Iterator[List[ImageSource]]:
+        """Split an iterable into lists of at most size items."""
+        chunk = []
+        for source in sources:
+            chunk.append(source)
+            if len(chunk) == size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    
+    def _prepare_one(self, source: ImageSource, buffer: Optional["np.ndarray"], slot: int) -> Dict:
+        """
+        Worker step for one image: read bytes, check the cache, then either
+        decode into the batch buffer (model) or run the full analysis (no model).
+        """
+        try:
+            image_bytes = self._read_image_bytes(source)
+            key = self._cache_key(image_bytes)
+            
+            cached = self._cache_get(key)
+            if cached is not None:
+                return {"result": cached}
+            
+            if buffer is None:
+                return {"result": self.analyze_image(image_bytes)}
+            
+            self._load_image_array(io.BytesIO(image_bytes), out=buffer[slot])
+            return {"key": key}
+        
+        except Exception as e:
+            return {"result": {
+                "error": f"Image analysis error: {str(e)}",
+                "pcos_pattern": "unknown",
+                "confidence": 0
+            }}
+    
+    def _finish_chunk(
+        self,
+        chunk: List[ImageSource],
+        futures: List,
+        buffer: Optional["np.ndarray"]
+    ) -> Iterator[Tuple[ImageSource, Dict]]:
+        """Wait for a chunk's workers, run one predict over decoded images and yield results."""
+        prepared = [future.result() for future in futures]
+        to_predict = [slot for slot, item in enumerate(prepared) if "result" not in item]
+        
+        if to_predict:
+            try:
+                # Compact decoded images to the front so predict sees one contiguous batch
+                for position, slot in enumerate(to_predict):
+                    if position != slot:
+                        buffer[position] = buffer[slot]
+                predictions = self.model.predict(buffer[:len(to_predict)], verbose=0)
+                
+                for position, slot in enumerate(to_predict):
+                    result = self._interpret_prediction(float(predictions[position][0]) * 100)
+                    self._cache_put(prepared[slot]["key"], result)
+                    prepared[slot]["result"] = result
+            
+            except Exception as e:
+                for slot in to_predict:
+                    prepared[slot]["result"] = {
+                        "error": f"Image analysis error: {str(e)}",
+                        "pcos_pattern": "unknown",
+                        "confidence": 0
+                    }
+        
+        for source, item in zip(chunk, prepared):
+            yield source, item["result"]
+    
+    def _analyze_with_opencv(self, image_path: Union[str, BinaryIO]) -> Dict:
         """
         AI-powered ultrasound analysis using Gemini Vision.
         
         Args:
-            image_path: Path to image
+            image_path: Path to image or in-memory buffer
         
         Returns:
             Analysis results
@@ -124,7 +421,7 @@ class UltrasoundAnalyzer:
             img = PILImage.open(image_path)
             
             # Use Gemini 1.5 Pro model with vision capabilities
-            model = genai.GenerativeModel('gemini-1.5-pro')
+            model = genai.GenerativeModel(GEMINI_VISION_MODEL)
             
             prompt = """You are an expert radiologist analyzing an ovarian ultrasound for PCOS (Polycystic Ovary Syndrome).
 
@@ -199,6 +496,8 @@ Be conservative - only mark as "positive" if you see clear PCOS indicators (≥1
             
             # Fallback: Clinical assessment mode
             try:
+                if hasattr(image_path, 'seek'):
+                    image_path.seek(0)
                 img = PILImage.open(image_path)
                 width, height = img.size
                 
@@ -0,0 +1,212 @@
+"""
+Ingredient Overlap Index
+Answers leftover "what can I cook with these" queries against the local
+recipe corpus, ranking like Spoonacular findByIngredients with ranking=2
+(fewest missing ingredients first, then most used) and ignorePantry=True.
+
+Ingredients are held as a sparse recipe x ingredient matrix in CSC form:
+one int32 posting array of recipe rows per normalized ingredient name.
+PCOS friendliness and score are precomputed per recipe from the corpus
+nutrient columns, so a query is a handful of array operations.
+"""
+
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+from utils.recipe_corpus import RecipeCorpus, normalize_ingredient, recipe_ingredients
+from utils.recipe_scoring import pcos_friendly_mask, pcos_scores
+
+
+# Items Spoonacular's ignorePantry assumes you already have
+PANTRY_STAPLES = frozenset({
+    "water", "salt", "pepper", "black pepper", "salt and pepper", "ice", "flour", "all purpose flour",
+    "sugar", "granulated sugar", "oil", "olive oil", "vegetable oil", "cooking oil", "baking powder",
+    "baking soda", "cooking spray"
+})
+
+
+def _singular(word: str) -> str:
+    """Cheap singularization so 'tomatoes' matches 'tomato'."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith("oes"):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def ingredient_tokens(name: str) -> List[str]:
+    """Normalized, singularized words of an ingredient name."""
+    return [_singular(word) for word in normalize_ingredient(name).split()]
+
+
+def is_pantry_staple(name: str) -> bool:
+    """Check an ingredient name against PANTRY_STAPLES after normalization."""
+    return " ".join(ingredient_tokens(name)) in PANTRY_STAPLES or normalize_ingredient(name) in PANTRY_STAPLES
+
+
+class IngredientIndex:
+    def __init__(
+        self,
+        postings: Dict[str, List[int]],
+        num_recipes: int,
+        pcos_friendly: np.ndarray,
+        pcos_score: np.ndarray
+    ):
+        """
+        Build the sparse ingredient index.
+
+        Args:
+            postings: Normalized ingredient name -> recipe rows containing it
+            num_recipes: Number of recipe rows
+            pcos_friendly: Boolean PCOS filter per row
+            pcos_score: 0-100 PCOS score per row
+        """
+        self.num_recipes = num_recipes
+        self.pcos_friendly = pcos_friendly
+        self.pcos_score = pcos_score
+
+        # Pantry staples never count as used or missing
+        self.vocabulary = sorted(name for name in postings if not is_pantry_staple(name))
+
+        lengths = np.array([len(postings[name]) for name in self.vocabulary], dtype=np.int64)
+        self.indptr = np.concatenate(([0], np.cumsum(lengths)))
+        self.rows = (
+            np.concatenate([np.asarray(postings[name], dtype=np.int32) for name in self.vocabulary])
+            if self.vocabulary else np.zeros(0, dtype=np.int32)
+        )
+
+        # Non-pantry ingredients per recipe, the baseline for missed counts
+        self.ingredient_counts = np.bincount(self.rows, minlength=num_recipes)
+
+        # Word -> vocabulary ids, so 'chicken' matches 'chicken breast'
+        self._token_vocab: Dict[str, Set[int]] = {}
+        for vocab_id, name in enumerate(self.vocabulary):
+            for token in ingredient_tokens(name):
+                self._token_vocab.setdefault(token, set()).add(vocab_id)
+
+    @classmethod
+    def from_corpus(cls, corpus: RecipeCorpus) -> "IngredientIndex":
+        """Build from a corpus's ingredient index and nutrient columns."""
+        with corpus._lock:
+            # Non-numeric amounts were already dropped from corpus.present
+            valid = np.ones(corpus.present.shape, dtype=bool)
+            return cls(
+                corpus.index["ingredient"],
+                len(corpus),
+                pcos_friendly_mask(corpus.amounts, corpus.present, valid),
+                pcos_scores(corpus.amounts, corpus.present, valid)
+            )
+
+    def expand(self, ingredient: str) -> Set[int]:
+        """Vocabulary ids whose names contain every word of the query ingredient."""
+        tokens = ingredient_tokens(ingredient)
+        if not tokens or is_pantry_staple(ingredient):
+            return set()
+
+        matches = None
+        for token in tokens:
+            vocab_ids = self._token_vocab.get(token, set())
+            matches = set(vocab_ids) if matches is None else matches & vocab_ids
+            if not matches:
+                return set()
+        return matches
+
+    def match(
+        self,
+        ingredients: List[str],
+        number: int = 5,
+        pcos_only: bool = True,
+        mask: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Rank recipes by overlap with the available ingredients.
+
+        Args:
+            ingredients: Ingredient names the user has
+            number: Maximum recipes to return
+            pcos_only: Keep only PCOS-friendly recipes
+            mask: Optional boolean row filter applied before ranking, e.g. a cuisine mask
+
+        Returns:
+            Dict of parallel arrays: rows, used, missed, score (ranking=2 order)
+        """
+        matched: Set[int] = set()
+        for ingredient in ingredients:
+            matched |= self.expand(ingredient)
+
+        empty = np.zeros(0, dtype=np.int64)
+        if not matched:
+            return {"rows": empty, "used": empty, "missed": empty, "score": empty}
+
+        # Each recipe ingredient covered by the query counts once
+        postings = [self.rows[self.indptr[v]:self.indptr[v + 1]] for v in matched]
+        used = np.bincount(np.concatenate(postings), minlength=self.num_recipes)
+
+        candidates = used > 0
+        if pcos_only:
+            candidates &= self.pcos_friendly
+        if mask is not None:
+            candidates &= mask
+        rows = np.flatnonzero(candidates)
+
+        used = used[rows]
+        missed = self.ingredient_counts[rows] - used
+
+        # ranking=2: minimize missed ingredients, then maximize used
+        order = np.lexsort((-used, missed))[:number]
+
+        return {
+            "rows": rows[order],
+            "used": used[order],
+            "missed": missed[order],
+            "score": self.pcos_score[rows[order]]
+        }
+
+    def matched_names(self, ingredients: List[str]) -> Set[str]:
+        """Vocabulary names covered by the query, for splitting used/missed lists."""
+        names = set()
+        for ingredient in ingredients:
+            names.update(self.vocabulary[v] for v in self.expand(ingredient))
+        return names
+
+
+def find_in_corpus(
+    index: IngredientIndex,
+    corpus: RecipeCorpus,
+    ingredients: List[str],
+    number: int = 5,
+    cuisine: Optional[str] = None
+) -> List[Dict]:
+    """
+    Resolve an IngredientIndex match into findByIngredients-shaped recipes.
+
+    Args:
+        index: IngredientIndex built from the corpus
+        corpus: The corpus the index was built from
+        ingredients: Ingredient names the user has
+        number: Maximum recipes to return
+        cuisine: Optional cuisine filter, comma-separated like complexSearch
+
+    Returns:
+        PCOS-friendly recipe dicts with used/missed counts and lists, nutrition and pcos_score
+    """
+    mask = corpus.filter_mask("cuisine", cuisine) if cuisine else None
+    found = index.match(ingredients, number=number, mask=mask)
+    covered = index.matched_names(ingredients)
+    recipes = []
+
+    for row, used, missed, score in zip(found["rows"], found["used"], found["missed"], found["score"]):
+        recipe = dict(corpus.recipes[row])
+        names = [name for name in recipe_ingredients(recipe) if not is_pantry_staple(name)]
+
+        recipe["usedIngredients"] = [{"name": name} for name in names if name in covered]
+        recipe["missedIngredients"] = [{"name": name} for name in names if name not in covered]
+        recipe["usedIngredientCount"] = int(used)
+        recipe["missedIngredientCount"] = int(missed)
+        recipe["pcos_score"] = int(score)
+        recipes.append(recipe)
+
+    return recipes
@@ -0,0 +1,366 @@
+"""
+Background Job Queue
+Runs long tasks (meal plans, PDF reports) on a local worker pool so the
+Streamlit script thread returns immediately. Jobs are SQLite rows, so a job
+id outlives a browser refresh, and any session can poll its status,
+progress and result.
+
+Handlers are registered per job kind. Each receives the job's JSON params
+and a JobContext for progress reports. A handler's return value is stored
+as JSON, or in the blob column when it is bytes.
+
+Several processes (or a rebuilt Streamlit resource cache) may share one
+database. Each queue stamps the jobs it runs with its worker id and a
+heartbeat; only RUNNING jobs whose heartbeat has gone stale are taken
+to be orphaned and queued again.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+
+DEFAULT_JOBS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "jobs")
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+# Finished jobs older than this are deleted when the queue starts
+DEFAULT_RETENTION = 7 * 24 * 3600
+
+# In-process attachments kept, oldest dropped first
+MAX_ATTACHMENTS = 32
+
+# Seconds between heartbeats of running jobs, and without one before a job counts as orphaned
+HEARTBEAT_INTERVAL = 10.0
+STALE_AFTER = 60.0
+
+
+class JobContext:
+    """Passed to handlers to report progress and keep in-process objects."""
+
+    def __init__(self, queue: "JobQueue", job_id: str):
+        self.queue = queue
+        self.job_id = job_id
+
+    def progress(self, fraction: float, message: str = "", partial: Any = None) -> None:
+        """
+        Record progress.
+
+        Args:
+            fraction: Completed share of the work, 0-1
+            message: Short status line for the UI
+            partial: Optional JSON-serializable partial result, readable while running
+        """
+        self.queue._update(
+            self.job_id,
+            progress=min(1.0, max(0.0, fraction)),
+            message=message,
+            heartbeat_at=time.time(),
+            **({"result": json.dumps(partial)} if partial is not None else {})
+        )
+
+    def attach(self, obj: Any) -> None:
+        """Keep an object that cannot be persisted (e.g. a builder) for this job, in this process only."""
+        attachments = self.queue._attachments
+        attachments[self.job_id] = obj
+        while len(attachments) > MAX_ATTACHMENTS:
+            attachments.pop(next(iter(attachments)))
+
+
+class JobQueue:
+    """SQLite-backed job queue with a pool of worker threads."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        workers: int = 2,
+        retention: int = DEFAULT_RETENTION,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL,
+        stale_after: float = STALE_AFTER
+    ):
+        """
+        Open (or create) the job database.
+
+        Args:
+            path: Database file path (defaults to data/jobs/jobs.sqlite)
+            workers: Worker threads, started on the first submit or start()
+            retention: Seconds finished jobs are kept
+            heartbeat_interval: Seconds between heartbeats of this queue's running jobs
+            stale_after: Seconds without a heartbeat before a running job is queued again
+        """
+        self.path = path or os.path.join(DEFAULT_JOBS_DIR, "jobs.sqlite")
+        self.workers = workers
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, Callable[[Dict, JobContext], Any]] = {}
+        self._attachments: Dict[str, Any] = {}
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._stopped = threading.Event()
+        self._stopping = False
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                params TEXT NOT NULL,
+                result TEXT,
+                blob BLOB,
+                error TEXT,
+                progress REAL NOT NULL DEFAULT 0,
+                message TEXT NOT NULL DEFAULT '',
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                worker_id TEXT,
+                heartbeat_at REAL
+            )
+            """
+        )
+        # Databases created before heartbeats lack the last two columns
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("worker_id", "TEXT"), ("heartbeat_at", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)")
+        self._conn.execute(
+            "DELETE FROM jobs WHERE status IN (?, ?, ?) AND finished_at < ?",
+            (*FINISHED, time.time() - retention)
+        )
+        self._conn.commit()
+        self.requeue_stale()
+
+    def register(self, kind: str, handler: Callable[[Dict, JobContext], Any]) -> None:
+        """
+        Register the handler for a job kind.
+
+        Args:
+            kind: Job kind, e.g. "meal_plan"
+            handler: Called as handler(params, context) on a worker thread; must not use Streamlit
+        """
+        self._handlers[kind] = handler
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def submit(self, kind: str, params: Dict) -> str:
+        """
+        Queue a job.
+
+        Args:
+            kind: Registered job kind
+            params: JSON-serializable handler arguments
+
+        Returns:
+            Job id
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, params, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, json.dumps(params), time.time())
+            )
+            self._conn.commit()
+
+        self.start()
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """
+        Get a job's status.
+
+        Returns:
+            Dict with id, kind, status, progress, message, error, params and
+            timestamps, or None for an unknown id
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, status, progress, message, error, params, created_at, started_at, finished_at "
+                "FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        job = dict(zip(
+            ("id", "kind", "status", "progress", "message", "error", "params", "created_at", "started_at", "finished_at"),
+            row
+        ))
+        job["params"] = json.loads(job["params"])
+        return job
+
+    def result(self, job_id: str) -> Any:
+        """
+        Get a job's result: bytes for blob results, parsed JSON otherwise.
+        While a job is running this is its latest partial result, if any.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT result, blob FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+        if row is None:
+            return None
+        if row[1] is not None:
+            return bytes(row[1])
+        return json.loads(row[0]) if row[0] is not None else None
+
+    def attachment(self, job_id: str) -> Any:
+        """Object the handler attached, if it ran in this process."""
+        return self._attachments.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job that has not started.
+
+        Returns:
+            True if the job was queued and is now cancelled
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, time.time(), job_id, QUEUED)
+            )
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def requeue_stale(self) -> int:
+        """
+        Queue again the running jobs whose worker stopped heartbeating, e.g.
+        because its process exited. Jobs of live workers are left alone.
+
+        Returns:
+            Number of jobs requeued
+        """
+        with self._lock:
+            # Rows from before heartbeats fall back to their start time
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, progress = 0, message = 'Restarted', result = NULL, "
+                "worker_id = NULL, heartbeat_at = NULL "
+                "WHERE status = ? AND COALESCE(heartbeat_at, started_at, 0) < ?",
+                (QUEUED, RUNNING, time.time() - self.stale_after)
+            )
+            self._conn.commit()
+
+        if cursor.rowcount:
+            print(f"🔄 Requeued {cursor.rowcount} orphaned job(s)")
+            with self._wakeup:
+                self._wakeup.notify_all()
+        return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def start(self) -> None:
+        """Start the worker threads if they are not running."""
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping = False
+            self._stopped.clear()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            thread = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers after their current jobs."""
+        self._stopping = True
+        self._stopped.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def _update(self, job_id: str, **fields) -> None:
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def _claim(self) -> Optional[tuple]:
+        """Mark the oldest queued job of a registered kind as running and return it."""
+        kinds = list(self._handlers)
+        if not kinds:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT id, kind, params FROM jobs WHERE status = ? AND kind IN ({','.join('?' * len(kinds))}) "
+                "ORDER BY created_at LIMIT 1",
+                (QUEUED, *kinds)
+            ).fetchone()
+            if row is None:
+                return None
+            # Guarded on status so a second process sharing the file cannot run it too
+            now = time.time()
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, message = 'Started', worker_id = ?, heartbeat_at = ? "
+                "WHERE id = ? AND status = ?",
+                (RUNNING, now, self.worker_id, now, row[0], QUEUED)
+            )
+            self._conn.commit()
+        return row if cursor.rowcount else None
+
+    def _heartbeat(self) -> None:
+        """Stamp this queue's running jobs, and pick up jobs orphaned by other workers."""
+        while not self._stopped.wait(self.heartbeat_interval):
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE jobs SET heartbeat_at = ? WHERE worker_id = ? AND status = ?",
+                    (time.time(), self.worker_id, RUNNING)
+                )
+                self._conn.commit()
+            self.requeue_stale()
+
+    def _work(self) -> None:
+        while not self._stopping:
+            job = self._claim()
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(timeout=1.0)
+                continue
+
+            job_id, kind, params = job
+            try:
+                value = self._handlers[kind](json.loads(params), JobContext(self, job_id))
+                if isinstance(value, (bytes, bytearray)):
+                    stored = {"result": None, "blob": sqlite3.Binary(bytes(value))}
+                else:
+                    stored = {"result": json.dumps(value), "blob": None}
+                self._update(job_id, status=DONE, progress=1.0, message="Done", finished_at=time.time(), **stored)
+            except Exception as e:
+                print(f"Job {kind} {job_id} failed: {e}")
+                traceback.print_exc()
+                self._update(job_id, status=FAILED, error=str(e), message="Failed", finished_at=time.time())
@@ -0,0 +1,38 @@
+"""
+Lazy client construction.
+Defers building API clients (and importing their heavy dependencies)
+until the first attribute access.
+"""
+
+import threading
+from typing import Any, Callable
+
+
+class LazyClient:
+    """Proxy that constructs the wrapped client on first use."""
+
+    def __init__(self, factory: Callable[[], Any]):
+        """
+        Args:
+            factory: Zero-argument callable returning the real client
+        """
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_initialized(self) -> bool:
+        """Whether the wrapped client has been constructed yet."""
+        return self._instance is not None
+
+    def get(self) -> Any:
+        """Construct the client once (thread-safe) and return it."""
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not found on the proxy itself
+        return getattr(self.get(), name)
@@ -0,0 +1,258 @@
+"""
+Meal Plan Optimizer
+Chooses each day's meals from the candidate recipes so daily and weekly
+totals meet the PCOS daily_targets and macro split in pcos_rules.json,
+while avoiding repeated recipes.
+
+The optimizer is vectorized coordinate descent: every slot is seeded
+greedily in plan order, then slots are revisited one at a time, scoring
+all of a slot's candidates at once with the rest of the plan held fixed,
+until no swap improves the objective.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+PLAN_COLUMNS = ("Sugar", "Protein", "Fiber", "Carbohydrates", "Fat", "Glycemic Load")
+SUGAR, PROTEIN, FIBER, CARBS, FAT, GLYCEMIC_LOAD = range(len(PLAN_COLUMNS))
+
+# Used for recipes without nutrition when the pool has none to take a median from
+DEFAULT_MEAL_NUTRITION = (8.0, 15.0, 5.0, 30.0, 12.0, 15.0)
+
+# Mirrors pcos_nutrition_guidelines in config/pcos_rules.json
+DEFAULT_GUIDELINES = {
+    "macro_distribution": {"carbs_percent": 40, "protein_percent": 30, "fat_percent": 30},
+    "daily_targets": {
+        "max_sugar_grams": 25,
+        "min_protein_grams": 80,
+        "min_fiber_grams": 30,
+        "max_glycemic_load": 100
+    }
+}
+
+
+def recipe_nutrition(recipe: Dict) -> List[Optional[float]]:
+    """
+    Extract PLAN_COLUMNS amounts from a recipe's nutrition payload.
+    Glycemic load is read from nutrition.properties, where Spoonacular reports it.
+
+    Returns:
+        Amount per column, None where missing
+    """
+    nutrition = recipe.get("nutrition") if isinstance(recipe, dict) else None
+    if not isinstance(nutrition, dict):
+        return [None] * len(PLAN_COLUMNS)
+
+    amounts = {}
+    for entry in (nutrition.get("nutrients") or []) + (nutrition.get("properties") or []):
+        if isinstance(entry, dict) and isinstance(entry.get("amount"), (int, float)):
+            amounts[entry.get("name")] = float(entry["amount"])
+
+    return [amounts.get(name) for name in PLAN_COLUMNS]
+
+
+class MealPlanOptimizer:
+    def __init__(
+        self,
+        guidelines: Optional[Dict] = None,
+        variety_weight: float = 0.5,
+        weekly_weight: float = 1.0,
+        macro_weight: float = 0.5,
+        max_sweeps: int = 6,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize optimizer.
+
+        Args:
+            guidelines: pcos_nutrition_guidelines section of pcos_rules.json
+            variety_weight: Penalty per extra use of the same recipe in the plan
+            weekly_weight: Weight of weekly total targets relative to daily ones
+            macro_weight: Weight of the carbs/protein/fat energy split deviation
+            max_sweeps: Upper bound on local-search passes over the plan
+            seed: Optional seed; breaks ties between equally good recipes
+        """
+        guidelines = guidelines or DEFAULT_GUIDELINES
+        targets = guidelines.get("daily_targets", DEFAULT_GUIDELINES["daily_targets"])
+        macros = guidelines.get("macro_distribution", DEFAULT_GUIDELINES["macro_distribution"])
+
+        self.max_sugar = float(targets.get("max_sugar_grams", 25))
+        self.min_protein = float(targets.get("min_protein_grams", 80))
+        self.min_fiber = float(targets.get("min_fiber_grams", 30))
+        self.max_glycemic_load = float(targets.get("max_glycemic_load", 100))
+        self.macro_split = np.array([
+            macros.get("carbs_percent", 40),
+            macros.get("protein_percent", 30),
+            macros.get("fat_percent", 30)
+        ], dtype=np.float64) / 100
+
+        self.variety_weight = variety_weight
+        self.weekly_weight = weekly_weight
+        self.macro_weight = macro_weight
+        self.max_sweeps = max_sweeps
+        self.seed = seed
+        self.last_day_totals = np.zeros((0, len(PLAN_COLUMNS)))
+
+    def penalty(self, totals: np.ndarray, days: int = 1) -> np.ndarray:
+        """
+        Score how far nutrient totals are from the targets (0 = all met).
+
+        Args:
+            totals: Array [..., len(PLAN_COLUMNS)] of summed amounts
+            days: Days the totals cover; targets scale linearly
+
+        Returns:
+            Penalty per row of totals
+        """
+        def over(value, limit):
+            return (np.maximum(0.0, value - limit) / limit) ** 2
+
+        def under(value, minimum):
+            return (np.maximum(0.0, minimum - value) / minimum) ** 2
+
+        result = (
+            over(totals[..., SUGAR], self.max_sugar * days)
+            + under(totals[..., PROTEIN], self.min_protein * days)
+            + under(totals[..., FIBER], self.min_fiber * days)
+            + over(totals[..., GLYCEMIC_LOAD], self.max_glycemic_load * days)
+        )
+
+        # Energy split of carbs (4 kcal/g), protein (4 kcal/g) and fat (9 kcal/g)
+        energy = np.stack([4 * totals[..., CARBS], 4 * totals[..., PROTEIN], 9 * totals[..., FAT]], axis=-1)
+        total_energy = energy.sum(axis=-1)
+        share = energy / np.where(total_energy > 0, total_energy, 1.0)[..., None]
+        split_error = np.abs(share - self.macro_split).sum(axis=-1)
+
+        return result + self.macro_weight * np.where(total_energy > 0, split_error, 0.0)
+
+    def nutrient_matrix(self, recipes: List[Dict]) -> np.ndarray:
+        """Build the PLAN_COLUMNS matrix, imputing missing values with the pool median."""
+        raw = np.array(
+            [[np.nan if v is None else v for v in recipe_nutrition(recipe)] for recipe in recipes],
+            dtype=np.float64
+        ).reshape(len(recipes), len(PLAN_COLUMNS))
+
+        for col in range(len(PLAN_COLUMNS)):
+            known = raw[:, col][~np.isnan(raw[:, col])]
+            fill = np.median(known) if known.size else DEFAULT_MEAL_NUTRITION[col]
+            raw[np.isnan(raw[:, col]), col] = fill
+
+        return raw
+
+    def optimize(self, days: List[Dict[str, List[Dict]]]) -> List[Dict[str, Optional[Dict]]]:
+        """
+        Pick one recipe per meal slot for every day.
+
+        Args:
+            days: Plan-ordered list of {meal_type: candidate recipes}; days are
+                grouped into weeks of seven for the weekly totals
+
+        Returns:
+            Plan-ordered list of {meal_type: chosen recipe, or None if no candidates}
+        """
+        # One global pool of distinct recipes; candidates are indexes into it
+        pool: List[Dict] = []
+        pool_index: Dict = {}
+        slots = []
+
+        for day, meals in enumerate(days):
+            for meal_type, candidates in meals.items():
+                indexes = []
+                for recipe in candidates:
+                    key = recipe.get("id", id(recipe))
+                    if key not in pool_index:
+                        pool_index[key] = len(pool)
+                        pool.append(recipe)
+                    indexes.append(pool_index[key])
+                slots.append((day, meal_type, np.array(sorted(set(indexes)), dtype=np.int64)))
+
+        chosen = [{meal_type: None for meal_type in meals} for meals in days]
+        if not pool:
+            self.last_day_totals = np.zeros((len(days), len(PLAN_COLUMNS)))
+            return chosen
+
+        # Row len(pool) is an all-zero sentinel for slots not yet assigned
+        nutrients = np.vstack([self.nutrient_matrix(pool), np.zeros(len(PLAN_COLUMNS))])
+        empty = len(pool)
+
+        rng = np.random.default_rng(self.seed)
+        jitter = rng.random(len(pool) + 1) * 1e-6
+
+        week_of = np.arange(len(days)) // 7
+        # Weekly targets scale with the days that have meals to plan, so a
+        # partially built week is not judged against seven days of targets
+        planned = np.array([any(len(c) for c in meals.values()) for meals in days], dtype=bool)
+        week_days = np.maximum(1, np.bincount(week_of, weights=planned, minlength=week_of.max() + 1)).astype(np.int64)
+        day_totals = np.zeros((len(days), len(PLAN_COLUMNS)))
+        week_totals = np.zeros((len(week_days), len(PLAN_COLUMNS)))
+        uses = np.zeros(len(pool) + 1, dtype=np.int64)
+        selection = [empty] * len(slots)
+
+        def improve(slot: int) -> bool:
+            day, _, candidates = slots[slot]
+            if candidates.size == 0:
+                return False
+
+            current = selection[slot]
+            week = week_of[day]
+            day_rest = day_totals[day] - nutrients[current]
+            week_rest = week_totals[week] - nutrients[current]
+            rest_uses = uses[candidates] - (candidates == current)
+
+            cand = nutrients[candidates]
+            objective = (
+                self.penalty(day_rest + cand)
+                + self.weekly_weight * self.penalty(week_rest + cand, days=week_days[week])
+                + self.variety_weight * rest_uses
+                + jitter[candidates]
+            )
+            best = candidates[int(np.argmin(objective))]
+            if best == current:
+                return False
+
+            delta = nutrients[best] - nutrients[current]
+            day_totals[day] += delta
+            week_totals[week] += delta
+            uses[current] -= 1
+            uses[best] += 1
+            selection[slot] = best
+            return True
+
+        # Greedy seeding in plan order, then local search until stable
+        for slot in range(len(slots)):
+            improve(slot)
+
+        for _ in range(self.max_sweeps):
+            if not any([improve(slot) for slot in range(len(slots))]):
+                break
+
+        for (day, meal_type, _), index in zip(slots, selection):
+            if index != empty:
+                chosen[day][meal_type] = pool[index]
+
+        self.last_day_totals = day_totals
+        return chosen
+
+    def report(self, day_totals: Optional[np.ndarray] = None) -> Dict:
+        """
+        Summarize target compliance of the last optimized plan.
+
+        Returns:
+            Dict with day count, days meeting every target, and per-target hit counts
+        """
+        totals = self.last_day_totals if day_totals is None else day_totals
+        checks = {
+            "sugar": totals[:, SUGAR] <= self.max_sugar,
+            "protein": totals[:, PROTEIN] >= self.min_protein,
+            "fiber": totals[:, FIBER] >= self.min_fiber,
+            "glycemic_load": totals[:, GLYCEMIC_LOAD] <= self.max_glycemic_load
+        }
+        all_met = np.logical_and.reduce(list(checks.values())) if len(totals) else np.zeros(0, dtype=bool)
+
+        return {
+            "days": int(len(totals)),
+            "days_meeting_targets": int(all_met.sum()),
+            **{f"{name}_days": int(hit.sum()) for name, hit in checks.items()}
+        }
@@ -0,0 +1,359 @@
+"""
+Meal Plan Builder
+Fans Spoonacular recipe searches out across a thread pool and assembles
+the weekly PCOS meal plan.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+MEAL_TYPES = ["breakfast", "lunch", "dinner", "snack"]
+
+FALLBACK_RECIPES = {
+    "breakfast": {
+        "title": "Oats & Berries Bowl",
+        "image": "https://spoonacular.com/recipeImages/oatmeal.jpg",
+        "readyInMinutes": 10,
+        "summary": "Healthy oats with mixed berries and nuts"
+    },
+    "lunch": {
+        "title": "Grilled Chicken Salad",
+        "image": "https://spoonacular.com/recipeImages/salad.jpg",
+        "readyInMinutes": 20,
+        "summary": "Fresh greens with grilled chicken and vegetables"
+    },
+    "dinner": {
+        "title": "Baked Fish with Vegetables",
+        "image": "https://spoonacular.com/recipeImages/fish.jpg",
+        "readyInMinutes": 30,
+        "summary": "Healthy baked fish with seasonal vegetables"
+    },
+    "snack": {
+        "title": "Mixed Nuts & Seeds",
+        "image": "https://spoonacular.com/recipeImages/nuts.jpg",
+        "readyInMinutes": 2,
+        "summary": "Protein-rich handful of nuts and seeds"
+    }
+}
+
+
+def get_fallback_recipe(meal_type: str) -> Dict:
+    """Get a fallback recipe when API fails."""
+    return dict(FALLBACK_RECIPES.get(meal_type, FALLBACK_RECIPES["snack"]))
+
+
+class MealPlanBuilder:
+    def __init__(
+        self,
+        spoonacular_client,
+        cuisines: List[str],
+        intolerances: Optional[List[str]] = None,
+        weeks: int = 1,
+        recipes_per_search: int = 2,
+        max_workers: int = 6,
+        seed: Optional[int] = None,
+        guidelines: Optional[Dict] = None
+    ):
+        """
+        Initialize meal plan builder.
+
+        Args:
+            spoonacular_client: SpoonacularClient used for recipe searches
+            cuisines: Cuisines rotated day by day for variety
+            intolerances: Spoonacular intolerances (e.g., ["dairy", "gluten"])
+            weeks: Number of weeks to plan
+            recipes_per_search: Number of recipe options requested per search
+            max_workers: Upper bound on concurrent Spoonacular searches
+            seed: Optional seed for reproducible recipe selection
+            guidelines: pcos_nutrition_guidelines from pcos_rules.json; meals are
+                chosen to meet its daily_targets and macro_distribution
+        """
+        self.client = spoonacular_client
+        self.cuisines = cuisines
+        self.intolerances = sorted(intolerances or [])
+        self.weeks = weeks
+        self.recipes_per_search = recipes_per_search
+        self.max_workers = max_workers
+        self.seed = seed
+        self.guidelines = guidelines
+
+        self.results: Dict[Tuple, Dict] = {}
+        self.errors: List[str] = []
+        self.nutrition_report: Dict = {}
+
+        # Each (day_key, meal_type) slot records the search it depends on, so
+        # edits re-fetch and re-select only the slots they touch
+        self.slot_inputs: Dict[Tuple[str, str], Tuple] = {
+            (day_key, meal_type): self.query_key(day_cuisine, meal_type)
+            for day_key, day_cuisine in self.day_slots()
+            for meal_type in MEAL_TYPES
+        }
+        self.meal_plan: Dict[str, Dict] = {}
+
+    def day_slots(self) -> List[Tuple[str, str]]:
+        """
+        List every day of the plan with its rotated cuisine.
+
+        Returns:
+            List of (day_key, cuisine) tuples in plan order
+        """
+        slots = []
+        cuisine_idx = 0
+
+        for week in range(1, self.weeks + 1):
+            for day in range(1, 8):
+                day_cuisine = self.cuisines[cuisine_idx % len(self.cuisines)]
+                cuisine_idx += 1
+                slots.append((f"Week{week}_Day{day}", day_cuisine))
+
+        return slots
+
+    def query_key(self, cuisine: str, meal_type: str, intolerances: Optional[List[str]] = None) -> Tuple:
+        """Build the deduplication key for a single recipe search."""
+        if intolerances is None:
+            intolerances = self.intolerances
+        return (cuisine, meal_type, tuple(sorted(intolerances)))
+
+    def unique_queries(self) -> List[Tuple]:
+        """
+        Collect the distinct searches needed for the whole plan.
+        The cuisine rotation repeats, so most days share their searches.
+
+        Returns:
+            Ordered list of unique (cuisine, meal_type, intolerances) keys
+        """
+        return list(dict.fromkeys(self.slot_inputs.values()))
+
+    def slots_in(self, week: int, day: Optional[int] = None, meal_type: Optional[str] = None) -> List[Tuple[str, str]]:
+        """
+        List the (day_key, meal_type) slots of a week, day or single meal.
+
+        Args:
+            week: Week number (1-based)
+            day: Optional day number within the week (1-7); all days if omitted
+            meal_type: Optional meal type; all meals if omitted
+        """
+        return [
+            (day_key, slot_meal)
+            for day_key, slot_meal in self.slot_inputs
+            if day_key.startswith(f"Week{week}_")
+            and (day is None or day_key == f"Week{week}_Day{day}")
+            and (meal_type is None or slot_meal == meal_type)
+        ]
+
+    def estimate_points(self) -> float:
+        """
+        Estimate the API points needed to build the plan.
+        Searches already in the response cache cost nothing.
+        """
+        return sum(
+            self.client.estimate_search_points(
+                cuisine=cuisine,
+                meal_type=meal_type,
+                dietary_restrictions=list(intolerances),
+                number=self.recipes_per_search
+            )
+            for cuisine, meal_type, intolerances in self.unique_queries()
+        )
+
+    def _run_query(self, key: Tuple) -> Dict:
+        """Execute one recipe search, converting exceptions to error dicts."""
+        cuisine, meal_type, intolerances = key
+
+        try:
+            return self.client.search_pcos_recipes(
+                cuisine=cuisine,
+                meal_type=meal_type,
+                dietary_restrictions=list(intolerances),
+                number=self.recipes_per_search
+            )
+        except Exception as e:
+            print(f"Error fetching {meal_type}: {e}")
+            return {"error": str(e)}
+
+    def fetch_all(self, progress_callback: Optional[Callable[[int, int, str], None]] = None) -> Dict[Tuple, Dict]:
+        """
+        Run all unique searches concurrently.
+
+        Args:
+            progress_callback: Optional callable(done, total, label), invoked
+                from the calling thread as each search completes
+
+        Returns:
+            Dict mapping query key to Spoonacular response
+        """
+        return self._fetch(self.unique_queries(), progress_callback)
+
+    def _fetch(self, keys: List[Tuple], progress_callback: Optional[Callable[[int, int, str], None]] = None) -> Dict[Tuple, Dict]:
+        """Run the given searches concurrently, skipping any already fetched."""
+        for _ in self._fetch_iter(keys, progress_callback):
+            pass
+        return self.results
+
+    def _fetch_iter(
+        self,
+        keys: List[Tuple],
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> Iterator[Tuple]:
+        """Run searches concurrently, yielding each key from the calling thread as it lands in results."""
+        queries = [key for key in dict.fromkeys(keys) if key not in self.results]
+        total = len(queries)
+
+        if not queries:
+            return
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, total))) as executor:
+            futures = {executor.submit(self._run_query, key): key for key in queries}
+
+            for done, future in enumerate(as_completed(futures), 1):
+                key = futures[future]
+                self.results[key] = future.result()
+
+                if progress_callback:
+                    progress_callback(done, total, f"{key[0] or 'Any'} {key[1]}")
+
+                yield key
+
+    def stream(self, progress_callback: Optional[Callable[[int, int, str], None]] = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        Build the plan day by day, yielding each day as soon as its searches finish.
+        Days are yielded in plan order; each is optimized with the earlier days
+        fixed, since days already shown cannot change.
+
+        Args:
+            progress_callback: Optional callable(done, total, label) for progress updates
+
+        Yields:
+            (day_key, {meal_type: recipe}) tuples
+        """
+        self.meal_plan = {day_key: {} for day_key, _ in self.day_slots()}
+        pending = [day_key for day_key, _ in self.day_slots()]
+
+        def completed_days():
+            while pending and all(self.slot_inputs[(pending[0], m)] in self.results for m in MEAL_TYPES):
+                day_key = pending.pop(0)
+                self._select([(day_key, meal_type) for meal_type in MEAL_TYPES])
+                yield day_key, self.meal_plan[day_key]
+
+        # Searches are submitted in plan order, so early days finish first
+        yield from completed_days()
+        for _ in self._fetch_iter(self.unique_queries(), progress_callback):
+            yield from completed_days()
+
+    def build(self, progress_callback: Optional[Callable[[int, int, str], None]] = None) -> Tuple[Dict, List[Dict]]:
+        """
+        Fetch recipes and assemble the meal plan.
+
+        Args:
+            progress_callback: Optional callable(done, total, label) for progress updates
+
+        Returns:
+            Tuple of (meal_plan keyed by "Week{n}_Day{d}", list of selected recipes)
+        """
+        self.fetch_all(progress_callback)
+
+        # With every search in hand the whole plan is optimized jointly,
+        # which balances days better than stream()'s day-at-a-time picks
+        self.meal_plan = {day_key: {} for day_key, _ in self.day_slots()}
+        self._select(list(self.slot_inputs))
+
+        return self.meal_plan, self.selected_recipes()
+
+    def swap(
+        self,
+        slots: List[Tuple[str, str]],
+        intolerances: Optional[List[str]] = None,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> List[Dict]:
+        """
+        Replace the recipes in some slots, leaving the rest of the plan untouched.
+        Only searches the swapped slots now depend on and have not run yet are fetched.
+
+        Args:
+            slots: (day_key, meal_type) slots to swap, e.g. from slots_in()
+            intolerances: New intolerances for these slots, or None to keep theirs
+            progress_callback: Optional callable(done, total, label) for progress updates
+
+        Returns:
+            List of {"day", "meal_type", "old", "new"} dicts for slots that changed
+        """
+        if intolerances is not None:
+            for day_key, meal_type in slots:
+                cuisine = self.slot_inputs[(day_key, meal_type)][0]
+                self.slot_inputs[(day_key, meal_type)] = self.query_key(cuisine, meal_type, intolerances)
+
+        self._fetch([self.slot_inputs[slot] for slot in slots], progress_callback)
+
+        previous = {slot: self.meal_plan[slot[0]][slot[1]] for slot in slots}
+        self._select(slots, exclude_current=True)
+
+        changes = []
+        for (day_key, meal_type), old in previous.items():
+            new = self.meal_plan[day_key][meal_type]
+            if new.get("id") != old.get("id"):
+                changes.append({"day": day_key, "meal_type": meal_type, "old": old, "new": new})
+        return changes
+
+    def selected_recipes(self) -> List[Dict]:
+        """Recipes currently in the plan, in plan order, excluding fallbacks."""
+        return [
+            self.meal_plan[day_key][meal_type]
+            for day_key, meal_type in self.slot_inputs
+            if "id" in self.meal_plan[day_key].get(meal_type, {})
+        ]
+
+    def _candidates(self, slot: Tuple[str, str]) -> List[Dict]:
+        """Search results for a slot's current inputs, recording each distinct search error once."""
+        recipes = self.results.get(self.slot_inputs[slot], {})
+
+        if 'error' in recipes:
+            if recipes['error'] not in self.errors:
+                self.errors.append(recipes['error'])
+            return []
+        return recipes.get('results') or []
+
+    def _select(self, slots: List[Tuple[str, str]], exclude_current: bool = False) -> None:
+        """
+        Choose recipes for the given slots with every other slot held fixed.
+
+        Args:
+            slots: Slots to (re)select
+            exclude_current: Prefer a recipe other than the slot's current one
+        """
+        from utils.meal_optimizer import MealPlanOptimizer
+
+        free = set(slots)
+        candidates = []
+
+        for day_key, _ in self.day_slots():
+            day_candidates = {}
+
+            for meal_type in MEAL_TYPES:
+                slot = (day_key, meal_type)
+                current = self.meal_plan[day_key].get(meal_type)
+
+                if slot in free:
+                    pool = self._candidates(slot)
+                    if exclude_current and current is not None:
+                        pool = [r for r in pool if r.get("id") != current.get("id")] or pool
+                    day_candidates[meal_type] = pool
+                else:
+                    # Fixed slots still count towards daily totals and variety
+                    day_candidates[meal_type] = [current] if current and "id" in current else []
+
+            candidates.append(day_candidates)
+
+        # Pick the day's meals together so totals meet the PCOS targets;
+        # the seed only breaks ties, so a given seed always yields the same plan
+        optimizer = MealPlanOptimizer(self.guidelines, seed=self.seed)
+        choices = optimizer.optimize(candidates)
+        self.nutrition_report = optimizer.report()
+
+        for (day_key, _), day_choices in zip(self.day_slots(), choices):
+            for meal_type in MEAL_TYPES:
+                if (day_key, meal_type) not in free:
+                    continue
+
+                recipe = day_choices.get(meal_type)
+                self.meal_plan[day_key][meal_type] = recipe if recipe is not None else get_fallback_recipe(meal_type)
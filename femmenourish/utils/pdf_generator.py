@@ -1,28 +1,43 @@
 """
 PDF Report Generator for meal plans and assessments.
 Creates professional PDF documents for patients.
+
+ReportLab is imported when the first report is generated, not at module import.
+Reports render into memory and are returned as bytes unless an output path
+is given. Styles and the static sections (guidelines, disclaimer, table
+style) are built once per generator and reused by every render.
 """
 
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image as RLImage
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
+import io
+import threading
 from datetime import datetime
-from typing import Dict, List
-import os
+from typing import Dict, List, Optional, Union
 
 
 class PDFGenerator:
     def __init__(self):
-        """Initialize PDF generator with styles."""
-        self.styles = getSampleStyleSheet()
+        """Initialize PDF generator. Styles are built on first use."""
+        self.styles = None
+        # Renders share the cached flowables, which ReportLab mutates while laying out
+        self._render_lock = threading.Lock()
+    
+    def _init_styles(self):
+        """Build the ReportLab stylesheet, custom styles and static flowables once."""
+        if self.styles is not None:
+            return
+        
+        from reportlab.lib import colors
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.enums import TA_CENTER
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, Spacer, TableStyle
+        
+        styles = getSampleStyleSheet()
         
         # Custom styles for women's health theme
         self.title_style = ParagraphStyle(
             'CustomTitle',
-            parent=self.styles['Heading1'],
+            parent=styles['Heading1'],
             fontSize=24,
             textColor=colors.HexColor('#FF8FA3'),
             spaceAfter=30,
@@ -31,7 +46,7 @@ class PDFGenerator:
         
         self.heading_style = ParagraphStyle(
             'CustomHeading',
-            parent=self.styles['Heading2'],
+            parent=styles['Heading2'],
             fontSize=16,
             textColor=colors.HexColor('#FF8FA3'),
             spaceAfter=12
@@ -39,10 +54,73 @@ class PDFGenerator:
         
         self.body_style = ParagraphStyle(
             'CustomBody',
-            parent=self.styles['BodyText'],
+            parent=styles['BodyText'],
             fontSize=11,
             textColor=colors.HexColor('#4A4A4A')
         )
+        
+        self.disclaimer_style = ParagraphStyle(
+            'Disclaimer',
+            parent=self.body_style,
+            fontSize=9,
+            textColor=colors.HexColor('#8E8E8E'),
+            leftIndent=20,
+            rightIndent=20
+        )
+        
+        self.meal_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#FFB3C1')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#FFF5F7')),
+            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#FFE4E8'))
+        ])
+        self.meal_table_widths = [0.8*inch, 2*inch, 2*inch, 2*inch, 1.5*inch]
+        
+        # Static sections, identical in every meal plan report
+        self.meal_plan_title = Paragraph("OvaWell PCOS Meal Plan", self.title_style)
+        self.assessment_title = Paragraph("PCOS Assessment Report", self.title_style)
+        self.guidelines_section = [
+            Paragraph("Your PCOS Nutrition Plan", self.heading_style),
+            Paragraph("""
+        This personalized meal plan is designed to help manage PCOS symptoms through nutrition:<br/>
+        • <b>40% Carbohydrates</b> - Low glycemic index only<br/>
+        • <b>30% Protein</b> - Supports insulin sensitivity<br/>
+        • <b>30% Healthy Fats</b> - Anti-inflammatory omega-3s<br/>
+        <br/>
+        <b>Key Benefits:</b><br/>
+        • Improves insulin sensitivity<br/>
+        • Reduces inflammation<br/>
+        • Supports hormone balance<br/>
+        • Aids in weight management<br/>
+        """, self.body_style),
+            Spacer(1, 0.3 * inch)
+        ]
+        self.disclaimer_section = [
+            Spacer(1, 0.5 * inch),
+            Paragraph("""
+        <b>Medical Disclaimer:</b> This meal plan is designed to complement medical treatment for PCOS, 
+        not replace it. Always consult with your healthcare provider before making significant dietary changes. 
+        Individual needs may vary based on medications, comorbidities, and personal health goals.
+        """, self.disclaimer_style)
+        ]
+        
+        # Set last: other threads treat a non-None stylesheet as fully initialized
+        self.styles = styles
+    
+    def _render(self, story: List, output_path: Optional[str]) -> Union[bytes, str]:
+        """Lay out a story into output_path, or into memory when it is None."""
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate
+        
+        target = output_path or io.BytesIO()
+        with self._render_lock:
+            SimpleDocTemplate(target, pagesize=letter).build(story)
+        
+        return output_path or target.getvalue()
     
     def generate_meal_plan_pdf(
         self,
@@ -50,9 +128,9 @@ class PDFGenerator:
         meal_plan: Dict,
         shopping_list: Dict,
         assessment: Dict,
-        output_path: str,
-        city: str
-    ) -> str:
+        output_path: Optional[str] = None,
+        city: str = ""
+    ) -> Union[bytes, str]:
         """
         Generate comprehensive PDF meal plan report.
         
@@ -61,19 +139,22 @@ class PDFGenerator:
             meal_plan: Weekly meal plan data
             shopping_list: Shopping list with categories
             assessment: PCOS assessment results
-            output_path: Path to save PDF
+            output_path: Path to save PDF; None renders in memory
             city: Patient's city
         
         Returns:
-            Path to generated PDF file
+            PDF bytes, or output_path when one was given
         """
         
-        doc = SimpleDocTemplate(output_path, pagesize=letter)
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Table, Paragraph, Spacer
+        
+        self._init_styles()
+        
         story = []
         
         # Header
-        title = Paragraph("OvaWell PCOS Meal Plan", self.title_style)
-        story.append(title)
+        story.append(self.meal_plan_title)
         story.append(Spacer(1, 0.2 * inch))
         
         # Patient Info
@@ -98,22 +179,7 @@ class PDFGenerator:
         story.append(Spacer(1, 0.3 * inch))
         
         # Nutrition Guidelines
-        story.append(Paragraph("Your PCOS Nutrition Plan", self.heading_style))
-        
-        guidelines_text = """
-        This personalized meal plan is designed to help manage PCOS symptoms through nutrition:<br/>
-        • <b>40% Carbohydrates</b> - Low glycemic index only<br/>
-        • <b>30% Protein</b> - Supports insulin sensitivity<br/>
-        • <b>30% Healthy Fats</b> - Anti-inflammatory omega-3s<br/>
-        <br/>
-        <b>Key Benefits:</b><br/>
-        • Improves insulin sensitivity<br/>
-        • Reduces inflammation<br/>
-        • Supports hormone balance<br/>
-        • Aids in weight management<br/>
-        """
-        story.append(Paragraph(guidelines_text, self.body_style))
-        story.append(Spacer(1, 0.3 * inch))
+        story.extend(self.guidelines_section)
         
         # Sample Week Meal Plan
         story.append(Paragraph("Week 1 Meal Plan", self.heading_style))
@@ -122,9 +188,9 @@ class PDFGenerator:
         meal_data = [['Day', 'Breakfast', 'Lunch', 'Dinner', 'Snack']]
         
         for day in range(1, 8):
-            day_key = f"Day {day}"
-            if day_key in meal_plan:
-                day_meals = meal_plan[day_key]
+            # Plans are keyed "Week1_Day1"; "Day 1" is the older format
+            day_meals = meal_plan.get(f"Week1_Day{day}") or meal_plan.get(f"Day {day}")
+            if day_meals:
                 row = [
                     f"Day {day}",
                     day_meals.get('breakfast', {}).get('title', 'N/A')[:30],
@@ -134,17 +200,8 @@ class PDFGenerator:
                 ]
                 meal_data.append(row)
         
-        meal_table = Table(meal_data, colWidths=[0.8*inch, 2*inch, 2*inch, 2*inch, 1.5*inch])
-        meal_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#FFB3C1')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#FFF5F7')),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#FFE4E8'))
-        ]))
+        meal_table = Table(meal_data, colWidths=self.meal_table_widths)
+        meal_table.setStyle(self.meal_table_style)
         
         story.append(meal_table)
         story.append(Spacer(1, 0.3 * inch))
@@ -178,50 +235,38 @@ class PDFGenerator:
             story.append(Spacer(1, 0.1 * inch))
         
         # Disclaimer
-        story.append(Spacer(1, 0.5 * inch))
-        disclaimer = """
-        <b>Medical Disclaimer:</b> This meal plan is designed to complement medical treatment for PCOS, 
-        not replace it. Always consult with your healthcare provider before making significant dietary changes. 
-        Individual needs may vary based on medications, comorbidities, and personal health goals.
-        """
-        story.append(Paragraph(disclaimer, ParagraphStyle(
-            'Disclaimer',
-            parent=self.body_style,
-            fontSize=9,
-            textColor=colors.HexColor('#8E8E8E'),
-            leftIndent=20,
-            rightIndent=20
-        )))
+        story.extend(self.disclaimer_section)
         
         # Build PDF
-        doc.build(story)
-        
-        return output_path
+        return self._render(story, output_path)
     
     def generate_assessment_pdf(
         self,
         patient_name: str,
         assessment_results: Dict,
-        output_path: str
-    ) -> str:
+        output_path: Optional[str] = None
+    ) -> Union[bytes, str]:
         """
         Generate PCOS assessment report PDF.
         
         Args:
             patient_name: Patient's name
             assessment_results: Complete assessment data
-            output_path: Path to save PDF
+            output_path: Path to save PDF; None renders in memory
         
         Returns:
-            Path to generated PDF file
+            PDF bytes, or output_path when one was given
         """
         
-        doc = SimpleDocTemplate(output_path, pagesize=letter)
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, Spacer
+        
+        self._init_styles()
+        
         story = []
         
         # Title
-        title = Paragraph("PCOS Assessment Report", self.title_style)
-        story.append(title)
+        story.append(self.assessment_title)
         story.append(Spacer(1, 0.2 * inch))
         
         # Patient Info
@@ -263,6 +308,4 @@ class PDFGenerator:
             story.append(Spacer(1, 0.1 * inch))
         
         # Build PDF
-        doc.build(story)
-        
-        return output_path
+        return self._render(story, output_path)
@@ -0,0 +1,207 @@
+"""
+Plan Jobs
+Background job handlers for meal-plan generation and PDF reports. They run
+on JobQueue worker threads, so they take only JSON params, read city data
+and guidelines from the shared config, and never call Streamlit.
+"""
+
+from typing import Dict
+
+from utils.config import get_config
+from utils.job_queue import JobContext, JobQueue
+from utils.meal_planner import MealPlanBuilder
+from utils.shopping_list import apply_costs, build_shopping_list
+
+
+MEAL_PLAN_JOB = "meal_plan"
+MEAL_PLAN_PDF_JOB = "meal_plan_pdf"
+
+# Days planned between location adaptation requests, so earlier weeks are
+# adapted while later ones are still fetching
+ADAPTATION_BATCH_DAYS = 7
+
+FALLBACK_CATEGORIES = {
+    "Vegetables": [{"item": "Mixed vegetables", "quantity": "As needed", "where": "Local market"}],
+    "Proteins": [{"item": "Eggs, Legumes, Fish", "quantity": "Weekly supply", "where": "Grocery"}],
+    "Whole Grains & Millets": [{"item": "Brown rice, Whole wheat", "quantity": "2 kg", "where": "Grocery"}]
+}
+FALLBACK_TIPS = ["Buy seasonal vegetables at local markets", "Buy grains and pulses in bulk"]
+
+# Assessment fields the PDF report prints; the rest (e.g. ultrasound output) stays out of the job row
+PDF_ASSESSMENT_FIELDS = ("patient_name", "diagnosis", "phenotype", "risk_level", "risk_score", "rotterdam_score", "criteria_met")
+
+
+def run_meal_plan(spoonacular_client, gemini_client, params: Dict, job: JobContext) -> Dict:
+    """
+    Build, adapt and price a meal plan.
+
+    Args:
+        spoonacular_client: Recipe API client
+        gemini_client: Gemini client for adaptation and cost estimates
+        params: patient_name, city, weeks, intolerances, dietary_restrictions,
+            budget and estimate_costs
+        job: Context for progress; days are published as partial results as they finish
+
+    Returns:
+        Dict with the session's meal plan record under 'plan', plus
+        patient_name, recipe_count, nutrition_report and errors
+    """
+    city = params['city']
+    city_info = get_config("cities")['cities'][city]
+    preferences = {'dietary_restrictions': params['dietary_restrictions'], 'budget': params['budget']}
+
+    builder = MealPlanBuilder(
+        spoonacular_client,
+        [city_info['spoonacular_cuisine'], "Mediterranean", "Asian"],
+        intolerances=params['intolerances'],
+        weeks=params['weeks'],
+        recipes_per_search=2,
+        guidelines=get_config("pcos_rules")['pcos_nutrition_guidelines']
+    )
+
+    # Fail fast instead of filling the plan with fallbacks halfway through
+    required_points = builder.estimate_points()
+    if not spoonacular_client.can_afford(required_points):
+        remaining = spoonacular_client.quota_stats()['remaining']
+        raise RuntimeError(
+            f"This plan needs about {required_points:.0f} API points but only "
+            f"{remaining:.0f} remain today (resets at midnight UTC)"
+        )
+
+    total_days = len(builder.day_slots())
+    adapted_ids = set()
+    adaptation_futures = []
+
+    def adapt_new_recipes():
+        # Each distinct recipe is adapted once; Gemini packs them into as few calls as fit
+        fresh = []
+        for recipe in builder.selected_recipes():
+            if recipe['id'] not in adapted_ids:
+                adapted_ids.add(recipe['id'])
+                fresh.append(recipe)
+        if fresh:
+            adaptation_futures.append(
+                gemini_client.customize_recipes_for_location_async(fresh, city, city_info, preferences)
+            )
+
+    for done, _ in enumerate(builder.stream(), start=1):
+        # Only days planned so far; the rest of builder.meal_plan is still empty
+        planned = {day_key: meals for day_key, meals in builder.meal_plan.items() if meals}
+        job.progress(0.85 * done / total_days, f"Planned {done}/{total_days} days", {'meal_plan': planned})
+
+        if done % ADAPTATION_BATCH_DAYS == 0:
+            adapt_new_recipes()
+
+    meal_plan, all_recipes = builder.meal_plan, builder.selected_recipes()
+    job.progress(0.9, "Adapting recipes and pricing the shopping list")
+    adapt_new_recipes()
+
+    shopping_list = build_shopping_list(all_recipes, city_info)
+
+    cost_future = None
+    if params.get('estimate_costs') and shopping_list['categories']:
+        cost_future = gemini_client.estimate_shopping_costs_async(shopping_list, city, city_info, num_people=1)
+
+    adapted_recipes = []
+    adaptation_failed = False
+    for future in adaptation_futures:
+        try:
+            adapted_recipes.extend(future.result())
+        except Exception as e:
+            print(f"Gemini adaptation failed: {e}")
+            adaptation_failed = True
+
+    if not adapted_recipes:
+        adapted_recipes = (
+            {"tips": ["Use local seasonal produce", "Shop at local markets for freshness"]} if adaptation_failed
+            else {"tips": ["Focus on whole grains and vegetables", "Include protein with each meal"]}
+        )
+
+    if cost_future is not None:
+        try:
+            shopping_list = apply_costs(shopping_list, cost_future.result())
+        except Exception as e:
+            print(f"Shopping cost estimate failed: {e}")
+
+    if not shopping_list['categories']:
+        shopping_list['categories'] = FALLBACK_CATEGORIES
+    if not shopping_list['shopping_tips']:
+        shopping_list['shopping_tips'] = FALLBACK_TIPS
+
+    # Kept so later swaps only redo the affected slots
+    job.attach(builder)
+
+    return {
+        'plan': {
+            'meal_plan': meal_plan,
+            'adapted_recipes': adapted_recipes,
+            'shopping_list': shopping_list,
+            'city': city,
+            'weeks': params['weeks'],
+            'dietary_restrictions': params['dietary_restrictions'],
+            'budget': params['budget']
+        },
+        'patient_name': params['patient_name'],
+        'recipe_count': len(all_recipes),
+        'nutrition_report': builder.nutrition_report,
+        'errors': list(builder.errors),
+        'quota_warning': spoonacular_client.quota_warning()
+    }
+
+
+def run_meal_plan_pdf(pdf_generator, params: Dict, job: JobContext) -> bytes:
+    """
+    Render the meal plan PDF report.
+
+    Args:
+        pdf_generator: PDFGenerator
+        params: patient_name, meal_plan, shopping_list, assessment and city
+        job: Context for progress
+
+    Returns:
+        PDF bytes
+    """
+    job.progress(0.1, "Rendering PDF")
+
+    return pdf_generator.generate_meal_plan_pdf(
+        params['patient_name'],
+        params['meal_plan'],
+        params['shopping_list'],
+        params['assessment'],
+        city=params['city']
+    )
+
+
+def bind_builder(plan: Dict, builder) -> Dict:
+    """
+    Point a stored plan at its builder's live meal plan, so swaps made
+    through the builder show up in the rendered plan and the PDF params.
+
+    Args:
+        plan: The 'plan' record of a meal plan job result
+        builder: The job's attached MealPlanBuilder, or None if it ran in another process
+
+    Returns:
+        The same plan dict
+    """
+    if builder is not None:
+        plan['meal_plan'] = builder.meal_plan
+    return plan
+
+
+def meal_plan_pdf_params(meal_plan_data: Dict, assessment: Dict) -> Dict:
+    """Job params for run_meal_plan_pdf from a stored meal plan and its assessment."""
+    return {
+        'patient_name': assessment['patient_name'],
+        'meal_plan': meal_plan_data['meal_plan'],
+        'shopping_list': meal_plan_data['shopping_list'],
+        'assessment': {field: assessment.get(field) for field in PDF_ASSESSMENT_FIELDS},
+        'city': meal_plan_data['city']
+    }
+
+
+def register_plan_jobs(queue: JobQueue, spoonacular_client, gemini_client, pdf_generator) -> JobQueue:
+    """Register the meal plan and PDF handlers with a queue."""
+    queue.register(MEAL_PLAN_JOB, lambda params, job: run_meal_plan(spoonacular_client, gemini_client, params, job))
+    queue.register(MEAL_PLAN_PDF_JOB, lambda params, job: run_meal_plan_pdf(pdf_generator, params, job))
+    return queue
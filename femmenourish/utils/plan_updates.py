@@ -0,0 +1,121 @@
+"""
+Incremental Meal Plan Updates
+Applies the changes from MealPlanBuilder.swap to the shopping list and the
+location adaptation without regenerating either with Gemini: the list is
+rebuilt locally and only swapped-in recipes are re-adapted.
+"""
+
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from utils.ingredient_index import is_pantry_staple
+from utils.recipe_corpus import recipe_ingredients
+from utils.shopping_list import apply_costs, build_shopping_list, item_costs
+
+
+def plan_ingredients(recipes: List[Dict]) -> Counter:
+    """Count how many planned recipes use each normalized ingredient."""
+    counts = Counter()
+    for recipe in recipes:
+        counts.update(name for name in recipe_ingredients(recipe) if not is_pantry_staple(name))
+    return counts
+
+
+def ingredient_changes(before: Counter, after: Counter) -> Tuple[List[str], List[str]]:
+    """
+    Compare ingredient counts before and after a swap.
+
+    Returns:
+        Tuple of (ingredients newly needed, ingredients no longer needed)
+    """
+    added = [name for name in after if before.get(name, 0) == 0]
+    removed = [name for name in before if after.get(name, 0) == 0]
+    return added, removed
+
+
+def update_shopping_list(shopping_list: Dict, recipes: List[Dict], city_info: Dict) -> Dict:
+    """
+    Rebuild the shopping list for the updated plan with the local aggregator,
+    keeping prices and tips already estimated for items still on it.
+    The estimated total is kept only if the items did not change; otherwise
+    it is dropped rather than shown for a list it no longer describes.
+
+    Args:
+        shopping_list: Current list with a 'categories' mapping
+        recipes: Recipes in the updated plan
+        city_info: City metadata for store suggestions
+
+    Returns:
+        Updated shopping list (a new dict; the input is not modified)
+    """
+    rebuilt = build_shopping_list(recipes, city_info)
+    kept_fields = ["shopping_tips", "estimated_time"]
+    if _without_costs(rebuilt) == _without_costs(shopping_list):
+        kept_fields.append("total_estimated_cost")
+
+    return apply_costs(rebuilt, {
+        "costs": item_costs(shopping_list),
+        **{field: shopping_list.get(field) for field in kept_fields}
+    })
+
+
+def _without_costs(shopping_list: Dict) -> Dict:
+    """Categories with per-item costs stripped, for comparing lists before and after a swap."""
+    return {
+        category: [{k: v for k, v in item.items() if k != "cost"} for item in items]
+        for category, items in (shopping_list.get("categories") or {}).items()
+    }
+
+
+def _adapted_title(entry) -> str:
+    if not isinstance(entry, dict):
+        return ""
+    return entry.get("original_title") or entry.get("title") or ""
+
+
+def update_adaptation(
+    adapted,
+    before: List[Dict],
+    after: List[Dict],
+    gemini_client,
+    city: str,
+    city_info: Dict,
+    preferences: Dict
+):
+    """
+    Re-adapt only the recipes a swap took out of or brought into the plan.
+    A recipe still used in another slot keeps its adaptation, and Gemini is
+    called once, for newly planned recipes that have none yet.
+
+    Args:
+        adapted: Current adaptation (list of adapted recipes, or a tips dict)
+        before: MealPlanBuilder.selected_recipes() before the swap
+        after: MealPlanBuilder.selected_recipes() after the swap
+        gemini_client: GeminiClient for the replacement adaptation
+        city: City name
+        city_info: City metadata
+        preferences: Patient dietary restrictions and budget
+
+    Returns:
+        Updated adaptation in the same shape as the input
+    """
+    if not isinstance(adapted, list):
+        return adapted
+
+    before_titles = {recipe.get("title") for recipe in before}
+    after_titles = {recipe.get("title") for recipe in after}
+    removed_titles = before_titles - after_titles
+
+    kept = [entry for entry in adapted if _adapted_title(entry) not in removed_titles]
+    kept_titles = {_adapted_title(entry) for entry in kept}
+
+    additions = {}
+    for recipe in after:
+        title = recipe.get("title")
+        if title not in before_titles and title not in kept_titles:
+            additions.setdefault(title, recipe)
+    if not additions:
+        return kept
+
+    fresh = gemini_client.customize_recipes_for_location(list(additions.values()), city, city_info, preferences)
+    return kept + (fresh if isinstance(fresh, list) else [])
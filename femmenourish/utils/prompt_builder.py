@@ -0,0 +1,115 @@
+"""
+Prompt Builder
+Projects Spoonacular payloads down to the fields each Gemini task needs,
+estimates prompt tokens before sending, and packs recipes into as few
+calls as fit a token budget.
+
+Full recipe objects carry nutrition arrays, instructions, image URLs and
+repeated ingredient entries that Gemini never uses; sending only titles
+and deduplicated ingredient names cuts prompts by an order of magnitude.
+"""
+
+import json
+from typing import Any, Dict, List, Sequence
+
+from utils.ingredient_index import is_pantry_staple
+from utils.recipe_corpus import recipe_ingredients
+
+
+# Rough average for English/JSON text; close enough for budgeting
+CHARS_PER_TOKEN = 4
+
+# Fields kept per task, beyond the deduplicated ingredient names
+ADAPTATION_FIELDS = ("title", "cuisines", "diets", "readyInMinutes", "servings")
+
+# Expected response size per adapted recipe, reserved inside the budget
+ADAPTATION_OUTPUT_TOKENS = 350
+
+DEFAULT_TOKEN_BUDGET = 8000
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a prompt or response."""
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+def compact_json(obj: Any) -> str:
+    """Serialize without indentation or spaces after separators."""
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def recipe_ingredient_names(recipe: Dict) -> List[str]:
+    """Distinct ingredient names of a recipe, pantry staples left out."""
+    return [name for name in recipe_ingredients(recipe) if not is_pantry_staple(name)]
+
+
+def project_recipe(recipe: Dict, fields: Sequence[str] = ADAPTATION_FIELDS) -> Dict:
+    """
+    Reduce a recipe to the given fields plus its ingredient names.
+
+    Args:
+        recipe: Spoonacular recipe payload
+        fields: Top-level fields to keep when present and non-empty
+
+    Returns:
+        Projected recipe dict
+    """
+    projected = {field: recipe[field] for field in fields if recipe.get(field) not in (None, "", [], {})}
+    ingredients = recipe_ingredient_names(recipe)
+    if ingredients:
+        projected["ingredients"] = ingredients
+    return projected
+
+
+def project_meal_plan(meal_plan: Dict) -> Dict:
+    """
+    Reduce a meal plan to recipe titles per slot, with each distinct
+    recipe's ingredients listed once.
+
+    Returns:
+        {"days": {day_key: {meal_type: title}}, "recipes": {title: [ingredients]}}
+    """
+    days = {}
+    recipes = {}
+
+    for day_key, meals in meal_plan.items():
+        days[day_key] = {}
+        for meal_type, recipe in (meals or {}).items():
+            if not isinstance(recipe, dict):
+                continue
+            title = recipe.get("title", "Recipe")
+            days[day_key][meal_type] = title
+            if title not in recipes:
+                recipes[title] = recipe_ingredient_names(recipe)
+
+    return {"days": days, "recipes": {title: names for title, names in recipes.items() if names}}
+
+
+def pack(items: List[str], budget: int, base_tokens: int, output_tokens_per_item: int = 0) -> List[List[int]]:
+    """
+    Group items into consecutive batches that each fit the token budget.
+
+    Args:
+        items: Serialized items, in order
+        budget: Token budget per call, input and expected output combined
+        base_tokens: Tokens of the prompt without any items
+        output_tokens_per_item: Response tokens expected per item
+
+    Returns:
+        Batches of item indexes; an item too large on its own gets its own batch
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    used = base_tokens
+
+    for index, item in enumerate(items):
+        cost = estimate_tokens(item) + output_tokens_per_item
+        if current and used + cost > budget:
+            batches.append(current)
+            current, used = [], base_tokens
+        current.append(index)
+        used += cost
+
+    if current:
+        batches.append(current)
+    return batches
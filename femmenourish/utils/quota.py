@@ -0,0 +1,207 @@
+"""
+Spoonacular Quota Manager
+Tracks daily API points in SQLite so the budget survives restarts and is
+shared by every process on the host, and throttles requests per second
+with a token bucket stored in the same database.
+"""
+
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+
+from utils.response_cache import DEFAULT_CACHE_DIR
+
+
+def estimate_points(endpoint: str, params: Dict) -> float:
+    """
+    Estimate the quota points a Spoonacular request will cost.
+    Based on the published pricing; the actual cost is reconciled from the
+    X-API-Quota-Request response header when available.
+
+    Args:
+        endpoint: API endpoint path
+        params: Query parameters
+
+    Returns:
+        Estimated points
+    """
+    number = int(params.get("number", 10) or 10)
+
+    if endpoint.endswith("complexSearch"):
+        points = 1 + 0.01 * number
+        for flag in ("addRecipeInformation", "fillIngredients", "addRecipeNutrition"):
+            if params.get(flag):
+                points += 0.025 * number
+        return points
+
+    if endpoint.endswith("findByIngredients"):
+        return 1 + 0.01 * number
+
+    if endpoint.endswith("informationBulk"):
+        ids = [i for i in str(params.get("ids", "")).split(",") if i]
+        points = 1 + 0.5 * max(0, len(ids) - 1)
+        if params.get("includeNutrition"):
+            points += 0.025 * len(ids)
+        return points
+
+    if endpoint.endswith("information") and params.get("includeNutrition"):
+        return 1.025
+
+    return 1.0
+
+
+class QuotaManager:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        daily_limit: float = 150,
+        requests_per_second: float = 1.0,
+        burst: int = 5
+    ):
+        """
+        Initialize quota manager.
+
+        Args:
+            path: SQLite file shared by all processes (defaults to data/cache/spoonacular_quota.sqlite)
+            daily_limit: Points available per day (150 on the free tier)
+            requests_per_second: Sustained request rate across all processes
+            burst: Requests allowed back-to-back before throttling kicks in
+        """
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "spoonacular_quota.sqlite")
+        self.daily_limit = daily_limit
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS usage (day TEXT PRIMARY KEY, points REAL NOT NULL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bucket (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection; one per operation keeps this safe across threads and processes."""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def current_day(self) -> str:
+        """Quota day key. Spoonacular resets points at midnight UTC."""
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    def used_today(self) -> float:
+        """Points used so far today."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT points FROM usage WHERE day = ?", (self.current_day(),)).fetchone()
+        return row[0] if row else 0.0
+
+    def remaining(self) -> float:
+        """Points left today."""
+        return max(0.0, self.daily_limit - self.used_today())
+
+    def can_afford(self, points: float) -> bool:
+        """
+        Check whether a planned workload fits in today's remaining budget.
+
+        Args:
+            points: Estimated points for the whole workload
+        """
+        return points <= self.remaining()
+
+    def try_consume(self, points: float) -> bool:
+        """
+        Atomically reserve points for a request.
+
+        Returns:
+            True if reserved, False if it would exceed the daily limit
+        """
+        day = self.current_day()
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT points FROM usage WHERE day = ?", (day,)).fetchone()
+            used = row[0] if row else 0.0
+
+            if used + points > self.daily_limit:
+                conn.execute("ROLLBACK")
+                return False
+
+            conn.execute(
+                "INSERT INTO usage (day, points) VALUES (?, ?) "
+                "ON CONFLICT(day) DO UPDATE SET points = points + excluded.points",
+                (day, points)
+            )
+            conn.execute("COMMIT")
+        return True
+
+    def adjust(self, delta: float) -> None:
+        """Correct today's usage, e.g. refund a failed request or reconcile actual cost."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO usage (day, points) VALUES (?, MAX(0, ?)) "
+                "ON CONFLICT(day) DO UPDATE SET points = MAX(0, points + ?)",
+                (self.current_day(), delta, delta)
+            )
+
+    def sync_used(self, points_used: float) -> None:
+        """Raise today's usage to the server-reported total (X-API-Quota-Used)."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO usage (day, points) VALUES (?, ?) "
+                "ON CONFLICT(day) DO UPDATE SET points = MAX(points, excluded.points)",
+                (self.current_day(), points_used)
+            )
+
+    def mark_exhausted(self) -> None:
+        """Record that the server reported the quota as spent."""
+        self.sync_used(self.daily_limit)
+
+    def throttle(self) -> None:
+        """Block until the shared token bucket allows another request."""
+        if self.requests_per_second <= 0:
+            return
+
+        while True:
+            now = time.time()
+
+            with self._connect() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute("SELECT tokens, updated FROM bucket WHERE name = 'spoonacular'").fetchone()
+                tokens, updated = row if row else (float(self.burst), now)
+
+                tokens = min(float(self.burst), tokens + (now - updated) * self.requests_per_second)
+                granted = tokens >= 1
+                if granted:
+                    tokens -= 1
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO bucket (name, tokens, updated) VALUES ('spoonacular', ?, ?)",
+                    (tokens, now)
+                )
+                conn.execute("COMMIT")
+
+            if granted:
+                return
+            time.sleep((1 - tokens) / self.requests_per_second)
+
+    def stats(self) -> Dict:
+        """
+        Get today's quota usage.
+
+        Returns:
+            Dict with day, used, limit and remaining points
+        """
+        used = self.used_today()
+        return {
+            "day": self.current_day(),
+            "used": round(used, 2),
+            "limit": self.daily_limit,
+            "remaining": round(max(0.0, self.daily_limit - used), 2)
+        }
@@ -0,0 +1,426 @@
+"""
+Offline Recipe Corpus
+On-disk store of Spoonacular recipes with columnar nutrient data and
+inverted indexes on cuisine, meal type, intolerances and ingredients,
+so complexSearch-style queries can be answered without the network.
+
+Layout (data/corpus/ by default):
+    recipes.json   - recipe payloads in row order
+    nutrients.npz  - ids, popularity and the NUTRIENT_COLUMNS matrix
+    index.json     - inverted indexes mapping tag -> row numbers
+"""
+
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from utils.recipe_scoring import NUTRIENT_COLUMNS, SUGAR, PROTEIN, FIBER, build_nutrient_matrix
+
+
+DEFAULT_CORPUS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "corpus")
+
+INDEX_VERSION = 1
+
+# Write-through adds persist at most this often; the rest is written on flush() or exit
+SAVE_INTERVAL = 30.0
+
+INDEXED_FIELDS = ("cuisine", "meal_type", "intolerance_safe", "ingredient")
+
+# Ingredient words that make a recipe unsafe for each Spoonacular intolerance.
+# Used when the recipe payload has no explicit dairyFree/glutenFree flag.
+INTOLERANCE_KEYWORDS = {
+    "dairy": ("milk", "cheese", "butter", "cream", "yogurt", "yoghurt", "ghee", "paneer", "whey", "curd", "kefir"),
+    "egg": ("egg", "mayonnaise"),
+    "gluten": ("wheat", "flour", "bread", "breadcrumbs", "pasta", "barley", "rye", "couscous", "semolina",
+               "bulgur", "seitan", "noodle", "tortilla", "spaghetti", "naan", "roti", "chapati"),
+    "grain": ("wheat", "flour", "bread", "pasta", "barley", "rye", "couscous", "semolina", "bulgur", "rice",
+              "oat", "oats", "corn", "quinoa", "millet", "noodle", "tortilla"),
+    "peanut": ("peanut",),
+    "seafood": ("fish", "salmon", "tuna", "cod", "anchovy", "anchovies", "sardine", "mackerel", "tilapia",
+                "trout", "halibut", "haddock"),
+    "sesame": ("sesame", "tahini"),
+    "shellfish": ("shrimp", "prawn", "crab", "lobster", "clam", "mussel", "oyster", "scallop", "squid"),
+    "soy": ("soy", "tofu", "tempeh", "edamame", "miso"),
+    "sulfite": ("wine", "vinegar", "raisin", "apricot"),
+    "tree nut": ("almond", "cashew", "walnut", "pecan", "pistachio", "hazelnut", "macadamia", "pine nut",
+                 "brazil nut"),
+    "wheat": ("wheat", "flour", "bread", "breadcrumbs", "pasta", "couscous", "semolina", "bulgur", "seitan",
+              "spaghetti", "naan", "roti", "chapati"),
+}
+
+# Payload flags that settle an intolerance without keyword matching
+INTOLERANCE_FLAGS = {
+    "dairy": "dairyFree",
+    "gluten": "glutenFree",
+}
+
+_KEYWORD_PATTERNS = {
+    intolerance: re.compile(r"\b(" + "|".join(re.escape(k) for k in keywords) + r")(s|es)?\b")
+    for intolerance, keywords in INTOLERANCE_KEYWORDS.items()
+}
+
+
+def normalize_ingredient(name: str) -> str:
+    """Lowercase an ingredient name and collapse punctuation and whitespace."""
+    return " ".join(re.sub(r"[^a-z0-9 ]+", " ", str(name).lower()).split())
+
+
+def recipe_ingredients(recipe: Dict) -> List[str]:
+    """
+    Collect normalized ingredient names from any ingredient list in a payload.
+    Covers extendedIngredients, used/missedIngredients and nutrition.ingredients.
+    """
+    names = []
+    seen = set()
+
+    nutrition = recipe.get("nutrition") or {}
+    sources = (
+        recipe.get("extendedIngredients") or [],
+        recipe.get("usedIngredients") or [],
+        recipe.get("missedIngredients") or [],
+        nutrition.get("ingredients") or [] if isinstance(nutrition, dict) else [],
+    )
+
+    for source in sources:
+        for ingredient in source:
+            if not isinstance(ingredient, dict):
+                continue
+            name = normalize_ingredient(ingredient.get("nameClean") or ingredient.get("name") or "")
+            if name and name not in seen:
+                seen.add(name)
+                names.append(name)
+
+    return names
+
+
+def safe_intolerances(recipe: Dict, ingredients: List[str]) -> List[str]:
+    """List the intolerances a recipe is safe for."""
+    safe = []
+    text = " | ".join(ingredients)
+
+    for intolerance, pattern in _KEYWORD_PATTERNS.items():
+        flag = INTOLERANCE_FLAGS.get(intolerance)
+        if flag and flag in recipe:
+            if recipe[flag]:
+                safe.append(intolerance)
+        elif ingredients and not pattern.search(text):
+            safe.append(intolerance)
+
+    return safe
+
+
+def _row_tags(recipe: Dict) -> Dict[str, set]:
+    """Lowercased index values of a recipe for each INDEXED_FIELDS entry."""
+    ingredients = recipe_ingredients(recipe)
+    tags = {
+        "cuisine": recipe.get("cuisines") or [],
+        "meal_type": recipe.get("dishTypes") or [],
+        "intolerance_safe": safe_intolerances(recipe, ingredients),
+        "ingredient": ingredients,
+    }
+    return {field: {str(v).lower() for v in values} for field, values in tags.items()}
+
+
+class RecipeCorpus:
+    """Local recipe store answering complexSearch filters from inverted indexes."""
+
+    def __init__(self, path: Optional[str] = None, save_interval: float = SAVE_INTERVAL):
+        """
+        Initialize corpus, loading it from disk if present.
+
+        Args:
+            path: Corpus directory (defaults to data/corpus)
+            save_interval: Minimum seconds between saves triggered by add_recipes
+        """
+        self.path = path or DEFAULT_CORPUS_DIR
+        self.save_interval = save_interval
+        self._lock = threading.RLock()
+        # Serializes writers so saves taken outside self._lock don't share temp files
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = float("-inf")
+
+        self.recipes: List[Dict] = []
+        self._row_of: Dict[int, int] = {}
+        # Bumped whenever rows or indexes change, so derived indexes know to rebuild
+        self.version = 0
+        self._reset_columns()
+        self.load()
+        atexit.register(self.flush)
+
+    def __len__(self) -> int:
+        return len(self.recipes)
+
+    def _reset_columns(self) -> None:
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.popularity = np.zeros(0, dtype=np.float64)
+        self.amounts = np.zeros((0, len(NUTRIENT_COLUMNS)), dtype=np.float64)
+        self.present = np.zeros((0, len(NUTRIENT_COLUMNS)), dtype=bool)
+        self.index: Dict[str, Dict[str, List[int]]] = {field: {} for field in INDEXED_FIELDS}
+        self._masks: Dict[tuple, np.ndarray] = {}
+        self.version += 1
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def load(self) -> None:
+        """Load the corpus files; a missing or stale index is rebuilt from recipes.json."""
+        recipes_path = self._file("recipes.json")
+        if not os.path.exists(recipes_path):
+            return
+
+        with self._lock:
+            with open(recipes_path, 'r') as f:
+                self.recipes = json.load(f)
+            self._row_of = {recipe["id"]: row for row, recipe in enumerate(self.recipes)}
+
+            try:
+                with open(self._file("index.json"), 'r') as f:
+                    index = json.load(f)
+                columns = np.load(self._file("nutrients.npz"))
+
+                if index.get("version") != INDEX_VERSION or len(columns["ids"]) != len(self.recipes):
+                    raise ValueError("corpus index out of date")
+
+                self.ids = columns["ids"]
+                self.popularity = columns["popularity"]
+                self.amounts = columns["amounts"]
+                self.present = columns["present"]
+                self.index = {field: index["fields"].get(field, {}) for field in INDEXED_FIELDS}
+                self._masks = {}
+                self.version += 1
+            except (OSError, KeyError, ValueError):
+                self._rebuild()
+
+    def save(self) -> None:
+        """Write all corpus files atomically."""
+        # Snapshot under the lock, write outside it so searches aren't blocked on disk
+        with self._lock:
+            recipes = list(self.recipes)
+            index = {field: {value: list(rows) for value, rows in values.items()} for field, values in self.index.items()}
+            columns = {
+                "ids": self.ids.copy(),
+                "popularity": self.popularity.copy(),
+                "amounts": self.amounts.copy(),
+                "present": self.present.copy(),
+            }
+            self._dirty = False
+            self._saved_at = time.monotonic()
+
+        with self._save_lock:
+            try:
+                os.makedirs(self.path, exist_ok=True)
+                self._write_atomic("recipes.json", lambda f: json.dump(recipes, f))
+                self._write_atomic("index.json", lambda f: json.dump({"version": INDEX_VERSION, "fields": index}, f))
+                self._write_atomic("nutrients.npz", lambda f: np.savez(f, **columns), binary=True)
+            except OSError:
+                with self._lock:
+                    self._dirty = True
+                raise
+
+    def flush(self) -> None:
+        """Save changes that add_recipes deferred, if any."""
+        if not self._dirty:
+            return
+        try:
+            self.save()
+        except OSError as e:
+            print(f"Could not save recipe corpus: {e}")
+
+    def _write_atomic(self, name: str, write, binary: bool = False) -> None:
+        target = self._file(name)
+        tmp = f"{target}.tmp"
+        with open(tmp, 'wb' if binary else 'w') as f:
+            write(f)
+        os.replace(tmp, target)
+
+    def add_recipes(self, recipes: Iterable[Dict], save: bool = True) -> int:
+        """
+        Insert or replace recipes by id and update the indexes for those rows.
+
+        Args:
+            recipes: Recipe payloads (complexSearch results or recipe information)
+            save: Persist the corpus, at most once per save_interval; later
+                changes are written by the next save, flush() or at exit
+
+        Returns:
+            Number of recipes not previously in the corpus
+        """
+        added = 0
+        # Row -> payload it replaced, so its old index entries can be removed
+        replaced: Dict[int, Dict] = {}
+
+        with self._lock:
+            first_new = len(self.recipes)
+
+            for recipe in recipes:
+                if not isinstance(recipe, dict) or "id" not in recipe:
+                    continue
+
+                row = self._row_of.get(recipe["id"])
+                if row is None:
+                    self._row_of[recipe["id"]] = len(self.recipes)
+                    self.recipes.append(recipe)
+                    added += 1
+                else:
+                    # Keep whichever payload carries more detail
+                    merged = dict(self.recipes[row])
+                    merged.update({k: v for k, v in recipe.items() if v not in (None, [], {})})
+                    if row < first_new:
+                        replaced.setdefault(row, self.recipes[row])
+                    self.recipes[row] = merged
+
+            rows = sorted(replaced) + list(range(first_new, len(self.recipes)))
+            if not rows:
+                return added
+
+            for row, old in replaced.items():
+                for field, values in _row_tags(old).items():
+                    for value in values:
+                        indexed = self.index[field].get(value)
+                        if indexed and row in indexed:
+                            indexed.remove(row)
+                            if not indexed:
+                                del self.index[field][value]
+
+            self._update_rows(rows)
+            self._dirty = True
+            due = time.monotonic() - self._saved_at >= self.save_interval
+
+        if save and due:
+            self.save()
+
+        return added
+
+    def _rebuild(self) -> None:
+        """Recompute nutrient columns and inverted indexes from self.recipes."""
+        self._reset_columns()
+        if self.recipes:
+            self._update_rows(range(len(self.recipes)))
+
+    def _update_rows(self, rows: Iterable[int]) -> None:
+        """
+        Compute nutrient columns and index entries for the given rows, growing
+        the columns to cover rows appended to self.recipes. Replaced rows must
+        have their old index entries removed first.
+        """
+        rows = list(rows)
+        n = len(self.recipes)
+        grow = n - len(self.ids)
+        if grow > 0:
+            self.ids = np.concatenate([self.ids, np.zeros(grow, dtype=np.int64)])
+            self.popularity = np.concatenate([self.popularity, np.zeros(grow, dtype=np.float64)])
+            self.amounts = np.concatenate([self.amounts, np.zeros((grow, len(NUTRIENT_COLUMNS)), dtype=np.float64)])
+            self.present = np.concatenate([self.present, np.zeros((grow, len(NUTRIENT_COLUMNS)), dtype=bool)])
+
+        recipes = [self.recipes[row] for row in rows]
+        amounts, present, valid = build_nutrient_matrix(recipes)
+        self.amounts[rows] = amounts
+        # A non-numeric amount is stored as missing
+        self.present[rows] = present & valid
+        self.ids[rows] = [recipe["id"] for recipe in recipes]
+        self.popularity[rows] = [float(recipe.get("aggregateLikes") or 0) for recipe in recipes]
+
+        for row, recipe in zip(rows, recipes):
+            for field, values in _row_tags(recipe).items():
+                for value in values:
+                    self.index[field].setdefault(value, []).append(row)
+
+        # Masks are sized to the row count and cached per tag, so drop them all
+        self._masks = {}
+        self.version += 1
+
+    def _mask(self, field: str, value: str) -> np.ndarray:
+        """Boolean row mask for one index entry, memoized until the next rebuild."""
+        key = (field, value)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = np.zeros(len(self.recipes), dtype=bool)
+            mask[self.index[field].get(value, [])] = True
+            self._masks[key] = mask
+        return mask
+
+    def _any_of(self, field: str, values: str) -> np.ndarray:
+        """Rows matching any of a comma-separated list, like complexSearch's OR filters."""
+        mask = np.zeros(len(self.recipes), dtype=bool)
+        for value in values.split(","):
+            if value.strip():
+                mask |= self._mask(field, value.strip().lower())
+        return mask
+
+    def filter_mask(self, field: str, values: str) -> np.ndarray:
+        """
+        Boolean row mask for an indexed field, matching any of a comma-separated
+        list of values (e.g. filter_mask("cuisine", "Indian,Asian")).
+        """
+        with self._lock:
+            return self._any_of(field, values)
+
+    def search(self, params: Dict) -> Dict:
+        """
+        Answer a complexSearch query from the corpus.
+        Supports cuisine, type, intolerances, maxSugar, minProtein, minFiber
+        and number; recipes missing a filtered nutrient do not match.
+
+        Args:
+            params: complexSearch query parameters
+
+        Returns:
+            Dict shaped like the complexSearch response
+        """
+        number = int(params.get("number", 10) or 10)
+
+        with self._lock:
+            mask = np.ones(len(self.recipes), dtype=bool)
+
+            if params.get("cuisine"):
+                mask &= self._any_of("cuisine", params["cuisine"])
+
+            if params.get("type"):
+                mask &= self._any_of("meal_type", params["type"])
+
+            for intolerance in str(params.get("intolerances") or "").split(","):
+                intolerance = intolerance.strip().lower()
+                if intolerance:
+                    mask &= self._mask("intolerance_safe", intolerance)
+
+            limits = (
+                ("maxSugar", SUGAR, np.less_equal),
+                ("minProtein", PROTEIN, np.greater_equal),
+                ("minFiber", FIBER, np.greater_equal),
+            )
+            for param, col, compare in limits:
+                if params.get(param) is not None:
+                    mask &= self.present[:, col] & compare(self.amounts[:, col], float(params[param]))
+
+            rows = np.flatnonzero(mask)
+            # Most popular first, like sort=popularity; ties keep corpus order
+            rows = rows[np.argsort(-self.popularity[rows], kind="stable")]
+            results = [dict(self.recipes[row]) for row in rows[:number]]
+
+        return {
+            "results": results,
+            "offset": 0,
+            "number": number,
+            "totalResults": int(mask.sum()),
+            "source": "corpus"
+        }
+
+    def stats(self) -> Dict:
+        """
+        Get corpus size and index coverage.
+
+        Returns:
+            Dict with recipe count and distinct values per indexed field
+        """
+        with self._lock:
+            stats = {"recipes": len(self.recipes)}
+            for field in INDEXED_FIELDS:
+                stats[f"{field}_values"] = len(self.index[field])
+        return stats
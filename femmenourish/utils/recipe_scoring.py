@@ -0,0 +1,172 @@
+"""
+Vectorized PCOS Recipe Scoring
+Batch equivalents of SpoonacularClient._is_pcos_friendly and
+_calculate_pcos_score over a columnar nutrient matrix.
+"""
+
+import numpy as np
+from typing import Dict, List, Tuple
+
+
+NUTRIENT_COLUMNS = ("Sugar", "Protein", "Fiber", "Omega-3", "Calories", "Carbohydrates")
+COLUMN_INDEX = {name: i for i, name in enumerate(NUTRIENT_COLUMNS)}
+
+SUGAR, PROTEIN, FIBER, OMEGA3, CALORIES, CARBS = range(len(NUTRIENT_COLUMNS))
+
+# Nutrients each scalar scorer compares; a non-numeric amount in one of
+# them sends that scorer into its exception fallback
+FRIENDLY_COLUMNS = (SUGAR, PROTEIN, FIBER)
+COMPARED_COLUMNS = (SUGAR, PROTEIN, FIBER, OMEGA3)
+
+
+def _nutrition_of(payload) -> Dict:
+    """Accept either a nutrition dict or a recipe carrying one under 'nutrition'."""
+    if isinstance(payload, dict) and "nutrients" not in payload and "nutrition" in payload:
+        return payload["nutrition"]
+    return payload
+
+
+def build_nutrient_matrix(payloads: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convert recipe payloads into a columnar nutrient matrix in one pass.
+
+    Args:
+        payloads: Nutrition dicts, or recipes with a 'nutrition' key
+
+    Returns:
+        Tuple of (amounts float64 [n, 6], present bool [n, 6], valid bool [n, 6]).
+        Columns follow NUTRIENT_COLUMNS. valid is False for a non-numeric
+        amount, and for the whole row when its nutrient list is malformed,
+        so each scorer can reject exactly the rows its scalar twin would.
+    """
+    try:
+        return _build_flat(payloads)
+    except (AttributeError, KeyError, TypeError, ValueError):
+        # Malformed payloads need per-row handling to mirror the scalar path
+        return _build_rowwise(payloads)
+
+
+def _build_flat(payloads: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Fast path for well-formed payloads: flatten every nutrient entry at once."""
+    n = len(payloads)
+    nutrient_lists = [_nutrition_of(p).get("nutrients", []) for p in payloads]
+
+    rows = np.repeat(np.arange(n), [len(nutrients) for nutrients in nutrient_lists])
+    cols = np.array(
+        [COLUMN_INDEX.get(nt["name"], -1) for nutrients in nutrient_lists for nt in nutrients],
+        dtype=np.int64
+    )
+    raw_amounts = [nt["amount"] for nutrients in nutrient_lists for nt in nutrients]
+
+    keep = cols >= 0
+    values = np.array([a for a, k in zip(raw_amounts, keep) if k])
+    if values.size and values.dtype.kind not in "biuf":
+        raise TypeError("non-numeric nutrient amount")
+
+    amounts = np.zeros((n, len(NUTRIENT_COLUMNS)), dtype=np.float64)
+    present = np.zeros((n, len(NUTRIENT_COLUMNS)), dtype=bool)
+
+    # Later duplicates win, matching the scalar {name: amount} dict
+    flat = rows[keep] * len(NUTRIENT_COLUMNS) + cols[keep]
+    _, last = np.unique(flat[::-1], return_index=True)
+    last = len(flat) - 1 - last
+
+    amounts.flat[flat[last]] = values[last]
+    present.flat[flat[last]] = True
+
+    return amounts, present, np.ones((n, len(NUTRIENT_COLUMNS)), dtype=bool)
+
+
+def _build_rowwise(payloads: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Slow path that isolates malformed rows the way the scalar scorers do."""
+    n = len(payloads)
+    amounts = np.zeros((n, len(NUTRIENT_COLUMNS)), dtype=np.float64)
+    present = np.zeros((n, len(NUTRIENT_COLUMNS)), dtype=bool)
+    valid = np.ones((n, len(NUTRIENT_COLUMNS)), dtype=bool)
+
+    for row, payload in enumerate(payloads):
+        nutrition = _nutrition_of(payload)
+
+        try:
+            raw = {nt["name"]: nt["amount"] for nt in nutrition.get("nutrients", [])}
+        except Exception:
+            valid[row] = False
+            continue
+
+        for name, amount in raw.items():
+            col = COLUMN_INDEX.get(name)
+            if col is None:
+                continue
+
+            if isinstance(amount, (int, float)):
+                amounts[row, col] = amount
+                present[row, col] = True
+            else:
+                valid[row, col] = False
+
+    return amounts, present, valid
+
+
+def _column(amounts: np.ndarray, present: np.ndarray, col: int, default: float) -> np.ndarray:
+    """Get a nutrient column with the scalar scorer's default for missing values."""
+    return np.where(present[:, col], amounts[:, col], default)
+
+
+def pcos_friendly_mask(amounts: np.ndarray, present: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """
+    Vectorized SpoonacularClient._is_pcos_friendly.
+
+    Returns:
+        Boolean array, True where the recipe meets PCOS guidelines
+    """
+    sugar = _column(amounts, present, SUGAR, 100)
+    protein = _column(amounts, present, PROTEIN, 0)
+    fiber = _column(amounts, present, FIBER, 0)
+
+    # Only sugar, protein and fiber decide; e.g. a bad Omega-3 amount does not
+    usable = valid[:, FRIENDLY_COLUMNS].all(axis=1)
+    return usable & (sugar <= 25) & ((protein >= 15) | (fiber >= 5))
+
+
+def pcos_scores(amounts: np.ndarray, present: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """
+    Vectorized SpoonacularClient._calculate_pcos_score.
+
+    Returns:
+        Integer array of scores from 0-100
+    """
+    sugar = _column(amounts, present, SUGAR, 50)
+    protein = _column(amounts, present, PROTEIN, 0)
+    fiber = _column(amounts, present, FIBER, 0)
+    omega3 = _column(amounts, present, OMEGA3, 0)
+
+    score = np.full(len(amounts), 50, dtype=np.int64)
+
+    # Sugar (lower is better)
+    score += np.select([sugar < 10, sugar < 20, sugar > 30], [20, 10, -20], 0)
+
+    # Protein (higher is better)
+    score += np.select([protein > 25, protein > 15], [20, 10], 0)
+
+    # Fiber (higher is better)
+    score += np.select([fiber > 10, fiber > 5], [15, 8], 0)
+
+    # Healthy fats
+    score += np.where(omega3 > 0, 5, 0)
+
+    score = np.clip(score, 0, 100)
+    return np.where(valid[:, COMPARED_COLUMNS].all(axis=1), score, 50)
+
+
+def score_recipes(payloads: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score a batch of recipes in a single vectorized pass.
+
+    Args:
+        payloads: Nutrition dicts, or recipes with a 'nutrition' key
+
+    Returns:
+        Tuple of (PCOS-friendly boolean mask, 0-100 integer scores)
+    """
+    amounts, present, valid = build_nutrient_matrix(payloads)
+    return pcos_friendly_mask(amounts, present, valid), pcos_scores(amounts, present, valid)
@@ -0,0 +1,220 @@
+"""
+Response Cache for Spoonacular API calls.
+Persists API responses across Streamlit reruns and server restarts
+to conserve the daily request quota.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "cache")
+
+# Time-to-live in seconds, matched against the endpoint path suffix
+DEFAULT_TTLS = {
+    "complexSearch": 24 * 3600,
+    "findByIngredients": 24 * 3600,
+    "information": 7 * 24 * 3600,
+    "informationBulk": 7 * 24 * 3600,
+    "nutritionWidget.json": 7 * 24 * 3600,
+}
+DEFAULT_TTL = 6 * 3600
+
+
+class ResponseCache(ABC):
+    """Base class for API response caches. Subclasses implement storage."""
+
+    excluded_params = ("apiKey",)
+
+    def __init__(self, ttls: Optional[Dict[str, int]] = None, default_ttl: int = DEFAULT_TTL):
+        """
+        Initialize cache bookkeeping.
+
+        Args:
+            ttls: Per-endpoint TTLs in seconds, keyed by endpoint suffix
+            default_ttl: TTL for endpoints not listed in ttls
+        """
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def make_key(self, endpoint: str, params: Dict) -> str:
+        """
+        Build a cache key from endpoint and normalized params.
+        The API key is excluded so rotating credentials keeps the cache valid.
+        """
+        normalized = {
+            k: v for k, v in params.items()
+            if k not in self.excluded_params and v is not None
+        }
+        return f"{endpoint}?{json.dumps(normalized, sort_keys=True, default=str)}"
+
+    def ttl_for(self, endpoint: str) -> int:
+        """Get TTL in seconds for an endpoint."""
+        for suffix, ttl in self.ttls.items():
+            if endpoint.endswith(suffix):
+                return ttl
+        return self.default_ttl
+
+    def get(self, endpoint: str, params: Dict) -> Optional[Dict]:
+        """
+        Look up a cached response.
+
+        Returns:
+            Cached response, or None on miss or expiry
+        """
+        value = self._load(self.make_key(endpoint, params))
+
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return value
+
+    def contains(self, endpoint: str, params: Dict) -> bool:
+        """Check for a live entry without counting a hit or miss."""
+        return self._load(self.make_key(endpoint, params)) is not None
+    
+    def set(self, endpoint: str, params: Dict, value: Dict) -> None:
+        """Store a response with the endpoint's TTL."""
+        ttl = self.ttl_for(endpoint)
+        if ttl <= 0:
+            return
+        self._store(self.make_key(endpoint, params), value, time.time() + ttl)
+
+    def stats(self) -> Dict:
+        """
+        Get hit/miss statistics.
+
+        Returns:
+            Dict with hits, misses, hit_ratio and current entry count
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "entries": self._size()
+        }
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries."""
+
+    @abstractmethod
+    def _load(self, key: str) -> Optional[Dict]:
+        """Stored value for a key, or None if missing or expired."""
+
+    @abstractmethod
+    def _store(self, key: str, value: Dict, expires_at: float) -> None:
+        """Store a value until the given epoch time."""
+
+    @abstractmethod
+    def _size(self) -> int:
+        """Number of stored entries."""
+
+
+class SQLiteResponseCache(ResponseCache):
+    """SQLite-backed cache with TTL expiry and size-bounded LRU eviction."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = 5000,
+        ttls: Optional[Dict[str, int]] = None,
+        default_ttl: int = DEFAULT_TTL
+    ):
+        """
+        Initialize SQLite cache.
+
+        Args:
+            path: Database file path (defaults to data/cache/spoonacular.sqlite)
+            max_entries: Maximum entries kept before evicting least recently used
+            ttls: Per-endpoint TTLs in seconds
+            default_ttl: TTL for endpoints not listed in ttls
+        """
+        super().__init__(ttls, default_ttl)
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "spoonacular.sqlite")
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)")
+        self._conn.commit()
+
+    def _load(self, key: str) -> Optional[Dict]:
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            if row[1] < now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+
+        return json.loads(row[0])
+
+    def _store(self, key: str, value: Dict, expires_at: float) -> None:
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then least recently used ones over the size bound."""
+        self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def _size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
@@ -0,0 +1,154 @@
+"""
+Compiled PCOS Rules
+Compiles pcos_rules.json once into an immutable decision structure shared
+by the scalar and cohort assessment paths: a phenotype table indexed by
+criteria bitmask, the numeric thresholds, and risk-factor weight vectors.
+
+The parsed file comes from the shared utils.config loader; RulesEngine
+recompiles whenever that loader picks up a new version, so edited rules
+take effect without restarting the app.
+"""
+
+import threading
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from utils.config import ConfigFile, config_file, freeze
+
+
+# Bit per Rotterdam criterion; a patient's criteria set is the OR of these
+CRITERIA_BITS = MappingProxyType({"oligoanovulation": 1, "hyperandrogenism": 2, "polycystic_ovaries": 4})
+
+# Used when pcos_rules.json has no thresholds section
+DEFAULT_THRESHOLDS = {
+    "oligoanovulation": {"min_periods_per_year": 9, "max_cycle_length_days": 35},
+    "obesity_bmi": 30,
+    "symptom_points": {"irregular_periods": 15, "hirsutism": 10, "acne": 10},
+    "risk_bands": {"high": 70, "medium": 40},
+}
+
+# Risk factors scored from patient_history flags, in weight-vector order
+RISK_FACTOR_FLAGS = ("family_history", "insulin_resistance", "metabolic_syndrome")
+
+
+class CompiledRules(NamedTuple):
+    """Immutable, precomputed view of pcos_rules.json."""
+
+    data: Mapping                          # Read-only view of the parsed file
+    phenotypes: Mapping                    # Phenotype id -> read-only phenotype data
+    phenotype_by_mask: Tuple               # Criteria bitmask (0-7) -> phenotype id or None
+    phenotype_lookup: np.ndarray           # Same table as an object array, for cohort lookups
+    min_periods_per_year: float
+    max_cycle_length_days: float
+    obesity_bmi: float
+    obesity_points: int
+    symptom_points: Mapping
+    risk_flag_names: Tuple                 # RISK_FACTOR_FLAGS present in risk_factors
+    risk_flag_weights: np.ndarray          # Points per risk_flag_names entry
+    risk_bands: Tuple                      # (high, medium) lower bounds
+    mtime: Optional[float] = None
+
+    def phenotype_for(self, criteria_met) -> Optional[str]:
+        """Phenotype id for a collection of met criteria names."""
+        return self.phenotype_by_mask[criteria_mask(criteria_met)]
+
+    def risk_level(self, risk_score: float) -> str:
+        """Risk band name for a risk score."""
+        high, medium = self.risk_bands
+        if risk_score >= high:
+            return "High"
+        if risk_score >= medium:
+            return "Medium"
+        return "Low"
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    array.setflags(write=False)
+    return array
+
+
+def criteria_mask(criteria_met) -> int:
+    """Bitmask of met criteria; names outside CRITERIA_BITS are ignored."""
+    mask = 0
+    for name in criteria_met:
+        mask |= CRITERIA_BITS.get(name, 0)
+    return mask
+
+
+def compile_rules(data: Mapping, mtime: Optional[float] = None) -> CompiledRules:
+    """
+    Compile parsed pcos_rules.json.
+
+    Args:
+        data: Parsed rules file, plain or already frozen
+        mtime: Modification time of the source file, if any
+
+    Returns:
+        CompiledRules
+    """
+    thresholds = {**DEFAULT_THRESHOLDS, **(data.get("thresholds") or {})}
+    oligo = {**DEFAULT_THRESHOLDS["oligoanovulation"], **thresholds["oligoanovulation"]}
+    symptom_points = {**DEFAULT_THRESHOLDS["symptom_points"], **thresholds["symptom_points"]}
+    bands = {**DEFAULT_THRESHOLDS["risk_bands"], **thresholds["risk_bands"]}
+
+    # First phenotype listed wins when two share the same criteria
+    phenotype_by_mask = [None] * (1 << len(CRITERIA_BITS))
+    for phenotype_id, phenotype_data in data.get("phenotypes", {}).items():
+        criteria = phenotype_data.get("criteria", [])
+        if not set(criteria) <= CRITERIA_BITS.keys():
+            continue
+        mask = criteria_mask(criteria)
+        if phenotype_by_mask[mask] is None:
+            phenotype_by_mask[mask] = phenotype_id
+
+    risk_factors = data.get("risk_factors", {})
+    risk_flag_names = tuple(name for name in RISK_FACTOR_FLAGS if name in risk_factors)
+
+    return CompiledRules(
+        data=freeze(data),
+        phenotypes=freeze(data.get("phenotypes", {})),
+        phenotype_by_mask=tuple(phenotype_by_mask),
+        phenotype_lookup=_readonly(np.array(phenotype_by_mask, dtype=object)),
+        min_periods_per_year=oligo["min_periods_per_year"],
+        max_cycle_length_days=oligo["max_cycle_length_days"],
+        obesity_bmi=thresholds["obesity_bmi"],
+        obesity_points=risk_factors.get("obesity", {}).get("risk_increase", 0),
+        symptom_points=MappingProxyType(symptom_points),
+        risk_flag_names=risk_flag_names,
+        risk_flag_weights=_readonly(np.array(
+            [risk_factors[name]["risk_increase"] for name in risk_flag_names], dtype=np.int64
+        )),
+        risk_bands=(bands["high"], bands["medium"]),
+        mtime=mtime
+    )
+
+
+class RulesEngine:
+    """Holds the compiled rules for a file and recompiles when it changes."""
+
+    def __init__(self, path: str = "pcos_rules"):
+        """
+        Load and compile a rules file.
+
+        Args:
+            path: Config name or path to pcos_rules.json (relative paths are package-relative)
+        """
+        self.source: ConfigFile = config_file(path)
+        self._lock = threading.Lock()
+        self._rules = compile_rules(self.source.data, self.source.mtime)
+
+    @property
+    def path(self) -> str:
+        return self.source.path
+
+    @property
+    def rules(self) -> CompiledRules:
+        """Current compiled rules, recompiled first if the file changed."""
+        data = self.source.data
+        if data is not self._rules.data:
+            with self._lock:
+                if data is not self._rules.data:
+                    self._rules = compile_rules(data, self.source.mtime)
+        return self._rules
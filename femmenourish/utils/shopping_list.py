@@ -0,0 +1,311 @@
+"""
+Shopping List Aggregator
+Builds the meal plan shopping list locally from the recipes'
+extendedIngredients (searches request fillIngredients), so no LLM call is
+needed to extract, sum and categorize ingredients.
+
+Names are normalized and singularized, amounts are converted to grams,
+millilitres or a piece count and summed per ingredient, and items are
+sorted into the category schema the app and PDF already use. Gemini is
+only asked, optionally, for cost estimates and shopping tips.
+"""
+
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from utils.ingredient_index import ingredient_tokens, is_pantry_staple
+
+
+CATEGORIES = (
+    "Whole Grains & Millets",
+    "Proteins",
+    "Vegetables",
+    "Dairy & Eggs",
+    "Healthy Fats",
+    "Spices & Herbs",
+    "Pantry Staples",
+)
+
+# Spoonacular aisle names (lowercased, first match wins) to categories
+AISLE_CATEGORIES = (
+    ("spices and seasonings", "Spices & Herbs"),
+    ("milk, eggs, other dairy", "Dairy & Eggs"),
+    ("cheese", "Dairy & Eggs"),
+    ("meat", "Proteins"),
+    ("seafood", "Proteins"),
+    ("produce", "Vegetables"),
+    ("oil, vinegar, salad dressing", "Healthy Fats"),
+    ("nut butters", "Healthy Fats"),
+    ("nuts", "Healthy Fats"),
+    ("pasta and rice", "Whole Grains & Millets"),
+    ("cereal", "Whole Grains & Millets"),
+    ("bread", "Whole Grains & Millets"),
+)
+
+# Ingredient words checked when the aisle is missing or unhelpful
+CATEGORY_KEYWORDS = {
+    "Spices & Herbs": {
+        "cumin", "turmeric", "coriander", "cilantro", "basil", "parsley", "mint", "oregano", "thyme",
+        "rosemary", "cinnamon", "cardamom", "clove", "paprika", "chili", "chilli", "masala", "garam",
+        "ginger", "garlic", "dill", "bay", "curry", "nutmeg", "saffron", "fenugreek", "asafoetida",
+        "hing", "mustard", "seasoning", "spice", "herb", "vanilla", "cayenne",
+    },
+    "Dairy & Eggs": {
+        "milk", "yogurt", "yoghurt", "curd", "paneer", "cheese", "feta", "ricotta", "butter", "ghee",
+        "cream", "egg", "kefir", "buttermilk",
+    },
+    "Proteins": {
+        "chicken", "turkey", "beef", "lamb", "mutton", "pork", "fish", "salmon", "tuna", "cod",
+        "shrimp", "prawn", "tofu", "tempeh", "lentil", "dal", "chickpea", "bean", "edamame", "moong",
+        "rajma", "chana", "soya", "seitan",
+    },
+    "Whole Grains & Millets": {
+        "rice", "quinoa", "oat", "oatmeal", "barley", "millet", "jowar", "bajra", "ragi", "nachni",
+        "kambu", "buckwheat", "bulgur", "farro", "wheat", "atta", "bread", "pasta", "noodle",
+        "tortilla", "couscous", "poha", "flour", "roti",
+    },
+    "Healthy Fats": {
+        "oil", "avocado", "almond", "walnut", "cashew", "pistachio", "peanut", "seed", "chia",
+        "flaxseed", "flax", "sesame", "tahini", "olive", "coconut", "nut",
+    },
+    "Vegetables": {
+        "spinach", "kale", "broccoli", "tomato", "onion", "pepper", "capsicum", "zucchini", "carrot",
+        "cauliflower", "cabbage", "cucumber", "mushroom", "lettuce", "pea", "potato", "squash",
+        "eggplant", "brinjal", "okra", "beet", "celery", "leek", "scallion", "shallot", "asparagus",
+        "lemon", "lime", "apple", "berry", "blueberry", "strawberry", "banana", "orange", "pear",
+        "mango", "fruit", "vegetable", "greens", "arugula", "gourd", "radish",
+    },
+}
+
+# Checked in this order, so "peanut butter" is a fat and "chili powder" a spice
+KEYWORD_ORDER = (
+    "Spices & Herbs", "Healthy Fats", "Dairy & Eggs", "Proteins", "Whole Grains & Millets", "Vegetables",
+)
+
+# Whole names that the word keywords would misplace
+NAME_CATEGORIES = {
+    "green bean": "Vegetables",
+    "french bean": "Vegetables",
+    "bean sprout": "Vegetables",
+    "egg noodle": "Whole Grains & Millets",
+    "sweet pepper": "Vegetables",
+}
+
+# Unit alias -> (dimension, factor to the dimension's base unit)
+UNITS = {
+    "g": ("g", 1.0), "gram": ("g", 1.0), "grams": ("g", 1.0),
+    "kg": ("g", 1000.0), "kilogram": ("g", 1000.0), "kilograms": ("g", 1000.0),
+    "oz": ("g", 28.35), "ounce": ("g", 28.35), "ounces": ("g", 28.35),
+    "lb": ("g", 453.6), "lbs": ("g", 453.6), "pound": ("g", 453.6), "pounds": ("g", 453.6),
+    "ml": ("ml", 1.0), "milliliter": ("ml", 1.0), "milliliters": ("ml", 1.0),
+    "l": ("ml", 1000.0), "liter": ("ml", 1000.0), "liters": ("ml", 1000.0),
+    "cup": ("ml", 240.0), "cups": ("ml", 240.0), "c": ("ml", 240.0),
+    "tbsp": ("ml", 15.0), "tbsps": ("ml", 15.0), "tablespoon": ("ml", 15.0), "tablespoons": ("ml", 15.0),
+    "tsp": ("ml", 5.0), "tsps": ("ml", 5.0), "teaspoon": ("ml", 5.0), "teaspoons": ("ml", 5.0),
+    "fl oz": ("ml", 29.57), "pinch": ("ml", 0.3), "pinches": ("ml", 0.3), "dash": ("ml", 0.6),
+    "": ("pc", 1.0), "piece": ("pc", 1.0), "pieces": ("pc", 1.0), "serving": ("pc", 1.0),
+    "servings": ("pc", 1.0), "small": ("pc", 1.0), "medium": ("pc", 1.0), "large": ("pc", 1.0),
+    "clove": ("pc", 1.0), "cloves": ("pc", 1.0), "head": ("pc", 1.0), "bunch": ("pc", 1.0),
+    "handful": ("pc", 1.0), "slice": ("pc", 1.0), "slices": ("pc", 1.0), "can": ("pc", 1.0),
+    "cans": ("pc", 1.0), "stalk": ("pc", 1.0), "stalks": ("pc", 1.0),
+}
+
+# Fresh categories go to the market, the rest to a supermarket
+FRESH_CATEGORIES = frozenset({"Vegetables", "Proteins", "Spices & Herbs"})
+
+
+def ingredient_key(name: str) -> str:
+    """Normalized, singularized ingredient name used to merge items."""
+    return " ".join(ingredient_tokens(name))
+
+
+def categorize(name: str, aisle: Optional[str] = None) -> str:
+    """
+    Place an ingredient in one of CATEGORIES.
+
+    Args:
+        name: Ingredient name
+        aisle: Spoonacular aisle, if known
+
+    Returns:
+        Category name
+    """
+    key = ingredient_key(name)
+    if key in NAME_CATEGORIES:
+        return NAME_CATEGORIES[key]
+
+    words = set(key.split())
+    for category in KEYWORD_ORDER:
+        if words & CATEGORY_KEYWORDS[category]:
+            return category
+
+    aisle = (aisle or "").lower()
+    for prefix, category in AISLE_CATEGORIES:
+        if aisle.startswith(prefix) or f";{prefix}" in aisle:
+            return category
+
+    return "Pantry Staples"
+
+
+def _measure(ingredient: Dict) -> Optional[Tuple[str, float]]:
+    """
+    Convert an extendedIngredients entry to (dimension, amount in base units).
+    Prefers the metric measure Spoonacular attaches; unknown units are kept
+    as their own dimension so they still sum with themselves.
+    """
+    metric = (ingredient.get("measures") or {}).get("metric") or {}
+    amount = metric.get("amount", ingredient.get("amount"))
+    unit = metric.get("unitShort", ingredient.get("unit")) if "amount" in metric else ingredient.get("unit")
+
+    if not isinstance(amount, (int, float)) or amount <= 0:
+        return None
+
+    unit = str(unit or "").strip().lower().rstrip(".")
+    if unit in UNITS:
+        dimension, factor = UNITS[unit]
+        return dimension, amount * factor
+    return unit, float(amount)
+
+
+def format_quantity(dimension: str, amount: float) -> str:
+    """Round an aggregated amount up to a shoppable quantity."""
+    if dimension == "g":
+        return f"{math.ceil(amount / 100) / 10:g} kg" if amount >= 1000 else f"{math.ceil(amount / 10) * 10:g} g"
+    if dimension == "ml":
+        return f"{math.ceil(amount / 100) / 10:g} l" if amount >= 1000 else f"{math.ceil(amount / 5) * 5:g} ml"
+    if dimension == "pc":
+        return f"{math.ceil(amount):g}"
+    return f"{math.ceil(amount * 4) / 4:g} {dimension}"
+
+
+def assign_stores(common_stores: List[str]) -> Dict[str, str]:
+    """
+    Pick a store per category from a city's common_stores.
+    Markets take fresh categories; supermarkets take packaged ones.
+    """
+    if not common_stores:
+        return {category: "Local stores" for category in CATEGORIES}
+
+    markets = [store for store in common_stores if "market" in store.lower() and "super" not in store.lower()]
+    others = [store for store in common_stores if store not in markets]
+    fresh = markets[0] if markets else common_stores[0]
+    packaged = others[0] if others else common_stores[0]
+
+    return {category: fresh if category in FRESH_CATEGORIES else packaged for category in CATEGORIES}
+
+
+def build_shopping_list(recipes: List[Dict], city_info: Dict, num_people: int = 1) -> Dict:
+    """
+    Aggregate the plan's ingredients into a categorized shopping list.
+
+    Args:
+        recipes: Planned recipes, one entry per meal eaten (repeats count twice)
+        city_info: City metadata; common_stores is used for the 'where' column
+        num_people: People eating each meal; recipe amounts are scaled from
+            the recipe's servings
+
+    Returns:
+        Dict in the generate_shopping_list shape: categories of
+        {"item", "quantity", "where"}, plus store_route and source="local"
+    """
+    totals: Dict[str, Dict[str, float]] = {}
+    labels: Dict[str, str] = {}
+    aisles: Dict[str, str] = {}
+    uses = Counter()
+
+    for recipe in recipes:
+        if not isinstance(recipe, dict):
+            continue
+        servings = recipe.get("servings")
+        scale = num_people / servings if isinstance(servings, (int, float)) and servings > 0 else num_people
+
+        seen = set()
+        for ingredient in recipe.get("extendedIngredients") or []:
+            if not isinstance(ingredient, dict):
+                continue
+            name = ingredient.get("nameClean") or ingredient.get("name") or ""
+            key = ingredient_key(name)
+            if not key or is_pantry_staple(name):
+                continue
+
+            labels.setdefault(key, key)
+            aisles.setdefault(key, ingredient.get("aisle") or "")
+            if key not in seen:
+                seen.add(key)
+                uses[key] += 1
+
+            measure = _measure(ingredient)
+            if measure is not None:
+                dimension, amount = measure
+                by_dimension = totals.setdefault(key, {})
+                by_dimension[dimension] = by_dimension.get(dimension, 0.0) + amount * scale
+            else:
+                totals.setdefault(key, {})
+
+    stores = assign_stores(city_info.get("common_stores") or [])
+    categories: Dict[str, List[Dict]] = {category: [] for category in CATEGORIES}
+
+    for key in sorted(labels, key=lambda k: (-uses[k], k)):
+        category = categorize(key, aisles[key])
+        quantity = " + ".join(
+            format_quantity(dimension, amount) for dimension, amount in sorted(totals[key].items())
+        ) or "As needed"
+        categories[category].append({
+            "item": labels[key].title(),
+            "quantity": quantity,
+            "where": stores[category]
+        })
+
+    categories = {category: items for category, items in categories.items() if items}
+    route_stores = list(dict.fromkeys(stores[category] for category in categories))
+
+    return {
+        "categories": categories,
+        "store_route": [
+            f"{store}: {', '.join(c for c in categories if stores[c] == store)}" for store in route_stores
+        ],
+        "shopping_tips": [],
+        "source": "local"
+    }
+
+
+def item_costs(shopping_list: Dict) -> Dict[str, str]:
+    """Map item names to their 'cost' entries, for carrying costs across rebuilds."""
+    return {
+        item.get("item", ""): item["cost"]
+        for items in (shopping_list.get("categories") or {}).values()
+        for item in items
+        if item.get("cost")
+    }
+
+
+def apply_costs(shopping_list: Dict, estimate: Optional[Dict]) -> Dict:
+    """
+    Merge a cost estimate into a locally built list.
+
+    Args:
+        shopping_list: Result of build_shopping_list
+        estimate: {"costs": {item: cost}, "total_estimated_cost", "shopping_tips",
+            "estimated_time"}, e.g. from GeminiClient.estimate_shopping_costs
+
+    Returns:
+        New shopping list with per-item costs and the estimate's summary fields
+    """
+    if not isinstance(estimate, dict):
+        return shopping_list
+
+    costs = {ingredient_key(name): cost for name, cost in (estimate.get("costs") or {}).items()}
+    merged = dict(shopping_list)
+    merged["categories"] = {
+        category: [
+            {**item, "cost": costs[ingredient_key(item["item"])]}
+            if ingredient_key(item["item"]) in costs else item
+            for item in items
+        ]
+        for category, items in (shopping_list.get("categories") or {}).items()
+    }
+    for field in ("total_estimated_cost", "shopping_tips", "estimated_time"):
+        if estimate.get(field):
+            merged[field] = estimate[field]
+    return merged
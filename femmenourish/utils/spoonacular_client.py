@@ -3,29 +3,96 @@ Spoonacular API Client for recipe and nutrition data.
 Handles all interactions with Spoonacular Food API.
 """
 
-import requests
 import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from email.utils import parsedate_to_datetime
 from typing import Dict, List, Optional
-import streamlit as st
+
+from utils.quota import QuotaManager, estimate_points
+from utils.response_cache import ResponseCache, SQLiteResponseCache
 
 load_dotenv()
 
+# Status codes worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
 
 class SpoonacularClient:
-    def __init__(self):
-        """Initialize Spoonacular client with API key from environment."""
+    def __init__(
+        self,
+        cache: Optional[ResponseCache] = None,
+        use_cache: bool = True,
+        quota: Optional[QuotaManager] = None,
+        corpus=None,
+        use_corpus: bool = True,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0,
+        timeout: float = 10
+    ):
+        """
+        Initialize Spoonacular client with API key from environment.
+        
+        Args:
+            cache: Optional response cache (defaults to on-disk SQLite cache)
+            use_cache: Set False to always hit the network
+            quota: Optional quota manager (defaults to the shared on-disk daily budget)
+            corpus: Optional RecipeCorpus answering searches offline (defaults to data/corpus)
+            use_corpus: Set False to skip the local corpus for recipe searches
+            pool_size: Keep-alive connections held open to the API host
+            max_retries: Retries for 429/5xx responses and connection errors
+            backoff_base: First retry delay ceiling in seconds (doubles per attempt)
+            backoff_max: Longest delay to wait; a larger Retry-After fails fast
+            timeout: Per-request timeout in seconds
+        """
         self.api_key = os.getenv("SPOONACULAR_API_KEY")
         if not self.api_key:
             raise ValueError("SPOONACULAR_API_KEY not found in environment variables")
         
         self.base_url = "https://api.spoonacular.com"
         self.daily_limit = 150  # Free tier limit
-        self.request_count = 0
+        
+        # Daily points and request rate, shared across processes on this host
+        self.quota = quota if quota is not None else QuotaManager(daily_limit=self.daily_limit)
+        
+        # Pooled keep-alive session, created on first request and shared by all threads
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self._session = None
+        self._session_lock = threading.Lock()
+        
+        if use_cache:
+            self.cache = cache if cache is not None else SQLiteResponseCache()
+        else:
+            self.cache = None
+        
+        if use_corpus and corpus is None:
+            from utils.recipe_corpus import RecipeCorpus
+            corpus = RecipeCorpus()
+        self.corpus = corpus if use_corpus else None
+        self._ingredient_index = None
+        self._ingredient_index_version = None
+        self._ingredient_index_lock = threading.Lock()
+        
+        # Per-recipe nutrition, shared across leftover searches
+        self._nutrition_cache: OrderedDict = OrderedDict()
+        self._nutrition_cache_size = 2000
+        self._nutrition_lock = threading.Lock()
+        self.max_workers = 6
     
     def _make_request(self, endpoint: str, params: Dict) -> Dict:
         """
         Make API request with error handling and rate limiting.
+        Successful responses are cached; cache hits skip the network.
         
         Args:
             endpoint: API endpoint path
@@ -34,35 +101,199 @@ class SpoonacularClient:
         Returns:
             API response as dict
         """
-        params["apiKey"] = self.api_key
+        if self.cache is not None:
+            cached = self.cache.get(endpoint, params)
+            if cached is not None:
+                return cached
+        
+        import requests
+        
+        # Reserve points up front so concurrent callers cannot overrun the budget
+        points = estimate_points(endpoint, params)
+        if not self.quota.try_consume(points):
+            quota = self.quota.stats()
+            return {"error": f"Daily API quota reached ({quota['used']:.0f}/{quota['limit']:.0f} points). Resets at midnight UTC."}
+        
+        request_params = dict(params)
+        request_params["apiKey"] = self.api_key
         url = f"{self.base_url}/{endpoint}"
         
         try:
-            response = requests.get(url, params=params, timeout=10)
+            response = self._get_with_retries(url, request_params)
             response.raise_for_status()
             
-            self.request_count += 1
+            self._reconcile_quota(response, points)
             
-            # Check rate limit
-            if self.request_count >= self.daily_limit:
-                st.warning(f"⚠️ Approaching daily API limit ({self.request_count}/{self.daily_limit})")
+            result = response.json()
             
-            return response.json()
+            if self.cache is not None:
+                self.cache.set(endpoint, params, result)
+            
+            return result
         
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 402:
+                self.quota.mark_exhausted()
                 return {"error": "API quota exceeded. Please upgrade your Spoonacular plan."}
-            elif e.response.status_code == 401:
+            
+            # Failed requests are not charged
+            self.quota.adjust(-points)
+            
+            if e.response.status_code == 401:
                 return {"error": "Invalid API key. Please check your credentials."}
+            elif e.response.status_code == 429:
+                return {"error": "API rate limit reached. Please try again shortly."}
             else:
                 return {"error": f"HTTP error: {e.response.status_code}"}
         
         except requests.exceptions.Timeout:
+            self.quota.adjust(-points)
             return {"error": "Request timed out. Please try again."}
         
         except requests.exceptions.RequestException as e:
+            self.quota.adjust(-points)
             return {"error": f"Network error: {str(e)}"}
     
+    def _reconcile_quota(self, response, estimated_points: float) -> None:
+        """Replace the estimated cost with the server-reported one when available."""
+        try:
+            actual = response.headers.get("X-API-Quota-Request")
+            if actual is not None:
+                self.quota.adjust(float(actual) - estimated_points)
+            
+            used = response.headers.get("X-API-Quota-Used")
+            if used is not None:
+                self.quota.sync_used(float(used))
+        except (TypeError, ValueError):
+            pass
+    
+    def _get_session(self):
+        """Create the shared requests.Session with a sized connection pool."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+    
+    def _get_with_retries(self, url: str, params: Dict):
+        """
+        GET through the pooled session, retrying 429/5xx responses and
+        connection failures with jittered exponential backoff.
+        Retry-After is honoured; if it asks for longer than backoff_max the
+        response is returned immediately so callers can fall back.
+        
+        Args:
+            url: Request URL
+            params: Query parameters including apiKey
+        
+        Returns:
+            The final requests.Response
+        """
+        import requests
+        
+        session = self._get_session()
+        
+        for attempt in range(self.max_retries + 1):
+            self.quota.throttle()
+            try:
+                response = session.get(url, params=params, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff_delay(attempt))
+                continue
+            
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt == self.max_retries:
+                return response
+            
+            retry_after = self._retry_after_seconds(response)
+            if retry_after is not None and retry_after > self.backoff_max:
+                return response
+            
+            time.sleep(max(retry_after or 0, self._backoff_delay(attempt)))
+        
+        return response
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+    
+    def _retry_after_seconds(self, response) -> Optional[float]:
+        """Parse a Retry-After header given as seconds or an HTTP date."""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+    
+    def quota_stats(self) -> Dict:
+        """
+        Get today's API points usage.
+        
+        Returns:
+            Dict with day, used, limit and remaining points
+        """
+        return self.quota.stats()
+    
+    def quota_warning(self) -> Optional[str]:
+        """
+        Warn when today's quota is running low.
+        Returned rather than shown, since requests also run on job worker threads.
+        
+        Returns:
+            Warning message, or None if more than a fifth of the quota is left
+        """
+        remaining = self.quota.remaining()
+        if remaining < 0.2 * self.daily_limit:
+            return f"Approaching daily API limit ({remaining:.0f} of {self.daily_limit} points left)"
+        return None
+    
+    def can_afford(self, points: float) -> bool:
+        """Check whether a workload of this many points fits in today's remaining quota."""
+        return self.quota.can_afford(points)
+    
+    def estimate_search_points(
+        self,
+        cuisine: str,
+        meal_type: str,
+        dietary_restrictions: Optional[List[str]] = None,
+        number: int = 10
+    ) -> float:
+        """
+        Estimate the points a search_pcos_recipes call will cost.
+        Corpus and cached searches are free; others assume the first query succeeds.
+        """
+        params = self._search_params(cuisine, meal_type, dietary_restrictions, number)
+        if self.corpus is not None and self._search_corpus(params) is not None:
+            return 0.0
+        if self.cache is not None and self.cache.contains("recipes/complexSearch", params):
+            return 0.0
+        return estimate_points("recipes/complexSearch", params)
+    
+    def cache_stats(self) -> Dict:
+        """
+        Get response cache statistics for quota monitoring.
+        
+        Returns:
+            Dict with hits, misses, hit_ratio and entries (empty if caching is off)
+        """
+        return self.cache.stats() if self.cache is not None else {}
+    
     def search_pcos_recipes(
         self,
         cuisine: str,
@@ -108,6 +339,67 @@ class SpoonacularClient:
     ) -> Dict:
         """Internal method to search with specific parameters."""
         
+        params = self._search_params(cuisine, meal_type, dietary_restrictions, number)
+        
+        # Answer from the local corpus when it has matches; the network is only for misses
+        if self.corpus is not None:
+            local = self._search_corpus(params)
+            if local is not None:
+                return local
+        
+        result = self._make_request("recipes/complexSearch", params)
+        
+        # Check if we got valid results
+        if "error" in result:
+            return result
+        
+        if "results" not in result or len(result["results"]) == 0:
+            # Further relax constraints and try again
+            print(f"No results found, trying with minimal constraints...")
+            params["maxSugar"] = 50
+            params.pop("minProtein", None)
+            params.pop("minFiber", None)
+            result = self._make_request("recipes/complexSearch", params)
+        
+        # Write through so the next plan can be built offline
+        if self.corpus is not None and result.get("results"):
+            try:
+                self.corpus.add_recipes(result["results"])
+            except OSError as e:
+                print(f"Could not update recipe corpus: {e}")
+        
+        return result
+    
+    def _search_corpus(self, params: Dict) -> Optional[Dict]:
+        """
+        Run a search against the local corpus with the same relaxed fallback
+        as the network path.
+        
+        Returns:
+            complexSearch-shaped result, or None if the corpus has no match
+        """
+        result = self.corpus.search(params)
+        if result["results"]:
+            return result
+        
+        relaxed = dict(params, maxSugar=50)
+        relaxed.pop("minProtein", None)
+        relaxed.pop("minFiber", None)
+        result = self.corpus.search(relaxed)
+        if result["results"]:
+            return result
+        
+        return None
+    
+    def _search_params(
+        self,
+        cuisine: str,
+        meal_type: str,
+        dietary_restrictions: Optional[List[str]] = None,
+        number: int = 10
+    ) -> Dict:
+        """Build complexSearch query parameters for a PCOS recipe search."""
+        
         params = {
             "maxSugar": 35,          # PCOS-friendly but realistic
             "minProtein": 8,         # Lower to get more results
@@ -132,21 +424,7 @@ class SpoonacularClient:
         if dietary_restrictions:
             params["intolerances"] = ",".join(dietary_restrictions)
         
-        result = self._make_request("recipes/complexSearch", params)
-        
-        # Check if we got valid results
-        if "error" in result:
-            return result
-        
-        if "results" not in result or len(result["results"]) == 0:
-            # Further relax constraints and try again
-            print(f"No results found, trying with minimal constraints...")
-            params["maxSugar"] = 50
-            params.pop("minProtein", None)
-            params.pop("minFiber", None)
-            result = self._make_request("recipes/complexSearch", params)
-        
-        return result
+        return params
     
     def find_recipes_by_ingredients(
         self,
@@ -156,6 +434,8 @@ class SpoonacularClient:
     ) -> List[Dict]:
         """
         Find recipes based on available ingredients (leftover manager).
+        The local corpus is searched first; Spoonacular only fills the gap
+        when it has fewer than `number` PCOS-friendly matches.
         
         Args:
             ingredients: List of ingredient names
@@ -166,10 +446,19 @@ class SpoonacularClient:
             List of recipe dicts
         """
         
+        local_recipes = []
+        if self.corpus is not None and len(self.corpus):
+            from utils.ingredient_index import find_in_corpus
+            
+            local_recipes = find_in_corpus(self._get_ingredient_index(), self.corpus, ingredients, number, cuisine)
+            if len(local_recipes) >= number:
+                local_recipes.sort(key=lambda x: x.get("pcos_score", 0), reverse=True)
+                return local_recipes
+        
         params = {
             "ingredients": ",".join(ingredients),
             "number": number,
-            "ranking": 2,            # Maximize used ingredients
+            "ranking": 2,            # Minimize missing ingredients first
             "ignorePantry": True     # Don't assume pantry staples
         }
         
@@ -179,25 +468,57 @@ class SpoonacularClient:
         result = self._make_request("recipes/findByIngredients", params)
         
         if "error" in result:
-            return []
+            return local_recipes
+        
+        # Fetch nutrition for all candidates in one batch
+        details = {}
+        nutrition_by_id = self.get_recipes_nutrition_bulk([recipe.get("id") for recipe in result], details)
+        
+        from utils.recipe_scoring import score_recipes
+        
+        # Score all candidates with nutrition in one vectorized pass
+        candidates = [recipe for recipe in result if nutrition_by_id.get(recipe.get("id"))]
+        friendly, scores = score_recipes([nutrition_by_id[recipe["id"]] for recipe in candidates])
         
         # Filter results for PCOS compatibility
         pcos_friendly_recipes = []
         
-        for recipe in result:
-            # Get detailed nutrition info
-            recipe_id = recipe.get("id")
-            nutrition = self.get_recipe_nutrition(recipe_id)
-            
-            if nutrition and self._is_pcos_friendly(nutrition):
-                recipe["nutrition"] = nutrition
-                recipe["pcos_score"] = self._calculate_pcos_score(nutrition)
+        for recipe, is_friendly, score in zip(candidates, friendly, scores):
+            if is_friendly:
+                recipe["nutrition"] = nutrition_by_id[recipe["id"]]
+                recipe["pcos_score"] = int(score)
                 pcos_friendly_recipes.append(recipe)
         
+        # Write through so the next leftover query can be answered locally. Only full
+        # recipe-information payloads go in; findByIngredients results lack cuisines,
+        # dish types and the full ingredient list the corpus indexes
+        full_payloads = [details[recipe["id"]] for recipe in pcos_friendly_recipes if recipe["id"] in details]
+        if self.corpus is not None and full_payloads:
+            try:
+                self.corpus.add_recipes(full_payloads)
+            except OSError as e:
+                print(f"Could not update recipe corpus: {e}")
+        
+        # Local matches first, topped up with new recipes from the API
+        local_ids = {recipe["id"] for recipe in local_recipes}
+        pcos_friendly_recipes = local_recipes + [
+            recipe for recipe in pcos_friendly_recipes if recipe.get("id") not in local_ids
+        ]
+        
         # Sort by PCOS score
         pcos_friendly_recipes.sort(key=lambda x: x.get("pcos_score", 0), reverse=True)
         
-        return pcos_friendly_recipes
+        return pcos_friendly_recipes[:number]
+    
+    def _get_ingredient_index(self):
+        """Get the ingredient index for the corpus, rebuilding it after corpus updates."""
+        from utils.ingredient_index import IngredientIndex
+        
+        with self._ingredient_index_lock:
+            if self._ingredient_index is None or self._ingredient_index_version != self.corpus.version:
+                self._ingredient_index = IngredientIndex.from_corpus(self.corpus)
+                self._ingredient_index_version = self.corpus.version
+            return self._ingredient_index
     
     def get_recipe_details(self, recipe_id: int) -> Dict:
         """
@@ -230,6 +551,90 @@ class SpoonacularClient:
         result = self._make_request(f"recipes/{recipe_id}/nutritionWidget.json", {})
         return result
     
+    def get_recipes_nutrition_bulk(
+        self,
+        recipe_ids: List[int],
+        details: Optional[Dict[int, Dict]] = None
+    ) -> Dict[int, Dict]:
+        """
+        Get nutrition for many recipes with as few requests as possible.
+        Uses the informationBulk endpoint and falls back to parallel
+        per-recipe requests for anything the bulk call did not return.
+        
+        Args:
+            recipe_ids: Spoonacular recipe IDs
+            details: Optional dict filled with the full recipe-information
+                payloads the bulk call returned, keyed by ID
+        
+        Returns:
+            Dict mapping recipe ID to nutrition data (failed lookups omitted)
+        """
+        
+        nutrition_by_id = {}
+        missing = []
+        
+        for recipe_id in dict.fromkeys(rid for rid in recipe_ids if rid is not None):
+            nutrition = self._get_cached_nutrition(recipe_id)
+            if nutrition is not None:
+                nutrition_by_id[recipe_id] = nutrition
+            else:
+                missing.append(recipe_id)
+        
+        if not missing:
+            return nutrition_by_id
+        
+        bulk = self._make_request(
+            "recipes/informationBulk",
+            {"ids": ",".join(str(rid) for rid in missing), "includeNutrition": True}
+        )
+        
+        if isinstance(bulk, list):
+            for info in bulk:
+                nutrition = info.get("nutrition")
+                if info.get("id") in missing and nutrition and "nutrients" in nutrition:
+                    nutrition_by_id[info["id"]] = nutrition
+                    self._store_nutrition(info["id"], nutrition)
+                    if details is not None:
+                        details[info["id"]] = info
+        
+        remaining = [rid for rid in missing if rid not in nutrition_by_id]
+        
+        if remaining:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(remaining))) as executor:
+                for recipe_id, nutrition in zip(remaining, executor.map(self.get_recipe_nutrition, remaining)):
+                    if nutrition and "error" not in nutrition:
+                        nutrition_by_id[recipe_id] = nutrition
+                        # _make_request already persisted this response
+                        self._store_nutrition(recipe_id, nutrition, persist=False)
+        
+        return nutrition_by_id
+    
+    def _get_cached_nutrition(self, recipe_id: int) -> Optional[Dict]:
+        """Look up per-recipe nutrition in memory, then in the response cache."""
+        with self._nutrition_lock:
+            if recipe_id in self._nutrition_cache:
+                self._nutrition_cache.move_to_end(recipe_id)
+                return self._nutrition_cache[recipe_id]
+        
+        if self.cache is not None:
+            nutrition = self.cache.get(f"recipes/{recipe_id}/nutritionWidget.json", {})
+            if nutrition is not None:
+                self._store_nutrition(recipe_id, nutrition, persist=False)
+                return nutrition
+        
+        return None
+    
+    def _store_nutrition(self, recipe_id: int, nutrition: Dict, persist: bool = True) -> None:
+        """Remember per-recipe nutrition so later searches sharing recipes skip the API."""
+        with self._nutrition_lock:
+            self._nutrition_cache[recipe_id] = nutrition
+            self._nutrition_cache.move_to_end(recipe_id)
+            while len(self._nutrition_cache) > self._nutrition_cache_size:
+                self._nutrition_cache.popitem(last=False)
+        
+        if persist and self.cache is not None:
+            self.cache.set(f"recipes/{recipe_id}/nutritionWidget.json", {}, nutrition)
+    
     def _is_pcos_friendly(self, nutrition: Dict) -> bool:
         """
         Check if recipe meets PCOS nutrition guidelines.